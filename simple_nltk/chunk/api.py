@@ -10,9 +10,18 @@
 ##  Chunk Parser Interface
 ##//////////////////////////////////////////////////////
 
+import time
+from collections import deque
+from itertools import islice
+
 from simple_nltk.parse import ParserI
 
-from simple_nltk.chunk.util import ChunkScore
+from simple_nltk.chunk.util import (
+    ChunkScore,
+    _chunk_batch,
+    _set_worker_chunker,
+    _worker_chunk_batch,
+)
 
 
 class ChunkParserI(ParserI):
@@ -35,18 +44,44 @@ class ChunkParserI(ParserI):
         """
         raise NotImplementedError()
 
-    def evaluate(self, gold):
+    def evaluate(self, gold, batch_size=1000, processes=1):
         """
         Score the accuracy of the chunker against the gold standard.
         Remove the chunking the gold standard text, rechunk it using
         the chunker, and return a ``ChunkScore`` object
         reflecting the performance of this chunk peraser.
 
+        The text is rechunked ``batch_size`` sentences at a time with
+        ``parse_sents()``.  With ``processes > 1`` the batches are
+        rechunked and scored by a pool of worker processes, with a
+        bounded number of batches in flight.  The throughput of the
+        chunker, in wall clock time, is recorded in the ``ChunkScore``.
+
         :type gold: list(Tree)
         :param gold: The list of chunked sentences to score the chunker on.
         :rtype: ChunkScore
         """
+        start = time.perf_counter()
         chunkscore = ChunkScore()
-        for correct in gold:
-            chunkscore.score(correct, self.parse(correct.leaves()))
+        gold = iter(gold)
+        batches = iter(lambda: list(islice(gold, batch_size)), [])
+        if processes <= 1:
+            for batch in batches:
+                chunkscore.merge(_chunk_batch(self, batch))
+        else:
+            from multiprocessing import Pool
+
+            pool = Pool(processes, initializer=_set_worker_chunker, initargs=(self,))
+            try:
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.apply_async(_worker_chunk_batch, (batch,)))
+                    if len(pending) >= 2 * processes:
+                        chunkscore.merge(pending.popleft().get())
+                while pending:
+                    chunkscore.merge(pending.popleft().get())
+            finally:
+                pool.close()
+                pool.join()
+        chunkscore._seconds = time.perf_counter() - start
         return chunkscore
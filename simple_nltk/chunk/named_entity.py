@@ -10,6 +10,7 @@ Named entity chunker
 """
 
 import os, re, pickle
+from functools import lru_cache
 from xml.etree import ElementTree as ET
 
 from simple_nltk.tag import ClassifierBasedTagger, pos_tag
@@ -53,48 +54,38 @@ class NEChunkParserTagger(ClassifierBasedTagger):
         return wl
 
     def _feature_detector(self, tokens, index, history):
+        # The features of each word and tag type are computed once, by
+        # _word_features() and _pos_features(), and assembled here by
+        # index.
         word = tokens[index][0]
-        pos = simplify_pos(tokens[index][1])
+        lower, wordshape, prefix3, suffix3 = _word_features(word)
+        pos = _pos_features(tokens[index][1])[0]
         if index == 0:
-            prevword = prevprevword = None
-            prevpos = prevprevpos = None
-            prevshape = prevtag = prevprevtag = None
+            prevword = prevpos = None
+            prevshape = prevtag = None
         elif index == 1:
-            prevword = tokens[index - 1][0].lower()
-            prevprevword = None
-            prevpos = simplify_pos(tokens[index - 1][1])
-            prevprevpos = None
+            prevword = _word_features(tokens[index - 1][0])[0]
+            prevpos = _pos_features(tokens[index - 1][1])[0]
             prevtag = history[index - 1][0]
-            prevshape = prevprevtag = None
+            prevshape = None
         else:
-            prevword = tokens[index - 1][0].lower()
-            prevprevword = tokens[index - 2][0].lower()
-            prevpos = simplify_pos(tokens[index - 1][1])
-            prevprevpos = simplify_pos(tokens[index - 2][1])
+            prevword = _word_features(tokens[index - 1][0])[0]
+            prevpos = _pos_features(tokens[index - 1][1])[0]
             prevtag = history[index - 1]
-            prevprevtag = history[index - 2]
-            prevshape = shape(prevword)
+            prevshape = _word_features(prevword)[1]
         if index == len(tokens) - 1:
-            nextword = nextnextword = None
-            nextpos = nextnextpos = None
-        elif index == len(tokens) - 2:
-            nextword = tokens[index + 1][0].lower()
-            nextpos = tokens[index + 1][1].lower()
-            nextnextword = None
-            nextnextpos = None
+            nextword = nextpos = None
         else:
-            nextword = tokens[index + 1][0].lower()
-            nextpos = tokens[index + 1][1].lower()
-            nextnextword = tokens[index + 2][0].lower()
-            nextnextpos = tokens[index + 2][1].lower()
+            nextword = _word_features(tokens[index + 1][0])[0]
+            nextpos = _pos_features(tokens[index + 1][1])[1]
 
         # 89.6
         features = {
             "bias": True,
-            "shape": shape(word),
+            "shape": wordshape,
             "wordlen": len(word),
-            "prefix3": word[:3].lower(),
-            "suffix3": word[-3:].lower(),
+            "prefix3": prefix3,
+            "suffix3": suffix3,
             "pos": pos,
             "word": word,
             "en-wordlist": (word in self._english_wordlist()),
@@ -103,7 +94,7 @@ class NEChunkParserTagger(ClassifierBasedTagger):
             "nextpos": nextpos,
             "prevword": prevword,
             "nextword": nextword,
-            "word+nextpos": "{0}+{1}".format(word.lower(), nextpos),
+            "word+nextpos": "{0}+{1}".format(lower, nextpos),
             "pos+prevtag": "{0}+{1}".format(pos, prevtag),
             "shape+prevtag": "{0}+{1}".format(prevshape, prevtag),
         }
@@ -127,6 +118,14 @@ class NEChunkParser(ChunkParserI):
         tree = self._tagged_to_parse(tagged)
         return tree
 
+    def parse_sents(self, sents):
+        """
+        Parse each list of pos-tagged words in *sents*, tagging them
+        all at once.
+        """
+        tagged_sents = self._tagger.tag_sents(sents)
+        return [self._tagged_to_parse(tagged) for tagged in tagged_sents]
+
     def _train(self, corpus):
         # Convert to tagged sequence
         corpus = [self._parse_to_tagged(s) for s in corpus]
@@ -193,6 +192,24 @@ def simplify_pos(s):
         return s.split("-")[0]
 
 
+@lru_cache(maxsize=100000)
+def _word_features(word):
+    """
+    Return the lowercased form, shape, and lowercased 3-letter prefix and
+    suffix of *word*, computed once per word type.
+    """
+    return word.lower(), shape(word), word[:3].lower(), word[-3:].lower()
+
+
+@lru_cache(maxsize=1000)
+def _pos_features(pos):
+    """
+    Return the simplified and the lowercased form of the tag *pos*,
+    computed once per tag.
+    """
+    return simplify_pos(pos), pos.lower()
+
+
 def postag_tree(tree):
     # Part-of-speech tagging.
     words = tree.leaves()
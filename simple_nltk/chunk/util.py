@@ -7,9 +7,10 @@
 # For license information, see LICENSE.TXT
 
 import re
+from operator import eq, itemgetter
 
 from simple_nltk.tree import Tree
-from simple_nltk.tag.mapping import map_tag
+from simple_nltk.tag.mapping import tag_mapper
 from simple_nltk.tag.util import str2tuple
 
 ##//////////////////////////////////////////////////////
@@ -72,37 +73,32 @@ class ChunkScore(object):
 
     :ivar kwargs: Keyword arguments:
 
-        - max_tp_examples: The maximum number actual examples of true
-          positives to record.  This affects the ``correct`` member
-          function: ``correct`` will not return more than this number
-          of true positive examples.  This does *not* affect any of
-          the numerical metrics (precision, recall, or f-measure)
+        - max_tp_examples: Accepted for backwards compatibility.
+          ``correct`` and ``guessed`` always return every chunk.
 
         - max_fp_examples: The maximum number actual examples of false
           positives to record.  This affects the ``incorrect`` member
-          function and the ``guessed`` member function: ``incorrect``
-          will not return more than this number of examples, and
-          ``guessed`` will not return more than this number of true
-          positive examples.  This does *not* affect any of the
-          numerical metrics (precision, recall, or f-measure)
+          function: ``incorrect`` will not return more than this number
+          of examples.  This does *not* affect any of the numerical
+          metrics (precision, recall, or f-measure)
 
         - max_fn_examples: The maximum number actual examples of false
           negatives to record.  This affects the ``missed`` member
-          function and the ``correct`` member function: ``missed``
-          will not return more than this number of examples, and
-          ``correct`` will not return more than this number of true
-          negative examples.  This does *not* affect any of the
-          numerical metrics (precision, recall, or f-measure)
+          function: ``missed`` will not return more than this number
+          of examples.  This does *not* affect any of the numerical
+          metrics (precision, recall, or f-measure)
 
         - chunk_label: A regular expression indicating which chunks
           should be compared.  Defaults to ``'.*'`` (i.e., all chunks).
 
-    :type _tp: list(Token)
-    :ivar _tp: List of true positives
+    :type _correct: list(Token)
+    :ivar _correct: List of correct chunks
+    :type _guessed: list(Token)
+    :ivar _guessed: List of guessed chunks
     :type _fp: list(Token)
-    :ivar _fp: List of false positives
+    :ivar _fp: List of false positive examples
     :type _fn: list(Token)
-    :ivar _fn: List of false negatives
+    :ivar _fn: List of false negative examples
 
     :type _tp_num: int
     :ivar _tp_num: Number of true positives
@@ -113,11 +109,10 @@ class ChunkScore(object):
     """
 
     def __init__(self, **kwargs):
-        self._correct = set()
-        self._guessed = set()
-        self._tp = set()
-        self._fp = set()
-        self._fn = set()
+        self._correct = []
+        self._guessed = []
+        self._fp = []
+        self._fn = []
         self._max_tp = kwargs.get("max_tp_examples", 100)
         self._max_fp = kwargs.get("max_fp_examples", 100)
         self._max_fn = kwargs.get("max_fn_examples", 100)
@@ -128,18 +123,8 @@ class ChunkScore(object):
         self._count = 0
         self._tags_correct = 0.0
         self._tags_total = 0.0
-
-        self._measuresNeedUpdate = False
-
-    def _updateMeasures(self):
-        if self._measuresNeedUpdate:
-            self._tp = self._guessed & self._correct
-            self._fn = self._correct - self._guessed
-            self._fp = self._guessed - self._correct
-            self._tp_num = len(self._tp)
-            self._fp_num = len(self._fp)
-            self._fn_num = len(self._fn)
-            self._measuresNeedUpdate = False
+        self._tokens = 0
+        self._seconds = 0.0
 
     def score(self, correct, guessed):
         """
@@ -152,10 +137,20 @@ class ChunkScore(object):
         :type guessed: chunk structure
         :param guessed: The chunked sentence to be scored.
         """
-        self._correct |= _chunksets(correct, self._count, self._chunk_label)
-        self._guessed |= _chunksets(guessed, self._count, self._chunk_label)
+        # Chunks of different sentences never match, so the counts of
+        # each sentence can be added up as it is scored.
+        correct_chunks = _chunksets(correct, self._count, self._chunk_label)
+        guessed_chunks = _chunksets(guessed, self._count, self._chunk_label)
+        tp = correct_chunks & guessed_chunks
+        self._tp_num += len(tp)
+        self._fp_num += len(guessed_chunks) - len(tp)
+        self._fn_num += len(correct_chunks) - len(tp)
+        self._correct.extend(sorted(correct_chunks, key=itemgetter(0)))
+        self._guessed.extend(sorted(guessed_chunks, key=itemgetter(0)))
+        _add_examples(self._fp, guessed_chunks - tp, self._max_fp)
+        _add_examples(self._fn, correct_chunks - tp, self._max_fn)
         self._count += 1
-        self._measuresNeedUpdate = True
+        self._tokens += len(correct.leaves())
         # Keep track of per-tag accuracy (if possible)
         try:
             correct_tags = tree2conlltags(correct)
@@ -166,9 +161,36 @@ class ChunkScore(object):
             # is too deeply nested to be printed in CoNLL format."
             correct_tags = guessed_tags = ()
         self._tags_total += len(correct_tags)
-        self._tags_correct += sum(
-            1 for (t, g) in zip(guessed_tags, correct_tags) if t == g
-        )
+        self._tags_correct += sum(map(eq, guessed_tags, correct_tags))
+
+    def merge(self, other):
+        """
+        Add the scores accumulated by another ``ChunkScore``, such as
+        the score of another part of the same test set.
+
+        :type other: ChunkScore
+        """
+        self._tp_num += other._tp_num
+        self._fp_num += other._fp_num
+        self._fn_num += other._fn_num
+        # Renumber the other sentences so they follow this score's.
+        for examples, other_examples, max_examples in (
+            (self._correct, other._correct, None),
+            (self._guessed, other._guessed, None),
+            (self._fp, other._fp, self._max_fp),
+            (self._fn, other._fn, self._max_fn),
+        ):
+            if max_examples is None:
+                room = len(other_examples)
+            else:
+                room = max(0, max_examples - len(examples))
+            for (count, pos), chunk in other_examples[:room]:
+                examples.append(((self._count + count, pos), chunk))
+        self._count += other._count
+        self._tags_total += other._tags_total
+        self._tags_correct += other._tags_correct
+        self._tokens += other._tokens
+        self._seconds += other._seconds
 
     def accuracy(self):
         """
@@ -189,7 +211,6 @@ class ChunkScore(object):
 
         :rtype: float
         """
-        self._updateMeasures()
         div = self._tp_num + self._fp_num
         if div == 0:
             return 0
@@ -203,7 +224,6 @@ class ChunkScore(object):
 
         :rtype: float
         """
-        self._updateMeasures()
         div = self._tp_num + self._fn_num
         if div == 0:
             return 0
@@ -222,7 +242,6 @@ class ChunkScore(object):
         :type alpha: float
         :rtype: float
         """
-        self._updateMeasures()
         p = self.precision()
         r = self.recall()
         if p == 0 or r == 0:  # what if alpha is 0 or 1?
@@ -233,24 +252,22 @@ class ChunkScore(object):
         """
         Return the chunks which were included in the
         correct chunk structures, but not in the guessed chunk
-        structures, listed in input order.
+        structures, listed in input order.  At most ``max_fn_examples``
+        chunks are returned.
 
         :rtype: list of chunks
         """
-        self._updateMeasures()
-        chunks = list(self._fn)
-        return [c[1] for c in chunks]  # discard position information
+        return [c[1] for c in self._fn]  # discard position information
 
     def incorrect(self):
         """
         Return the chunks which were included in the guessed chunk structures,
         but not in the correct chunk structures, listed in input order.
+        At most ``max_fp_examples`` chunks are returned.
 
         :rtype: list of chunks
         """
-        self._updateMeasures()
-        chunks = list(self._fp)
-        return [c[1] for c in chunks]  # discard position information
+        return [c[1] for c in self._fp]  # discard position information
 
     def correct(self):
         """
@@ -259,8 +276,7 @@ class ChunkScore(object):
 
         :rtype: list of chunks
         """
-        chunks = list(self._correct)
-        return [c[1] for c in chunks]  # discard position information
+        return [c[1] for c in self._correct]  # discard position information
 
     def guessed(self):
         """
@@ -269,11 +285,20 @@ class ChunkScore(object):
 
         :rtype: list of chunks
         """
-        chunks = list(self._guessed)
-        return [c[1] for c in chunks]  # discard position information
+        return [c[1] for c in self._guessed]  # discard position information
+
+    def tokens_per_second(self):
+        """
+        Return the number of tokens chunked per second, or None if
+        no time was recorded.
+
+        :rtype: float
+        """
+        if not self._seconds:
+            return None
+        return self._tokens / self._seconds
 
     def __len__(self):
-        self._updateMeasures()
         return self._tp_num + self._fn_num
 
     def __repr__(self):
@@ -302,6 +327,27 @@ class ChunkScore(object):
         )
 
 
+def _chunk_batch(chunker, gold):
+    """Rechunk a batch of gold standard sentences, returning its ``ChunkScore``."""
+    score = ChunkScore()
+    guessed = chunker.parse_sents([correct.leaves() for correct in gold])
+    for correct, guess in zip(gold, guessed):
+        score.score(correct, guess)
+    return score
+
+
+_worker_chunker = None
+
+
+def _set_worker_chunker(chunker):
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+def _worker_chunk_batch(gold):
+    return _chunk_batch(_worker_chunker, gold)
+
+
 # extract chunks, and assign unique id, the absolute position of
 # the first word of the chunk
 def _chunksets(t, count, chunk_label):
@@ -317,6 +363,13 @@ def _chunksets(t, count, chunk_label):
     return set(chunks)
 
 
+def _add_examples(examples, chunks, max_examples):
+    """Add the first of ``chunks`` to ``examples``, up to ``max_examples``."""
+    if len(examples) < max_examples:
+        chunks = sorted(chunks, key=itemgetter(0))
+        examples.extend(chunks[: max_examples - len(examples)])
+
+
 def tagstr2tree(
     s, chunk_label="NP", root_label="S", sep="/", source_tagset=None, target_tagset=None
 ):
@@ -339,6 +392,8 @@ def tagstr2tree(
 
     WORD_OR_BRACKET = re.compile(r"\[|\]|[^\[\]\s]+")
 
+    if sep is not None and source_tagset and target_tagset:
+        mapper = tag_mapper(source_tagset, target_tagset)
     stack = [Tree(root_label, [])]
     for match in WORD_OR_BRACKET.finditer(s):
         text = match.group()
@@ -358,7 +413,7 @@ def tagstr2tree(
             else:
                 word, tag = str2tuple(text, sep)
                 if source_tagset and target_tagset:
-                    tag = map_tag(source_tagset, target_tagset, tag)
+                    tag = mapper.map_tag(tag)
                 stack[-1].append((word, tag))
 
     if len(stack) != 1:
@@ -89,7 +89,12 @@ from simple_nltk.classify.naivebayes import NaiveBayesClassifier
 from simple_nltk.classify.positivenaivebayes import PositiveNaiveBayesClassifier
 from simple_nltk.classify.decisiontree import DecisionTreeClassifier
 from simple_nltk.classify.rte_classify import rte_classifier, rte_features, RTEFeatureExtractor
-from simple_nltk.classify.util import accuracy, apply_features, log_likelihood
+from simple_nltk.classify.util import (
+    accuracy,
+    apply_features,
+    log_likelihood,
+    ClassifierScore,
+)
 from simple_nltk.classify.scikitlearn import SklearnClassifier
 from simple_nltk.classify.maxent import (
     MaxentClassifier,
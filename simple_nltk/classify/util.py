@@ -11,9 +11,12 @@ Utility functions and classes for classifiers.
 """
 
 import math
+from collections import deque
+from itertools import islice
 
 # from simple_nltk.util import Deprecated
 import simple_nltk.classify.util  # for accuracy & log_likelihood
+from simple_nltk.metrics.confusionmatrix import ConfusionMatrix
 from simple_nltk.util import LazyMap
 
 ######################################################################
@@ -82,18 +85,176 @@ def attested_labels(tokens):
 
 
 def log_likelihood(classifier, gold):
-    results = classifier.prob_classify_many([fs for (fs, l) in gold])
-    ll = [pdist.prob(l) for ((fs, l), pdist) in zip(gold, results)]
-    return math.log(sum(ll) / len(ll))
+    score = evaluate(classifier, gold, accuracy=False, log_likelihood=True)
+    # like the mean over an empty gold list, fails with ZeroDivisionError
+    return math.log(score._prob_sum / score._prob_count)
 
 
 def accuracy(classifier, gold):
-    results = classifier.classify_many([fs for (fs, l) in gold])
-    correct = [l == r for ((fs, l), r) in zip(gold, results)]
-    if correct:
-        return sum(correct) / len(correct)
-    else:
+    result = evaluate(classifier, gold).accuracy()
+    if result is None:
         return 0
+    return result
+
+
+class ClassifierScore(object):
+    """
+    The accumulated results of a classifier on labeled featuresets: its
+    accuracy, the confusion matrix of the gold and predicted labels, the
+    precision, recall and f-measure of each label, and the log likelihood
+    of the gold labels.  Batches of results are added with ``score()``,
+    and the scores of several parts of a test set combined with
+    ``merge()``, so the test set never has to be held in memory.
+    ``evaluate()`` computes the score of a classifier on a test set.
+
+        >>> score = ClassifierScore()
+        >>> gold, guessed = ['a', 'b', 'b', 'a'], ['a', 'b', 'a', 'a']
+        >>> score.score(gold, guessed, [0.9, 0.6, 0.3, 0.8])
+        >>> score.accuracy()
+        0.75
+        >>> print('%.3f' % score.precision('a'))
+        0.667
+        >>> print('%.3f' % score.log_likelihood())
+        -0.431
+    """
+
+    def __init__(self):
+        self._confusion = ConfusionMatrix()
+        self._prob_sum = 0.0
+        self._prob_count = 0
+
+    def score(self, gold, guessed=None, probs=None):
+        """
+        Add a batch of results.
+
+        :param gold: the gold labels
+        :param guessed: the labels predicted by the classifier, if any
+        :param probs: the probabilities the classifier assigned to the gold
+            labels, if any
+        """
+        if guessed is not None:
+            self._confusion.update(gold, guessed)
+        if probs is not None:
+            for prob in probs:
+                self._prob_sum += prob
+            self._prob_count += len(probs)
+
+    def merge(self, other):
+        """Add the results accumulated in another ClassifierScore."""
+        self._confusion.merge(other._confusion)
+        self._prob_sum += other._prob_sum
+        self._prob_count += other._prob_count
+
+    def confusion(self):
+        """
+        :return: The confusion matrix of the gold and predicted labels.
+        :rtype: ConfusionMatrix
+        """
+        return self._confusion
+
+    def accuracy(self):
+        """
+        :return: The fraction of featuresets labeled correctly, or None if
+            no predictions were scored.
+        :rtype: float
+        """
+        return self._confusion.accuracy()
+
+    def log_likelihood(self):
+        """
+        :return: The log of the mean probability of the gold labels, or
+            None if no probabilities were scored.
+        :rtype: float
+        """
+        if not self._prob_count:
+            return None
+        return math.log(self._prob_sum / self._prob_count)
+
+    def precision(self, label):
+        return self._confusion.precision(label)
+
+    def recall(self, label):
+        return self._confusion.recall(label)
+
+    def f_measure(self, label, alpha=0.5):
+        return self._confusion.f_measure(label, alpha)
+
+    def __repr__(self):
+        return "<ClassifierScore: accuracy=%s, log_likelihood=%s>" % (
+            self.accuracy(),
+            self.log_likelihood(),
+        )
+
+
+def _classify_batch(classifier, batch, accuracy, log_likelihood):
+    """The gold labels of a batch of labeled featuresets, with the
+    predicted labels and the probabilities of the gold labels."""
+    featuresets = [fs for (fs, l) in batch]
+    gold = [l for (fs, l) in batch]
+    guessed = probs = None
+    if accuracy:
+        guessed = classifier.classify_many(featuresets)
+    if log_likelihood:
+        results = classifier.prob_classify_many(featuresets)
+        probs = [pdist.prob(l) for (l, pdist) in zip(gold, results)]
+    return gold, guessed, probs
+
+
+_worker_classifier = None
+
+
+def _set_worker_classifier(classifier):
+    global _worker_classifier
+    _worker_classifier = classifier
+
+
+def _worker_classify_batch(args):
+    return _classify_batch(_worker_classifier, *args)
+
+
+def evaluate(
+    classifier, gold, batch_size=1000, processes=1, accuracy=True, log_likelihood=False
+):
+    """
+    Score a classifier on an iterable of ``(featureset, label)`` pairs in
+    a single pass, classifying ``batch_size`` featuresets at a time.  With
+    ``processes > 1`` the batches are classified by a pool of worker
+    processes, with a bounded number of batches in flight, so the test
+    set may be an arbitrarily long stream.
+
+    :param accuracy: whether to predict labels, for the accuracy, the
+        confusion matrix and the per-label scores
+    :param log_likelihood: whether to compute the probabilities of the
+        gold labels, for the log likelihood
+    :rtype: ClassifierScore
+    """
+    score = ClassifierScore()
+    gold = iter(gold)
+    batches = iter(lambda: list(islice(gold, batch_size)), [])
+    if processes <= 1:
+        for batch in batches:
+            score.score(*_classify_batch(classifier, batch, accuracy, log_likelihood))
+        return score
+
+    from multiprocessing import Pool
+
+    pool = Pool(processes, initializer=_set_worker_classifier, initargs=(classifier,))
+    try:
+        pending = deque()
+        for batch in batches:
+            pending.append(
+                pool.apply_async(
+                    _worker_classify_batch, ((batch, accuracy, log_likelihood),)
+                )
+            )
+            if len(pending) >= 2 * processes:
+                score.score(*pending.popleft().get())
+        while pending:
+            score.score(*pending.popleft().get())
+    finally:
+        pool.close()
+        pool.join()
+    return score
 
 
 class CutoffChecker(object):
@@ -26,6 +26,13 @@ class EMClusterer(VectorSpaceClusterer):
     updated in the 'M' step using the maximum likelihood estimate from
     the cluster membership probabilities. This process continues until
     the likelihood of the data does not significantly increase.
+
+    Both steps operate on all of the vectors at once: each covariance
+    matrix is factorised once per iteration (a Cholesky decomposition,
+    or simply its diagonal when ``covariance_type="diag"``), the
+    membership probabilities are computed in log space as one
+    ``(vectors x clusters)`` array, and the M-step updates are matrix
+    products.
     """
 
     def __init__(
@@ -37,6 +44,8 @@ class EMClusterer(VectorSpaceClusterer):
         bias=0.1,
         normalise=False,
         svd_dimensions=None,
+        covariance_type="full",
+        processes=1,
     ):
         """
         Creates an EM clusterer with the given starting parameters,
@@ -47,6 +56,7 @@ class EMClusterer(VectorSpaceClusterer):
         :param  priors: the prior probability for each cluster
         :type   priors: numpy array or seq of float
         :param  covariance_matrices: the covariance matrix for each cluster
+                    (or, for diagonal covariances, the variance vector)
         :type   covariance_matrices: [seq of] numpy array
         :param  conv_threshold: maximum change in likelihood before deemed
                     convergent
@@ -59,14 +69,29 @@ class EMClusterer(VectorSpaceClusterer):
         :param  svd_dimensions: number of dimensions to use in reducing vector
                                dimensionsionality with SVD
         :type   svd_dimensions: int
+        :param  covariance_type: ``"full"`` to learn a full covariance
+                    matrix for each cluster, or ``"diag"`` to learn only
+                    the per-dimension variances
+        :type   covariance_type: str
+        :param  processes: number of worker processes used to compute the
+                    E-step; 1 computes it in the current process
+        :type   processes: int
         """
         VectorSpaceClusterer.__init__(self, normalise, svd_dimensions)
+        if covariance_type not in ("full", "diag"):
+            raise ValueError(
+                "covariance_type must be 'full' or 'diag', not %r" % covariance_type
+            )
         self._means = numpy.array(initial_means, numpy.float64)
         self._num_clusters = len(initial_means)
         self._conv_threshold = conv_threshold
         self._covariance_matrices = covariance_matrices
         self._priors = priors
         self._bias = bias
+        self._covariance_type = covariance_type
+        self._processes = processes
+        # cached factorisation of the current covariance matrices
+        self._factors = None
 
     def num_clusters(self):
         return self._num_clusters
@@ -75,107 +100,179 @@ class EMClusterer(VectorSpaceClusterer):
         assert len(vectors) > 0
 
         # set the parameters to initial values
-        dimensions = len(vectors[0])
+        vectors = numpy.asarray(vectors, numpy.float64)
+        num_vectors, dimensions = vectors.shape
+        diagonal = self._covariance_type == "diag"
         means = self._means
-        priors = self._priors
-        if not priors:
-            priors = self._priors = (
+        if self._priors is None:
+            self._priors = (
                 numpy.ones(self._num_clusters, numpy.float64) / self._num_clusters
             )
-        covariances = self._covariance_matrices
-        if not covariances:
-            covariances = self._covariance_matrices = [
-                numpy.identity(dimensions, numpy.float64)
-                for i in range(self._num_clusters)
-            ]
-
-        # do the E and M steps until the likelihood plateaus
-        lastl = self._loglikelihood(vectors, priors, means, covariances)
-        converged = False
-
-        while not converged:
-            if trace:
-                print("iteration; loglikelihood", lastl)
-            # E-step, calculate hidden variables, h[i,j]
-            h = numpy.zeros((len(vectors), self._num_clusters), numpy.float64)
-            for i in range(len(vectors)):
+        priors = self._priors = numpy.array(self._priors, numpy.float64)
+        if self._covariance_matrices is None:
+            if diagonal:
+                self._covariance_matrices = numpy.ones(
+                    (self._num_clusters, dimensions), numpy.float64
+                )
+            else:
+                self._covariance_matrices = [
+                    numpy.identity(dimensions, numpy.float64)
+                    for i in range(self._num_clusters)
+                ]
+        covariances = self._covariance_matrices = self._check_covariances(
+            self._covariance_matrices, dimensions
+        )
+
+        pool = None
+        if self._processes > 1:
+            from multiprocessing import Pool
+
+            pool = Pool(self._processes)
+
+        try:
+            # do the E and M steps until the likelihood plateaus
+            self._factors = _factorise(covariances, diagonal)
+            log_probs = self._log_joint(vectors, pool)
+            lastl, h = _normalise_log_probs(log_probs)
+            converged = False
+
+            while not converged:
+                if trace:
+                    print("iteration; loglikelihood", lastl)
+
+                # M-step, update parameters - cvm, p, mean
+                sum_h = h.sum(axis=0)
                 for j in range(self._num_clusters):
-                    h[i, j] = priors[j] * self._gaussian(
-                        means[j], covariances[j], vectors[i]
-                    )
-                h[i, :] /= sum(h[i, :])
-
-            # M-step, update parameters - cvm, p, mean
-            for j in range(self._num_clusters):
-                covariance_before = covariances[j]
-                new_covariance = numpy.zeros((dimensions, dimensions), numpy.float64)
-                new_mean = numpy.zeros(dimensions, numpy.float64)
-                sum_hj = 0.0
-                for i in range(len(vectors)):
-                    delta = vectors[i] - means[j]
-                    new_covariance += h[i, j] * numpy.multiply.outer(delta, delta)
-                    sum_hj += h[i, j]
-                    new_mean += h[i, j] * vectors[i]
-                covariances[j] = new_covariance / sum_hj
-                means[j] = new_mean / sum_hj
-                priors[j] = sum_hj / len(vectors)
-
-                # bias term to stop covariance matrix being singular
-                covariances[j] += self._bias * numpy.identity(dimensions, numpy.float64)
-
-            # calculate likelihood - FIXME: may be broken
-            l = self._loglikelihood(vectors, priors, means, covariances)
-
-            # check for convergence
-            if abs(lastl - l) < self._conv_threshold:
-                converged = True
-            lastl = l
+                    delta = vectors - means[j]
+                    weighted = h[:, j, None] * delta
+                    if diagonal:
+                        covariances[j] = (weighted * delta).sum(axis=0) / sum_h[j]
+                        covariances[j] += self._bias
+                    else:
+                        covariances[j] = numpy.dot(weighted.T, delta) / sum_h[j]
+                        # bias term to stop covariance matrix being singular
+                        covariances[j] += self._bias * numpy.identity(
+                            dimensions, numpy.float64
+                        )
+                means[:] = numpy.dot(h.T, vectors) / sum_h[:, None]
+                priors[:] = sum_h / num_vectors
+
+                # E-step, calculate hidden variables, h[i,j], along with the
+                # likelihood of the data under the updated parameters
+                self._factors = _factorise(covariances, diagonal)
+                log_probs = self._log_joint(vectors, pool)
+                l, h = _normalise_log_probs(log_probs)
+
+                # check for convergence
+                if abs(lastl - l) < self._conv_threshold:
+                    converged = True
+                lastl = l
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
     def classify_vectorspace(self, vector):
-        best = None
-        for j in range(self._num_clusters):
-            p = self._priors[j] * self._gaussian(
-                self._means[j], self._covariance_matrices[j], vector
-            )
-            if not best or p > best[0]:
-                best = (p, j)
-        return best[1]
+        return int(numpy.argmax(self._log_joint(numpy.atleast_2d(vector))[0]))
+
+    def classify_vectorspace_many(self, vectors):
+        return numpy.argmax(self._log_joint(numpy.asarray(vectors)), axis=1).tolist()
 
     def likelihood_vectorspace(self, vector, cluster):
-        cid = self.cluster_names().index(cluster)
-        return self._priors[cluster] * self._gaussian(
-            self._means[cluster], self._covariance_matrices[cluster], vector
+        return numpy.exp(self._log_joint(numpy.atleast_2d(vector))[0, cluster])
+
+    def _check_covariances(self, covariances, dimensions):
+        """
+        Returns the covariances as a single array: ``(k, d, d)`` for full
+        covariance matrices, or ``(k, d)`` variance vectors for diagonal ones.
+        """
+        covariances = numpy.array(covariances, numpy.float64)
+        if self._covariance_type == "diag":
+            if covariances.ndim == 3:
+                covariances = numpy.array(
+                    [numpy.diag(cvm) for cvm in covariances], numpy.float64
+                )
+            shape = (self._num_clusters, dimensions)
+        else:
+            shape = (self._num_clusters, dimensions, dimensions)
+        assert covariances.shape == shape, "bad sized covariance matrix, %s" % str(
+            covariances.shape
         )
+        return covariances
 
-    def _gaussian(self, mean, cvm, x):
-        m = len(mean)
-        assert cvm.shape == (m, m), "bad sized covariance matrix, %s" % str(cvm.shape)
-        try:
-            det = numpy.linalg.det(cvm)
-            inv = numpy.linalg.inv(cvm)
-            a = det ** -0.5 * (2 * numpy.pi) ** (-m / 2.0)
-            dx = x - mean
-            print(dx, inv)
-            b = -0.5 * numpy.dot(numpy.dot(dx, inv), dx)
-            return a * numpy.exp(b)
-        except OverflowError:
-            # happens when the exponent is negative infinity - i.e. b = 0
-            # i.e. the inverse of cvm is huge (cvm is almost zero)
-            return 0
-
-    def _loglikelihood(self, vectors, priors, means, covariances):
-        llh = 0.0
-        for vector in vectors:
-            p = 0
-            for j in range(len(priors)):
-                p += priors[j] * self._gaussian(means[j], covariances[j], vector)
-            llh += numpy.log(p)
-        return llh
+    def _log_joint(self, vectors, pool=None):
+        """
+        Returns the ``(vectors x clusters)`` array of log(prior * gaussian
+        density), computing the rows in the worker ``pool`` if one is given.
+        """
+        if self._factors is None:
+            dimensions = numpy.shape(vectors)[1]
+            self._covariance_matrices = self._check_covariances(
+                self._covariance_matrices, dimensions
+            )
+            self._factors = _factorise(
+                self._covariance_matrices, self._covariance_type == "diag"
+            )
+        if pool is None:
+            log_densities = _log_gaussians(vectors, self._means, self._factors)
+        else:
+            chunks = numpy.array_split(vectors, self._processes)
+            log_densities = numpy.vstack(
+                pool.starmap(
+                    _log_gaussians,
+                    [(chunk, self._means, self._factors) for chunk in chunks],
+                )
+            )
+        return log_densities + numpy.log(self._priors)
 
     def __repr__(self):
         return "<EMClusterer means=%s>" % list(self._means)
 
 
+def _factorise(covariances, diagonal):
+    """
+    Factorises each cluster's covariance once, returning the
+    log-determinants, the whitening factors (the inverse standard
+    deviations for diagonal covariances, or the inverse of the lower
+    Cholesky factor for full covariance matrices) and whether the
+    covariances are diagonal.
+    """
+    if diagonal:
+        return numpy.log(covariances).sum(axis=1), covariances ** -0.5, True
+    chol = numpy.linalg.cholesky(covariances)
+    log_dets = 2 * numpy.log(numpy.diagonal(chol, axis1=1, axis2=2)).sum(axis=1)
+    identity = numpy.broadcast_to(numpy.identity(chol.shape[1]), chol.shape)
+    return log_dets, numpy.linalg.solve(chol, identity), False
+
+
+def _log_gaussians(vectors, means, factors):
+    """
+    Returns the ``(vectors x clusters)`` array of log gaussian densities.
+    """
+    log_dets, whiteners, diagonal = factors
+    num_clusters, dimensions = means.shape
+    mahalanobis = numpy.empty((len(vectors), num_clusters), numpy.float64)
+    for j in range(num_clusters):
+        delta = vectors - means[j]
+        if diagonal:
+            z = delta * whiteners[j]
+        else:
+            z = numpy.dot(delta, whiteners[j].T)
+        mahalanobis[:, j] = numpy.einsum("ij,ij->i", z, z)
+    return -0.5 * (dimensions * numpy.log(2 * numpy.pi) + log_dets + mahalanobis)
+
+
+def _normalise_log_probs(log_probs):
+    """
+    Returns the total log-likelihood of the data and the membership
+    probabilities, given the log joint probabilities of each vector and
+    cluster.
+    """
+    top = log_probs.max(axis=1, keepdims=True)
+    log_norm = top + numpy.log(numpy.exp(log_probs - top).sum(axis=1, keepdims=True))
+    return log_norm.sum(), numpy.exp(log_probs - log_norm)
+
+
 def demo():
     """
     Non-interactive demonstration of the clusterers with simple 2-D data.
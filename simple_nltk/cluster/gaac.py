@@ -10,7 +10,12 @@ try:
 except ImportError:
     pass
 
-from simple_nltk.cluster.util import VectorSpaceClusterer, Dendrogram, cosine_distance
+from simple_nltk.cluster.util import (
+    VectorSpaceClusterer,
+    Dendrogram,
+    cosine_distance,
+    _issparse,
+)
 
 
 class GAAClusterer(VectorSpaceClusterer):
@@ -23,20 +28,43 @@ class GAAClusterer(VectorSpaceClusterer):
     <= c <= N, can be found by cutting the dendrogram at depth c.
 
     This clusterer uses the cosine similarity metric only, which allows for
-    efficient speed-up in the clustering process.
+    efficient speed-up in the clustering process: the initial distances
+    are computed with a normalised matrix product, and the closest pair of
+    clusters is found from a cache of each cluster's nearest neighbour
+    rather than by searching every pair at each merge.
     """
 
-    def __init__(self, num_clusters=1, normalise=True, svd_dimensions=None):
+    def __init__(
+        self, num_clusters=1, normalise=True, svd_dimensions=None, dtype="float64"
+    ):
+        """
+        :param num_clusters:    the number of clusters to stop merging at
+        :type num_clusters:     int
+        :param normalise:       should vectors be normalised to length 1
+        :type normalise:        boolean
+        :param svd_dimensions:  number of dimensions to use in reducing vector
+                                dimensionsionality with SVD
+        :type svd_dimensions:   int
+        :param dtype:           the numpy type used to store the pairwise
+                                distances; ``"float32"`` halves the memory
+                                needed for large inputs
+        :type dtype:            str or numpy.dtype
+        """
         VectorSpaceClusterer.__init__(self, normalise, svd_dimensions)
         self._num_clusters = num_clusters
         self._dendrogram = None
         self._groups_values = None
+        self._dtype = dtype
 
     def cluster(self, vectors, assign_clusters=False, trace=False):
         # stores the merge order
-        self._dendrogram = Dendrogram(
-            [numpy.array(vector, numpy.float64) for vector in vectors]
-        )
+        if _issparse(vectors):
+            vectors = vectors.tocsr()
+            # dense leaves, which the dendrogram compares when grouping
+            items = [vectors[i].toarray().ravel() for i in range(vectors.shape[0])]
+        else:
+            items = [numpy.array(vector, numpy.float64) for vector in vectors]
+        self._dendrogram = Dendrogram(items)
         return VectorSpaceClusterer.cluster(self, vectors, assign_clusters, trace)
 
     def cluster_vectorspace(self, vectors, trace=False):
@@ -46,30 +74,49 @@ class GAAClusterer(VectorSpaceClusterer):
         cluster_count = N
         index_map = numpy.arange(N)
 
-        # construct the similarity matrix
-        dims = (N, N)
-        dist = numpy.ones(dims, dtype=numpy.float) * numpy.inf
-        for i in range(N):
-            for j in range(i + 1, N):
-                dist[i, j] = cosine_distance(vectors[i], vectors[j])
+        # construct the condensed distance matrix, holding the distance
+        # between clusters x < y at offsets[x] + y
+        dist = _CondensedDistances(vectors, self._dtype)
+
+        # the nearest neighbour of each cluster amongst those after it;
+        # exact ties go to the first pair, as with a full argmin, but the
+        # distances are rounded differently from the square matrix, so
+        # nearly tied merges may be made in another order
+        nearest = numpy.zeros(N, numpy.intp)
+        nearest_dist = numpy.full(N, numpy.inf)
+        for x in range(N - 1):
+            dist.update_nearest(x, nearest, nearest_dist)
 
         while cluster_count > max(self._num_clusters, 1):
-            i, j = numpy.unravel_index(dist.argmin(), dims)
+            i = int(nearest_dist.argmin())
+            j = int(nearest[i])
             if trace:
                 print("merging %d and %d" % (i, j))
 
-            # update similarities for merging i and j
-            self._merge_similarities(dist, cluster_len, i, j)
-
-            # remove j
-            dist[:, j] = numpy.inf
-            dist[j, :] = numpy.inf
+            # update similarities for merging i and j, and remove j
+            changed = self._merge_similarities(dist, cluster_len, i, j)
 
             # merge the clusters
             cluster_len[i] = cluster_len[i] + cluster_len[j]
             self._dendrogram.merge(index_map[i], index_map[j])
             cluster_count -= 1
 
+            # update the nearest neighbours of the affected clusters
+            nearest_dist[j] = numpy.inf
+            dist.update_nearest(i, nearest, nearest_dist)
+            before, changed = nearest[:i], changed[:i]
+            stale = (before == i) | (before == j)
+            closer = ~stale & (
+                (changed < nearest_dist[:i])
+                | ((changed == nearest_dist[:i]) & (i < before))
+            )
+            before[closer] = i
+            nearest_dist[:i][closer] = changed[closer]
+            for x in numpy.flatnonzero(stale):
+                dist.update_nearest(x, nearest, nearest_dist)
+            for x in i + 1 + numpy.flatnonzero(nearest[i + 1 : j] == j):
+                dist.update_nearest(x, nearest, nearest_dist)
+
             # update the index map to reflect the indexes if we
             # had removed j
             index_map[j + 1 :] -= 1
@@ -85,33 +132,18 @@ class GAAClusterer(VectorSpaceClusterer):
         j_weight = cluster_len[j]
         weight_sum = i_weight + j_weight
 
-        # update for x<i
-        dist[:i, i] = dist[:i, i] * i_weight + dist[:i, j] * j_weight
-        dist[:i, i] /= weight_sum
-        # update for i<x<j
-        dist[i, i + 1 : j] = (
-            dist[i, i + 1 : j] * i_weight + dist[i + 1 : j, j] * j_weight
-        )
-        # update for i<j<x
-        dist[i, j + 1 :] = dist[i, j + 1 :] * i_weight + dist[j, j + 1 :] * j_weight
-        dist[i, i + 1 :] /= weight_sum
+        merged = (dist.row(i) * i_weight + dist.row(j) * j_weight) / weight_sum
+        dist.set_row(i, merged)
+        dist.set_row(j, numpy.inf)
+        return dist.row(i)
 
     def update_clusters(self, num_clusters):
         clusters = self._dendrogram.groups(num_clusters)
         self._centroids = []
         for cluster in clusters:
             assert len(cluster) > 0
-            if self._should_normalise:
-                centroid = self._normalise(cluster[0])
-            else:
-                centroid = numpy.array(cluster[0])
-            for vector in cluster[1:]:
-                if self._should_normalise:
-                    centroid += self._normalise(vector)
-                else:
-                    centroid += vector
-            centroid /= len(cluster)
-            self._centroids.append(centroid)
+            # the centroid of the normalised and reduced vectors
+            self._centroids.append(self.vectors(cluster).mean(axis=0))
         self._num_clusters = len(self._centroids)
 
     def classify_vectorspace(self, vector):
@@ -123,6 +155,14 @@ class GAAClusterer(VectorSpaceClusterer):
                 best = (dist, i)
         return best[1]
 
+    def classify_vectorspace_many(self, vectors):
+        vectors = numpy.asarray(vectors, numpy.float64)
+        centroids = numpy.array(self._centroids, numpy.float64)
+        similarities = numpy.dot(vectors, centroids.T)
+        similarities /= numpy.sqrt((vectors * vectors).sum(axis=1))[:, None]
+        similarities /= numpy.sqrt((centroids * centroids).sum(axis=1))
+        return numpy.argmax(similarities, axis=1).tolist()
+
     def dendrogram(self):
         """
         :return: The dendrogram representing the current clustering
@@ -137,6 +177,66 @@ class GAAClusterer(VectorSpaceClusterer):
         return "<GroupAverageAgglomerative Clusterer n=%d>" % self._num_clusters
 
 
+class _CondensedDistances(object):
+    """
+    The upper triangle of a symmetric matrix of cosine distances, stored
+    as a flat array of ``N * (N - 1) / 2`` entries.  The entries of row
+    ``x`` (the distances to every ``y > x``) are contiguous.
+    """
+
+    # number of rows of the dense similarity matrix computed at a time
+    _BLOCK_SIZE = 1024
+
+    def __init__(self, vectors, dtype):
+        vectors = numpy.asarray(vectors, numpy.float64)
+        N = self._size = len(vectors)
+        x = numpy.arange(N)
+        self._offsets = N * x - x * (x + 1) // 2 - x - 1
+        self._values = numpy.empty(N * (N - 1) // 2, dtype)
+
+        # one normalised matrix product per block of rows
+        units = vectors / numpy.sqrt((vectors * vectors).sum(axis=1))[:, None]
+        for start in range(0, N, self._BLOCK_SIZE):
+            end = min(start + self._BLOCK_SIZE, N)
+            block = 1 - numpy.dot(units[start:end], units.T)
+            for x in range(start, min(end, N - 1)):
+                self._values[self._row_slice(x)] = block[x - start, x + 1 :]
+
+    def _row_slice(self, x):
+        start = self._offsets[x] + x + 1
+        return slice(start, start + self._size - x - 1)
+
+    def _column_index(self, y):
+        # the positions of the entries (x, y) for every x < y
+        return self._offsets[:y] + y
+
+    def row(self, x):
+        """
+        The distances from ``x`` to every cluster, with ``inf`` for ``x``.
+        """
+        row = numpy.empty(self._size, numpy.float64)
+        row[:x] = self._values[self._column_index(x)]
+        row[x] = numpy.inf
+        row[x + 1 :] = self._values[self._row_slice(x)]
+        return row
+
+    def set_row(self, x, row):
+        if numpy.isscalar(row):
+            row = numpy.full(self._size, row)
+        self._values[self._column_index(x)] = row[:x]
+        self._values[self._row_slice(x)] = row[x + 1 :]
+
+    def update_nearest(self, x, nearest, nearest_dist):
+        """
+        Recompute the nearest cluster after ``x``, and its distance.
+        """
+        values = self._values[self._row_slice(x)]
+        if len(values):
+            y = int(values.argmin())
+            nearest[x] = x + 1 + y
+            nearest_dist[x] = values[y]
+
+
 def demo():
     """
     Non-interactive demonstration of the clusterers with simple 2-D data.
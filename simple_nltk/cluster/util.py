@@ -24,6 +24,12 @@ class VectorSpaceClusterer(ClusterI):
     Abstract clusterer which takes tokens and maps them into a vector space.
     Optionally performs singular value decomposition to reduce the
     dimensionality.
+
+    The vectors may be given as a sequence of numpy arrays, a two
+    dimensional numpy array, or a ``scipy.sparse`` matrix with one row per
+    vector.  Sparse matrices are normalised and reduced without being made
+    dense; they are only converted to dense arrays when clustered without
+    SVD.
     """
 
     def __init__(self, normalise=False, svd_dimensions=None):
@@ -39,29 +45,34 @@ class VectorSpaceClusterer(ClusterI):
         self._svd_dimensions = svd_dimensions
 
     def cluster(self, vectors, assign_clusters=False, trace=False):
-        assert len(vectors) > 0
+        assert vectors.shape[0] > 0 if _issparse(vectors) else len(vectors) > 0
+
+        if _issparse(vectors):
+            vectors = vectors.tocsr().astype(numpy.float64)
+        elif self._should_normalise or self._svd_dimensions:
+            vectors = numpy.asarray(vectors, numpy.float64)
 
         # normalise the vectors
         if self._should_normalise:
-            vectors = list(map(self._normalise, vectors))
+            vectors = _normalise_rows(vectors)
 
         # use SVD to reduce the dimensionality
-        if self._svd_dimensions and self._svd_dimensions < len(vectors[0]):
-            [u, d, vt] = numpy.linalg.svd(numpy.transpose(numpy.array(vectors)))
-            S = d[: self._svd_dimensions] * numpy.identity(
-                self._svd_dimensions, numpy.float64
-            )
-            T = u[:, : self._svd_dimensions]
-            Dt = vt[: self._svd_dimensions, :]
-            vectors = numpy.transpose(numpy.dot(S, Dt))
-            self._Tt = numpy.transpose(T)
+        if self._svd_dimensions and self._svd_dimensions < vectors.shape[1]:
+            u, d, vt = _truncated_svd(vectors, self._svd_dimensions)
+            vectors = u * d
+            self._Tt = vt
+        elif _issparse(vectors):
+            vectors = vectors.toarray()
 
         # call abstract method to cluster the vectors
         self.cluster_vectorspace(vectors, trace)
 
         # assign the vectors to clusters
         if assign_clusters:
-            return [self.classify(vector) for vector in vectors]
+            return [
+                self.cluster_name(cluster)
+                for cluster in self.classify_vectorspace_many(vectors)
+            ]
 
     @abstractmethod
     def cluster_vectorspace(self, vectors, trace):
@@ -77,12 +88,33 @@ class VectorSpaceClusterer(ClusterI):
         cluster = self.classify_vectorspace(vector)
         return self.cluster_name(cluster)
 
+    def classify_many(self, vectors):
+        """
+        Classifies each of the vectors, which are normalised and projected
+        together rather than one at a time.
+
+        :param vectors: a sequence of vectors, a two dimensional array or a
+            sparse matrix with one row per vector
+        :rtype: list
+        """
+        vectors = self.vectors(vectors)
+        return [
+            self.cluster_name(cluster)
+            for cluster in self.classify_vectorspace_many(vectors)
+        ]
+
     @abstractmethod
     def classify_vectorspace(self, vector):
         """
         Returns the index of the appropriate cluster for the vector.
         """
 
+    def classify_vectorspace_many(self, vectors):
+        """
+        Returns the index of the appropriate cluster for each of the vectors.
+        """
+        return [self.classify_vectorspace(vector) for vector in vectors]
+
     def likelihood(self, vector, label):
         if self._should_normalise:
             vector = self._normalise(vector)
@@ -107,6 +139,23 @@ class VectorSpaceClusterer(ClusterI):
             vector = numpy.dot(self._Tt, vector)
         return vector
 
+    def vectors(self, vectors):
+        """
+        Returns the vectors, as a two dimensional array, after normalisation
+        and dimensionality reduction
+        """
+        if _issparse(vectors):
+            vectors = vectors.tocsr().astype(numpy.float64)
+        else:
+            vectors = numpy.asarray(vectors, numpy.float64)
+        if self._should_normalise:
+            vectors = _normalise_rows(vectors)
+        if self._Tt is not None:
+            vectors = vectors @ self._Tt.T
+        elif _issparse(vectors):
+            vectors = vectors.toarray()
+        return numpy.asarray(vectors)
+
     def _normalise(self, vector):
         """
         Normalises the vector to unit length.
@@ -114,6 +163,57 @@ class VectorSpaceClusterer(ClusterI):
         return vector / sqrt(numpy.dot(vector, vector))
 
 
+def _issparse(vectors):
+    """
+    Is ``vectors`` a ``scipy.sparse`` matrix?  Scipy is only needed by
+    callers which pass sparse matrices, so it is not imported eagerly.
+    """
+    try:
+        from scipy.sparse import issparse
+    except ImportError:
+        return False
+    return issparse(vectors)
+
+
+def _normalise_rows(vectors):
+    """
+    Normalises every row of a dense or sparse matrix to unit length.
+    """
+    if _issparse(vectors):
+        from scipy.sparse import diags
+
+        norms = numpy.sqrt(numpy.asarray(vectors.multiply(vectors).sum(axis=1)))
+        return diags(1 / norms.ravel()) @ vectors
+    return vectors / numpy.sqrt((vectors * vectors).sum(axis=1))[:, None]
+
+
+def _truncated_svd(matrix, k, oversamples=10, iterations=7, seed=0):
+    """
+    Returns the ``k`` largest singular values of ``matrix`` with their left
+    and right singular vectors, as ``(u, d, vt)``.
+
+    Small dense matrices are decomposed exactly.  Otherwise a randomised
+    range finder (Halko, Martinsson & Tropp, 2011) projects the matrix onto
+    ``k + oversamples`` dimensions, so only matrix products with the
+    (possibly sparse) input are needed.
+    """
+    rows, columns = matrix.shape
+    width = k + oversamples
+    if width >= min(rows, columns):
+        if _issparse(matrix):
+            matrix = matrix.toarray()
+        u, d, vt = numpy.linalg.svd(matrix, full_matrices=False)
+        return u[:, :k], d[:k], vt[:k]
+
+    rng = numpy.random.RandomState(seed)
+    q, _ = numpy.linalg.qr(matrix @ rng.normal(size=(columns, width)))
+    for i in range(iterations):
+        q, _ = numpy.linalg.qr(matrix.T @ q)
+        q, _ = numpy.linalg.qr(matrix @ q)
+    u, d, vt = numpy.linalg.svd(numpy.asarray((matrix.T @ q).T), full_matrices=False)
+    return numpy.dot(q, u[:, :k]), d[:k], vt[:k]
+
+
 def euclidean_distance(u, v):
     """
     Returns the euclidean distance between vectors u and v. This is equivalent
@@ -32,6 +32,11 @@ measures are provided in bigram_measures and trigram_measures.
 
 import itertools as _itertools
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from simple_nltk.probability import FreqDist
 from simple_nltk.util import ngrams
 
@@ -79,14 +84,63 @@ class AbstractCollocationFinder(object):
             )
 
     @classmethod
-    def from_documents(cls, documents):
+    def from_documents(cls, documents, processes=1, shard_size=1000, min_freq=None):
         """Constructs a collocation finder given a collection of documents,
         each of which is a list (or iterable) of tokens.
+
+        Since no ngram spans two documents, the documents may be counted
+        in shards of ``shard_size`` documents, by ``processes`` worker
+        processes, and the finders for the shards merged with ``update()``.
+        If ``min_freq`` is given, ``apply_freq_filter(min_freq)`` is applied
+        to each shard as well as to the merged finder, which bounds the
+        memory used on large corpora; an ngram whose occurrences are spread
+        thinly over many shards may then be dropped although its total
+        frequency reaches ``min_freq``.
         """
-        # return cls.from_words(_itertools.chain(*documents))
-        return cls.from_words(
-            cls._build_new_documents(documents, cls.default_ws, pad_right=True)
-        )
+        if processes == 1 and min_freq is None:
+            # return cls.from_words(_itertools.chain(*documents))
+            return cls.from_words(
+                cls._build_new_documents(documents, cls.default_ws, pad_right=True)
+            )
+
+        shards = _shards(documents, shard_size)
+        pool = None
+        try:
+            if processes > 1:
+                from multiprocessing import Pool
+
+                pool = Pool(processes)
+                finders = pool.imap(
+                    _count_shard, ((cls, shard, min_freq) for shard in shards)
+                )
+            else:
+                finders = (_count_shard((cls, shard, min_freq)) for shard in shards)
+
+            finder = next(finders, None)
+            if finder is None:
+                return cls.from_words([])
+            for shard_finder in finders:
+                finder.update(shard_finder)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if min_freq is not None:
+            finder.apply_freq_filter(min_freq)
+        return finder
+
+    def update(self, other):
+        """Adds the counts of another finder of the same type, such as one
+        built from another part of the corpus, to this finder.
+        """
+        if type(other) is not type(self):
+            raise TypeError(
+                "Cannot merge %s into %s" % (type(other).__name__, type(self).__name__)
+            )
+        for name in self._freqdists:
+            getattr(self, name).update(getattr(other, name))
+        self.N = self.word_fd.N()
 
     @staticmethod
     def _ngram_freqdist(words, n):
@@ -118,10 +172,52 @@ class AbstractCollocationFinder(object):
         """
         self._apply_filter(lambda ng, f: any(fn(w) for w in ng))
 
+    def marginals(self):
+        """Returns the candidate ngrams with a non-zero count, together with
+        their marginals as numpy arrays, in the form of the arguments taken
+        by the association measures in ``simple_nltk.metrics.association``.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _counts(fd, keys):
+        """The counts in fd of each of the keys, as a numpy array."""
+        return numpy.fromiter((fd[key] for key in keys), numpy.float64, len(keys))
+
+    def _score_arrays(self, score_fn):
+        """Returns the candidate ngrams and a numpy array of their scores,
+        by calling score_fn once with the arrays of marginals.  Returns
+        None if score_fn cannot be evaluated on arrays, or gives some
+        scores that are not finite numbers.
+        """
+        if numpy is None:
+            return None
+        try:
+            ngrams, marginals = self.marginals()
+        except NotImplementedError:
+            return None
+        with numpy.errstate(all="ignore"):
+            try:
+                scores = score_fn(*marginals)
+            except (ArithmeticError, NotImplementedError, TypeError, ValueError):
+                return None
+        if not (
+            isinstance(scores, numpy.ndarray)
+            and scores.shape == (len(ngrams),)
+            and numpy.isfinite(scores).all()
+        ):
+            return None
+        return ngrams, scores
+
     def _score_ngrams(self, score_fn):
         """Generates of (ngram, score) pairs as determined by the scoring
         function provided.
         """
+        scored = self._score_arrays(score_fn)
+        if scored is not None:
+            ngrams, scores = scored
+            yield from zip(ngrams, scores.tolist())
+            return
         for tup in self.ngram_fd:
             score = self.score_ngram(score_fn, *tup)
             if score is not None:
@@ -135,17 +231,37 @@ class AbstractCollocationFinder(object):
 
     def nbest(self, score_fn, n):
         """Returns the top n ngrams when scored by the given function."""
-        return [p for p, s in self.score_ngrams(score_fn)[:n]]
+        scored = self._score_arrays(score_fn)
+        if scored is None:
+            return [p for p, s in self.score_ngrams(score_fn)[:n]]
+
+        # only the candidates scoring at least the nth best score are sorted
+        ngrams, scores = scored
+        if 0 < n < len(scores):
+            threshold = numpy.partition(scores, len(scores) - n)[len(scores) - n]
+            best = numpy.flatnonzero(scores >= threshold)
+        else:
+            best = numpy.arange(len(scores))
+        best = sorted(best.tolist(), key=lambda i: (-scores[i], ngrams[i]))
+        return [ngrams[i] for i in best[:n]]
 
     def above_score(self, score_fn, min_score):
         """Returns a sequence of ngrams, ordered by decreasing score, whose
         scores each exceed the given minimum score.
         """
-        for ngram, score in self.score_ngrams(score_fn):
-            if score > min_score:
-                yield ngram
-            else:
-                break
+        scored = self._score_arrays(score_fn)
+        if scored is None:
+            for ngram, score in self.score_ngrams(score_fn):
+                if score > min_score:
+                    yield ngram
+                else:
+                    break
+            return
+
+        ngrams, scores = scored
+        above = numpy.flatnonzero(scores > min_score).tolist()
+        for i in sorted(above, key=lambda i: (-scores[i], ngrams[i])):
+            yield ngrams[i]
 
 
 class BigramCollocationFinder(AbstractCollocationFinder):
@@ -155,6 +271,7 @@ class BigramCollocationFinder(AbstractCollocationFinder):
     """
 
     default_ws = 2
+    _freqdists = ("word_fd", "ngram_fd")
 
     def __init__(self, word_fd, bigram_fd, window_size=2):
         """Construct a BigramCollocationFinder, given FreqDists for
@@ -185,6 +302,18 @@ class BigramCollocationFinder(AbstractCollocationFinder):
                     bfd[(w1, w2)] += 1
         return cls(wfd, bfd, window_size=window_size)
 
+    def update(self, other):
+        if type(other) is type(self) and other.window_size != self.window_size:
+            raise ValueError("Cannot merge finders with different window sizes")
+        AbstractCollocationFinder.update(self, other)
+
+    def marginals(self):
+        ngrams = [ngram for ngram, freq in self.ngram_fd.items() if freq]
+        n_ii = self._counts(self.ngram_fd, ngrams) / (self.window_size - 1.0)
+        n_ix = self._counts(self.word_fd, [w1 for w1, w2 in ngrams])
+        n_xi = self._counts(self.word_fd, [w2 for w1, w2 in ngrams])
+        return ngrams, (n_ii, (n_ix, n_xi), self.N)
+
     def score_ngram(self, score_fn, w1, w2):
         """Returns the score for a given bigram using the given scoring
         function.  Following Church and Hanks (1990), counts are scaled by
@@ -206,6 +335,7 @@ class TrigramCollocationFinder(AbstractCollocationFinder):
     """
 
     default_ws = 3
+    _freqdists = ("word_fd", "bigram_fd", "wildcard_fd", "ngram_fd")
 
     def __init__(self, word_fd, bigram_fd, wildcard_fd, trigram_fd):
         """Construct a TrigramCollocationFinder, given FreqDists for
@@ -250,6 +380,18 @@ class TrigramCollocationFinder(AbstractCollocationFinder):
         """
         return BigramCollocationFinder(self.word_fd, self.bigram_fd)
 
+    def marginals(self):
+        ngrams = [ngram for ngram, freq in self.ngram_fd.items() if freq]
+        counts = self._counts
+        n_iii = counts(self.ngram_fd, ngrams)
+        n_iix = counts(self.bigram_fd, [(w1, w2) for w1, w2, w3 in ngrams])
+        n_ixi = counts(self.wildcard_fd, [(w1, w3) for w1, w2, w3 in ngrams])
+        n_xii = counts(self.bigram_fd, [(w2, w3) for w1, w2, w3 in ngrams])
+        n_ixx = counts(self.word_fd, [w1 for w1, w2, w3 in ngrams])
+        n_xix = counts(self.word_fd, [w2 for w1, w2, w3 in ngrams])
+        n_xxi = counts(self.word_fd, [w3 for w1, w2, w3 in ngrams])
+        return ngrams, (n_iii, (n_iix, n_ixi, n_xii), (n_ixx, n_xix, n_xxi), self.N)
+
     def score_ngram(self, score_fn, w1, w2, w3):
         """Returns the score for a given trigram using the given scoring
         function.
@@ -273,6 +415,7 @@ class QuadgramCollocationFinder(AbstractCollocationFinder):
     """
 
     default_ws = 4
+    _freqdists = ("word_fd", "ngram_fd", "ii", "iii", "ixi", "ixxi", "iixi", "ixii")
 
     def __init__(self, word_fd, quadgram_fd, ii, iii, ixi, ixxi, iixi, ixii):
         """Construct a QuadgramCollocationFinder, given FreqDists for appearances of words,
@@ -322,6 +465,44 @@ class QuadgramCollocationFinder(AbstractCollocationFinder):
 
         return cls(ixxx, iiii, ii, iii, ixi, ixxi, iixi, ixii)
 
+    def marginals(self):
+        ngrams = [ngram for ngram, freq in self.ngram_fd.items() if freq]
+        counts = self._counts
+
+        def select(fd, *positions):
+            keys = [tuple(ngram[i] for i in positions) for ngram in ngrams]
+            if len(positions) == 1:
+                keys = [key[0] for key in keys]
+            return counts(fd, keys)
+
+        return (
+            ngrams,
+            (
+                counts(self.ngram_fd, ngrams),
+                (
+                    select(self.iii, 0, 1, 2),
+                    select(self.iixi, 0, 1, 3),
+                    select(self.ixii, 0, 2, 3),
+                    select(self.iii, 1, 2, 3),
+                ),
+                (
+                    select(self.ii, 0, 1),
+                    select(self.ixi, 0, 2),
+                    select(self.ixxi, 0, 3),
+                    select(self.ixi, 1, 3),
+                    select(self.ii, 2, 3),
+                    select(self.ii, 1, 2),
+                ),
+                (
+                    select(self.word_fd, 0),
+                    select(self.word_fd, 1),
+                    select(self.word_fd, 2),
+                    select(self.word_fd, 3),
+                ),
+                self.N,
+            ),
+        )
+
     def score_ngram(self, score_fn, w1, w2, w3, w4):
         n_all = self.N
         n_iiii = self.ngram_fd[(w1, w2, w3, w4)]
@@ -352,6 +533,28 @@ class QuadgramCollocationFinder(AbstractCollocationFinder):
         )
 
 
+def _shards(documents, shard_size):
+    """Splits an iterable of documents into lists of shard_size documents."""
+    documents = iter(documents)
+    while True:
+        shard = [list(doc) for doc in _itertools.islice(documents, shard_size)]
+        if not shard:
+            return
+        yield shard
+
+
+def _count_shard(args):
+    """Builds the finder for one shard of documents; called by the worker
+    processes of ``from_documents()``."""
+    cls, documents, min_freq = args
+    finder = cls.from_words(
+        cls._build_new_documents(documents, cls.default_ws, pad_right=True)
+    )
+    if min_freq is not None:
+        finder.apply_freq_filter(min_freq)
+    return finder
+
+
 def demo(scorer=None, compare_scorer=None):
     """Finds bigram collocations in the files of the WebText corpus."""
     from simple_nltk.metrics import (
@@ -25,6 +25,7 @@ from simple_nltk.metrics.confusionmatrix import ConfusionMatrix
 from simple_nltk.metrics.distance import (
     edit_distance,
     edit_distance_align,
+    EditDistanceIndex,
     binary_distance,
     jaccard_distance,
     masi_distance,
@@ -70,10 +70,15 @@ Expected results from the Artstein and Poesio survey paper:
 """
 
 import logging
+from array import array
 from itertools import groupby
 from operator import itemgetter
 
-from simple_nltk.probability import FreqDist, ConditionalFreqDist
+try:
+    import numpy
+except ImportError:
+    pass
+
 from simple_nltk.internals import deprecated
 
 from simple_nltk.metrics.distance import binary_distance
@@ -110,6 +115,7 @@ class AnnotationTask(object):
         self.K = set()
         self.C = set()
         self.data = []
+        self._reset_index()
         if data is not None:
             self.load_array(data)
 
@@ -133,6 +139,87 @@ class AnnotationTask(object):
             self.K.add(labels)
             self.I.add(item)
             self.data.append({"coder": coder, "labels": labels, "item": item})
+        self._index(self.data[len(self._ids) // 3 :])
+
+    def _reset_index(self):
+        self._coder_ids = {}
+        self._item_ids = {}
+        self._label_ids = {}
+        # the coder, item and label ids of each record, consecutively
+        self._ids = array("q")
+        self._counts = None
+
+    def _index(self, records):
+        """Assign ids to the coders, items and labels of the records, in
+        order of first occurrence, and append the ids of each record."""
+        coder_ids = self._coder_ids
+        item_ids = self._item_ids
+        label_ids = self._label_ids
+        ids = []
+        for x in records:
+            ids.append(coder_ids.setdefault(x["coder"], len(coder_ids)))
+            ids.append(item_ids.setdefault(x["item"], len(item_ids)))
+            ids.append(label_ids.setdefault(x["labels"], len(label_ids)))
+        self._ids.extend(ids)
+        self._counts = None
+
+    def _count(self):
+        """
+        Index the coders, items and labels, and count the data into:
+
+            - ``assigned``, the coder x item matrix of the index of the label
+              each coder assigned to each item, or -1 if none
+            - ``coder_label``, the coder x label matrix of label counts
+            - ``item_label``, the item x label matrix of label counts
+            - ``dist``, the label x label matrix of distances
+
+        The counts are kept until more data is loaded.
+        """
+        if len(self._ids) != 3 * len(self.data):
+            # the data was changed other than through load_array()
+            self._reset_index()
+            self._index(self.data)
+        if self._counts is not None:
+            return self._counts
+
+        ncoders = len(self._coder_ids)
+        nitems = len(self._item_ids)
+        labels = list(self._label_ids)
+        ids = numpy.frombuffer(self._ids, dtype=numpy.int64).reshape(-1, 3)
+        c, i, k = ids[:, 0], ids[:, 1], ids[:, 2]
+
+        assigned = numpy.full((ncoders, nitems), -1, dtype=numpy.int64)
+        # if a coder labelled an item more than once, the first label counts
+        assigned[c[::-1], i[::-1]] = k[::-1]
+        coder_label = numpy.bincount(
+            c * len(labels) + k, minlength=ncoders * len(labels)
+        ).reshape(ncoders, len(labels))
+        item_label = numpy.bincount(
+            i * len(labels) + k, minlength=nitems * len(labels)
+        ).reshape(nitems, len(labels))
+        dist = numpy.array(
+            [[float(self.distance(j, l)) for l in labels] for j in labels]
+        ).reshape(len(labels), len(labels))
+
+        self._counts = dict(
+            coders=self._coder_ids,
+            items=self._item_ids,
+            label_ids=self._label_ids,
+            assigned=assigned,
+            coder_label=coder_label.astype(numpy.float64),
+            item_label=item_label.astype(numpy.float64),
+            dist=dist,
+        )
+        return self._counts
+
+    def _pair_distances(self, cA, cB):
+        """The distances between the labels assigned by coders cA and cB to
+        each of the items labelled by both."""
+        counts = self._count()
+        a = counts["assigned"][counts["coders"][cA]]
+        b = counts["assigned"][counts["coders"][cB]]
+        both = (a >= 0) & (b >= 0)
+        return counts["dist"][a[both], b[both]]
 
     def agr(self, cA, cB, i, data=None):
         """Agreement between two coders on a given item
@@ -156,13 +243,22 @@ class AnnotationTask(object):
         return ret
 
     def Nk(self, k):
-        return float(sum(1 for x in self.data if x["labels"] == k))
+        counts = self._count()
+        if k not in counts["label_ids"]:
+            return 0.0
+        return float(counts["coder_label"][:, counts["label_ids"][k]].sum())
 
     def Nik(self, i, k):
-        return float(sum(1 for x in self.data if x["item"] == i and x["labels"] == k))
+        counts = self._count()
+        if i not in counts["items"] or k not in counts["label_ids"]:
+            return 0.0
+        return float(counts["item_label"][counts["items"][i], counts["label_ids"][k]])
 
     def Nck(self, c, k):
-        return float(sum(1 for x in self.data if x["coder"] == c and x["labels"] == k))
+        counts = self._count()
+        if c not in counts["coders"] or k not in counts["label_ids"]:
+            return 0.0
+        return float(counts["coder_label"][counts["coders"][c], counts["label_ids"][k]])
 
     @deprecated("Use Nk, Nik or Nck instead")
     def N(self, k=None, i=None, c=None):
@@ -190,12 +286,7 @@ class AnnotationTask(object):
         """Observed agreement between two coders on all items.
 
         """
-        data = self._grouped_data(
-            "item", (x for x in self.data if x["coder"] in (cA, cB))
-        )
-        ret = sum(self.agr(cA, cB, item, item_data) for item, item_data in data) / len(
-            self.I
-        )
+        ret = float((1.0 - self._pair_distances(cA, cB)).sum()) / len(self.I)
         log.debug("Observed agreement between %s and %s: %f", cA, cB, ret)
         return ret
 
@@ -226,12 +317,7 @@ class AnnotationTask(object):
         """The observed disagreement for the weighted kappa coefficient.
 
         """
-        total = 0.0
-        data = (x for x in self.data if x["coder"] in (cA, cB))
-        for i, itemdata in self._grouped_data("item", data):
-            # we should have two items; distance doesn't care which comes first
-            total += self.distance(next(itemdata)["labels"], next(itemdata)["labels"])
-
+        total = float(self._pair_distances(cA, cB).sum())
         ret = total / (len(self.I) * max_distance)
         log.debug("Observed disagreement between %s and %s: %f", cA, cB, ret)
         return ret
@@ -260,20 +346,19 @@ class AnnotationTask(object):
         Equivalent to K from Siegel and Castellan (1988).
 
         """
-        total = 0.0
-        label_freqs = FreqDist(x["labels"] for x in self.data)
-        for k, f in label_freqs.items():
-            total += f ** 2
+        label_freqs = self._count()["coder_label"].sum(axis=0)
+        total = float((label_freqs ** 2).sum())
         Ae = total / ((len(self.I) * len(self.C)) ** 2)
         return (self.avg_Ao() - Ae) / (1 - Ae)
 
     def Ae_kappa(self, cA, cB):
-        Ae = 0.0
         nitems = float(len(self.I))
-        label_freqs = ConditionalFreqDist((x["labels"], x["coder"]) for x in self.data)
-        for k in label_freqs.conditions():
-            Ae += (label_freqs[k][cA] / nitems) * (label_freqs[k][cB] / nitems)
-        return Ae
+        counts = self._count()
+        label_freqs = counts["coder_label"]
+        Ae = (label_freqs[counts["coders"][cA]] / nitems) @ (
+            label_freqs[counts["coders"][cB]] / nitems
+        )
+        return float(Ae)
 
     def kappa_pairwise(self, cA, cB):
         """
@@ -300,11 +385,25 @@ class AnnotationTask(object):
         return (self.avg_Ao() - Ae) / (1.0 - Ae)
 
     def Disagreement(self, label_freqs):
-        total_labels = sum(label_freqs.values())
-        pairs = 0.0
-        for j, nj in label_freqs.items():
-            for l, nl in label_freqs.items():
-                pairs += float(nj * nl) * self.distance(l, j)
+        label_ids = self._count()["label_ids"]
+        if not all(k in label_ids for k in label_freqs):
+            total_labels = sum(label_freqs.values())
+            pairs = 0.0
+            for j, nj in label_freqs.items():
+                for l, nl in label_freqs.items():
+                    pairs += float(nj * nl) * self.distance(l, j)
+            return 1.0 * pairs / (total_labels * (total_labels - 1))
+
+        freqs = numpy.zeros(len(label_ids))
+        for k, n in label_freqs.items():
+            freqs[label_ids[k]] = n
+        return float(self._disagreements(freqs[numpy.newaxis])[0])
+
+    def _disagreements(self, label_freqs):
+        """The ``Disagreement`` for each row of a matrix of label counts."""
+        dist = self._count()["dist"]
+        total_labels = label_freqs.sum(axis=1)
+        pairs = ((label_freqs @ dist.T) * label_freqs).sum(axis=1)
         return 1.0 * pairs / (total_labels * (total_labels - 1))
 
     def alpha(self):
@@ -320,23 +419,18 @@ class AnnotationTask(object):
         if len(self.C) == 1 and len(self.I) == 1:
             raise ValueError("Cannot calculate alpha, only one coder and item present!")
 
-        total_disagreement = 0.0
-        total_ratings = 0
-        all_valid_labels_freq = FreqDist([])
-
-        total_do = 0.0  # Total observed disagreement for all items.
-        for i, itemdata in self._grouped_data("item"):
-            label_freqs = FreqDist(x["labels"] for x in itemdata)
-            labels_count = sum(label_freqs.values())
-            if labels_count < 2:
-                # Ignore the item.
-                continue
-            all_valid_labels_freq += label_freqs
-            total_do += self.Disagreement(label_freqs) * labels_count
+        item_label = self._count()["item_label"]
+        labels_count = item_label.sum(axis=1)
+        # Ignore the items with fewer than two labels.
+        label_freqs = item_label[labels_count >= 2]
+        labels_count = labels_count[labels_count >= 2]
 
-        do = total_do / sum(all_valid_labels_freq.values())
+        # Total observed disagreement for all items.
+        total_do = float((self._disagreements(label_freqs) * labels_count).sum())
+        do = total_do / float(labels_count.sum())
 
-        de = self.Disagreement(all_valid_labels_freq)  # Expected disagreement.
+        # Expected disagreement.
+        de = float(self._disagreements(label_freqs.sum(axis=0)[numpy.newaxis])[0])
         k_alpha = 1.0 - do / de
 
         return k_alpha
@@ -345,13 +439,13 @@ class AnnotationTask(object):
         """Cohen 1968
 
         """
-        total = 0.0
-        label_freqs = ConditionalFreqDist(
-            (x["coder"], x["labels"]) for x in self.data if x["coder"] in (cA, cB)
+        counts = self._count()
+        label_freqs = counts["coder_label"]
+        total = float(
+            label_freqs[counts["coders"][cA]]
+            @ counts["dist"]
+            @ label_freqs[counts["coders"][cB]]
         )
-        for j in self.K:
-            for l in self.K:
-                total += label_freqs[cA][j] * label_freqs[cB][l] * self.distance(j, l)
         De = total / (max_distance * pow(len(self.I), 2))
         log.debug("Expected disagreement between %s and %s: %f", cA, cB, De)
         Do = self.Do_Kw_pairwise(cA, cB)
@@ -16,8 +16,25 @@ from abc import ABCMeta, abstractmethod
 from functools import reduce
 
 
-_log2 = lambda x: _math.log(x, 2.0)
-_ln = _math.log
+try:
+    import numpy
+
+    _ARRAY_TYPES = (numpy.ndarray,)
+except ImportError:
+    _ARRAY_TYPES = ()
+
+
+def _log2(x):
+    if isinstance(x, _ARRAY_TYPES):
+        return numpy.log(x) / _math.log(2.0)
+    return _math.log(x, 2.0)
+
+
+def _ln(x):
+    if isinstance(x, _ARRAY_TYPES):
+        return numpy.log(x)
+    return _math.log(x)
+
 
 _product = lambda s: reduce(lambda x, y: x * y, s)
 
@@ -57,6 +74,10 @@ class NgramAssocMeasures(metaclass=ABCMeta):
 
     See ``BigramAssocMeasures`` and ``TrigramAssocMeasures``
 
+    Except for ``fisher``, each measure may also be given numpy arrays in
+    place of the counts, in which case it scores every ngram at once and
+    returns an array of scores.
+
     Inheriting classes should define a property _n, and a method _contingency
     which calculates contingency values from marginals in order for all
     association measures defined here to be usable.
@@ -6,7 +6,10 @@
 # URL: <http://simple_nltk.org/>
 # For license information, see LICENSE.TXT
 
-from simple_nltk.probability import FreqDist
+try:
+    import numpy
+except ImportError:
+    pass
 
 
 class ConfusionMatrix(object):
@@ -26,9 +29,21 @@ class ConfusionMatrix(object):
     Note that the diagonal entries *Ri=Tj* of this matrix
     corresponds to correct values; and the off-diagonal entries
     correspond to incorrect values.
+
+    The counts are kept in a numpy array, so a confusion matrix can be
+    built incrementally from batches of values with ``update()``, and
+    the matrices of several batches combined with ``merge()``:
+
+        >>> cm = ConfusionMatrix()
+        >>> cm.update(ref[:5], test[:5])
+        >>> cm.merge(ConfusionMatrix(ref[5:], test[5:]))
+        >>> cm
+        <ConfusionMatrix: 8/10 correct>
+        >>> print('%.3f %.3f' % (cm.precision('NN'), cm.recall('NN')))
+        0.750 0.750
     """
 
-    def __init__(self, reference, test, sort_by_count=False):
+    def __init__(self, reference=(), test=(), sort_by_count=False):
         """
         Construct a new confusion matrix from a list of reference
         values and a corresponding list of test values.
@@ -38,46 +53,87 @@ class ConfusionMatrix(object):
         :type test: list
         :param test: A list of values to compare against the
             corresponding reference values.
+        :param sort_by_count: If true, then order the values by their
+            total count in ``reference`` and ``test``, rather than by value.
         :raise ValueError: If ``reference`` and ``length`` do not have
             the same length.
         """
-        if len(reference) != len(test):
-            raise ValueError("Lists must have the same length.")
-
-        # Get a list of all values.
-        if sort_by_count:
-            ref_fdist = FreqDist(reference)
-            test_fdist = FreqDist(test)
-
-            def key(v):
-                return -(ref_fdist[v] + test_fdist[v])
-
-            values = sorted(set(reference + test), key=key)
-        else:
-            values = sorted(set(reference + test))
-
-        # Construct a value->index dictionary
-        indices = dict((val, i) for (i, val) in enumerate(values))
-
-        # Make a confusion matrix table.
-        confusion = [[0 for val in values] for val in values]
-        max_conf = 0  # Maximum confusion
-        for w, g in zip(reference, test):
-            confusion[indices[w]][indices[g]] += 1
-            max_conf = max(max_conf, confusion[indices[w]][indices[g]])
-
-        #: A list of all values in ``reference`` or ``test``.
-        self._values = values
-        #: A dictionary mapping values in ``self._values`` to their indices.
-        self._indices = indices
-        #: The confusion matrix itself (as a list of lists of counts).
-        self._confusion = confusion
-        #: The greatest count in ``self._confusion`` (used for printing).
-        self._max_conf = max_conf
+        #: Whether values are ordered by count rather than by value.
+        self._sort_by_count = sort_by_count
+        #: The values seen so far, in order of first occurrence.
+        self._labels = []
+        #: A dictionary mapping values to their indices in ``self._labels``.
+        self._label_ids = {}
+        #: The counts, indexed by the ids of the reference and test values.
+        self._counts = numpy.zeros((0, 0), dtype=numpy.int64)
         #: The total number of values in the confusion matrix.
-        self._total = len(reference)
+        self._total = 0
         #: The number of correct (on-diagonal) values in the matrix.
-        self._correct = sum(confusion[i][i] for i in range(len(values)))
+        self._correct = 0
+        self.update(reference, test)
+
+    def _ids(self, values):
+        label_ids = self._label_ids
+        labels = self._labels
+        ids = []
+        for value in values:
+            i = label_ids.get(value)
+            if i is None:
+                i = label_ids[value] = len(labels)
+                labels.append(value)
+            ids.append(i)
+        return numpy.array(ids, dtype=numpy.int64)
+
+    def _grow(self):
+        """Enlarge the count matrix for any new values."""
+        n = len(self._labels)
+        if n > len(self._counts):
+            counts = numpy.zeros((n, n), dtype=numpy.int64)
+            counts[: len(self._counts), : len(self._counts)] = self._counts
+            self._counts = counts
+
+    def update(self, reference, test):
+        """
+        Add the counts of a batch of reference values and the
+        corresponding test values.
+
+        :raise ValueError: If ``reference`` and ``length`` do not have
+            the same length.
+        """
+        reference = list(reference)
+        test = list(test)
+        if len(reference) != len(test):
+            raise ValueError("Lists must have the same length.")
+        ref_ids = self._ids(reference)
+        test_ids = self._ids(test)
+        self._grow()
+        n = len(self._labels)
+        self._counts += numpy.bincount(
+            ref_ids * n + test_ids, minlength=n * n
+        ).reshape(n, n)
+        self._total += len(reference)
+        self._correct += int(numpy.count_nonzero(ref_ids == test_ids))
+
+    def merge(self, other):
+        """
+        Add the counts of another confusion matrix, such as one built by
+        another worker from another part of the data.
+        """
+        ids = self._ids(other._labels)
+        self._grow()
+        self._counts[numpy.ix_(ids, ids)] += other._counts
+        self._total += other._total
+        self._correct += other._correct
+
+    @property
+    def _values(self):
+        """A list of all values in the reference or test values, sorted
+        by value or by count."""
+        values = sorted(self._labels)
+        if self._sort_by_count:
+            totals = self._counts.sum(axis=0) + self._counts.sum(axis=1)
+            values.sort(key=lambda v: -totals[self._label_ids[v]])
+        return values
 
     def __getitem__(self, li_lj_tuple):
         """
@@ -86,9 +142,86 @@ class ConfusionMatrix(object):
         :rtype: int
         """
         (li, lj) = li_lj_tuple
-        i = self._indices[li]
-        j = self._indices[lj]
-        return self._confusion[i][j]
+        i = self._label_ids[li]
+        j = self._label_ids[lj]
+        return int(self._counts[i, j])
+
+    def _label_scores(self, alpha=0.5):
+        """
+        The precision, recall and f-measure of each value, indexed by its
+        id, as numpy arrays.  Scores that are undefined, for values never
+        given or never expected, are 0.
+        """
+        true_positives = numpy.diag(self._counts).astype(numpy.float64)
+        given = self._counts.sum(axis=0)
+        expected = self._counts.sum(axis=1)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            precision = numpy.where(given > 0, true_positives / given, 0.0)
+            recall = numpy.where(expected > 0, true_positives / expected, 0.0)
+            f_measure = numpy.where(
+                (precision > 0) & (recall > 0),
+                1.0 / (alpha / precision + (1 - alpha) / recall),
+                0.0,
+            )
+        return precision, recall, f_measure
+
+    def precision(self, value):
+        """
+        :return: The fraction of the times ``value`` was given that it was
+            expected, or 0.0 if it was never given.
+        :rtype: float
+        """
+        return float(self._label_scores()[0][self._label_ids[value]])
+
+    def recall(self, value):
+        """
+        :return: The fraction of the times ``value`` was expected that it
+            was given, or 0.0 if it was never expected.
+        :rtype: float
+        """
+        return float(self._label_scores()[1][self._label_ids[value]])
+
+    def f_measure(self, value, alpha=0.5):
+        """
+        :return: The harmonic mean of the precision and recall of
+            ``value``, weighted by ``alpha``, or 0.0 if either is 0.
+        :rtype: float
+        """
+        return float(self._label_scores(alpha)[2][self._label_ids[value]])
+
+    def accuracy(self):
+        """
+        :return: The fraction of values that are correct, or None if there
+            are no values.
+        :rtype: float
+        """
+        if not self._total:
+            return None
+        return self._correct / self._total
+
+    def macro_average(self, alpha=0.5):
+        """
+        :return: The means over all values of their precision, recall and
+            f-measure.
+        :rtype: tuple(float, float, float)
+        """
+        if not self._labels:
+            return None
+        return tuple(float(scores.mean()) for scores in self._label_scores(alpha))
+
+    def micro_average(self, alpha=0.5):
+        """
+        :return: The precision, recall and f-measure of the pooled counts
+            of all values.  For a single label per item these all equal
+            the accuracy.
+        :rtype: tuple(float, float, float)
+        """
+        if not self._total:
+            return None
+        precision = recall = self._correct / self._total
+        if not precision:
+            return (0.0, 0.0, 0.0)
+        return (precision, recall, 1.0 / (alpha / precision + (1 - alpha) / recall))
 
     def __repr__(self):
         return "<ConfusionMatrix: %s/%s correct>" % (self._correct, self._total)
@@ -117,12 +250,12 @@ class ConfusionMatrix(object):
 
         @todo: add marginals?
         """
-        confusion = self._confusion
+        confusion = self._counts
 
         values = self._values
         if sort_by_count:
             values = sorted(
-                values, key=lambda v: -sum(self._confusion[self._indices[v]])
+                values, key=lambda v: -confusion[self._label_ids[v]].sum()
             )
 
         if truncate:
@@ -142,7 +275,7 @@ class ConfusionMatrix(object):
             entry_format = "%5.1f%%"
             zerostr = "     ."
         else:
-            entrylen = len(repr(self._max_conf))
+            entrylen = len(repr(int(confusion.max(initial=0))))
             entry_format = "%" + repr(entrylen) + "d"
             zerostr = " " * (entrylen - 1) + "."
 
@@ -162,16 +295,16 @@ class ConfusionMatrix(object):
 
         # Write the entries.
         for val, li in zip(value_strings, values):
-            i = self._indices[li]
+            i = self._label_ids[li]
             s += value_format % val
             for lj in values:
-                j = self._indices[lj]
-                if confusion[i][j] == 0:
+                j = self._label_ids[lj]
+                if confusion[i, j] == 0:
                     s += zerostr
                 elif show_percents:
-                    s += entry_format % (100.0 * confusion[i][j] / self._total)
+                    s += entry_format % (100.0 * confusion[i, j] / self._total)
                 else:
-                    s += entry_format % confusion[i][j]
+                    s += entry_format % confusion[i, j]
                 if i == j:
                     prevspace = s.rfind(" ")
                     s = s[:prevspace] + "<" + s[prevspace + 1 :] + ">"
@@ -20,6 +20,7 @@ As metrics, they must satisfy the following three requirements:
 3. d(a, c) <= d(a, b) + d(b, c)
 """
 
+import bisect
 import warnings
 import operator
 
@@ -56,7 +57,131 @@ def _edit_dist_step(lev, i, j, s1, s2, substitution_cost=1, transpositions=False
     lev[i][j] = min(a, b, c, d)
 
 
-def edit_distance(s1, s2, substitution_cost=1, transpositions=False):
+def _pattern_masks(pattern):
+    """
+    Map each symbol of pattern to the bit vector of the positions at
+    which it occurs, for the bit-parallel edit distance.
+    """
+    masks = {}
+    bit = 1
+    for symbol in pattern:
+        masks[symbol] = masks.get(symbol, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def _edit_dist_bit_parallel(masks, len1, s2, transpositions=False, max_distance=None):
+    """
+    Myers' bit-parallel Levenshtein distance between a pattern of length
+    len1, given by its ``_pattern_masks()``, and s2, with Hyyrö's extension
+    for (restricted) transpositions.  Each column of the dynamic programming
+    table is encoded in the vertical delta vectors ``pv`` and ``mv``, and
+    only its last cell, ``dist``, is kept.  Returns ``max_distance + 1`` as
+    soon as the distance is known to exceed ``max_distance``.
+    """
+    len2 = len(s2)
+    if max_distance is not None and abs(len1 - len2) > max_distance:
+        return max_distance + 1
+    if not len1:
+        return len2
+
+    full = (1 << len1) - 1
+    last = 1 << (len1 - 1)
+    pv, mv, d0, prev_eq = full, 0, 0, 0
+    dist = len1
+    for j, symbol in enumerate(s2, 1):
+        eq = masks.get(symbol, 0)
+        if transpositions:
+            tr = (((~d0) & eq) << 1) & prev_eq
+            prev_eq = eq
+        else:
+            tr = 0
+        d0 = ((((eq & pv) + pv) ^ pv) | eq | mv | tr) & full
+        ph = mv | (~(d0 | pv) & full)
+        mh = pv & d0
+        if ph & last:
+            dist += 1
+        elif mh & last:
+            dist -= 1
+        if max_distance is not None and dist - (len2 - j) > max_distance:
+            return max_distance + 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(d0 | ph) & full)
+        mv = ph & d0
+    return dist
+
+
+def _edit_dist_banded(
+    s1, s2, substitution_cost=1, transpositions=False, max_distance=None
+):
+    """
+    The dynamic programming edit distance, computed two rows at a time.
+    Given a max_distance, only the diagonal band of cells through which
+    a path of cost at most max_distance can pass is filled in, and
+    ``max_distance + 1`` is returned if the distance exceeds it, as soon
+    as every cell of a row (or of two rows, which a transposition may
+    step over) exceeds it.
+    """
+    len1 = len(s1)
+    len2 = len(s2)
+    inf = float("inf")
+    lo, hi = -len2, len1
+    cutoff = inf
+    if max_distance is not None and substitution_cost >= 0:
+        delta = len1 - len2
+        if abs(delta) > max_distance:
+            return max_distance + 1
+        # a path through cell (i, j) makes at least |i - j| insertions or
+        # deletions before it and |delta - (i - j)| after it
+        slack = (max_distance - abs(delta)) // 2
+        lo = min(0, delta) - slack
+        hi = max(0, delta) + slack
+        cutoff = max_distance
+
+    before, prev = None, [j if -j >= lo else inf for j in range(len2 + 1)]
+    prev_min = 0
+    for i in range(1, len1 + 1):
+        row = [inf] * (len2 + 1)
+        if i <= hi:
+            row[0] = i
+        row_min = row[0]
+        c1 = s1[i - 1]
+        for j in range(max(1, int(i - hi)), min(len2, int(i - lo)) + 1):
+            c2 = s2[j - 1]
+            # skipping a character in s1
+            a = prev[j] + 1
+            # skipping a character in s2
+            b = row[j - 1] + 1
+            # substitution
+            c = prev[j - 1] + (substitution_cost if c1 != c2 else 0)
+            # transposition
+            d = c + 1  # never picked by default
+            if transpositions and i > 1 and j > 1:
+                if s1[i - 2] == c2 and s2[j - 2] == c1:
+                    d = before[j - 2] + 1
+            row[j] = min(a, b, c, d)
+            if row[j] < row_min:
+                row_min = row[j]
+        # costs never decrease along a path, so none can come back
+        # under the cutoff
+        if row_min > cutoff and (prev_min > cutoff or not transpositions):
+            return max_distance + 1
+        before, prev, prev_min = prev, row, row_min
+
+    dist = prev[len2]
+    if max_distance is not None and dist > max_distance:
+        return max_distance + 1
+    return dist
+
+
+def _is_unit_cost(substitution_cost):
+    return type(substitution_cost) is int and substitution_cost == 1
+
+
+def edit_distance(
+    s1, s2, substitution_cost=1, transpositions=False, max_distance=None
+):
     """
     Calculate the Levenshtein edit-distance between two strings.
     The edit distance is the number of characters that need to be
@@ -73,32 +198,188 @@ def edit_distance(s1, s2, substitution_cost=1, transpositions=False):
     This also optionally allows transposition edits (e.g., "ab" -> "ba"),
     though this is disabled by default.
 
+    With the default substitution cost the distance is computed with a
+    bit-parallel algorithm, otherwise with the usual dynamic programming
+    table.  If max_distance is given, the computation stops as soon as the
+    distance is known to exceed it, and ``max_distance + 1`` is returned.
+
+        >>> edit_distance("rain", "shine")
+        3
+        >>> edit_distance("language", "lnaguaeg", max_distance=2)
+        3
+
     :param s1, s2: The strings to be analysed
     :param transpositions: Whether to allow transposition edits
+    :param max_distance: The largest distance of interest
     :type s1: str
     :type s2: str
     :type substitution_cost: int
     :type transpositions: bool
+    :type max_distance: int
     :rtype int
     """
-    # set up a 2-D array
-    len1 = len(s1)
-    len2 = len(s2)
-    lev = _edit_dist_init(len1 + 1, len2 + 1)
+    if _is_unit_cost(substitution_cost):
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        try:
+            masks = _pattern_masks(s2)
+        except TypeError:
+            # unhashable symbols
+            pass
+        else:
+            return _edit_dist_bit_parallel(
+                masks, len(s2), s1, transpositions, max_distance
+            )
+    return _edit_dist_banded(s1, s2, substitution_cost, transpositions, max_distance)
 
-    # iterate over the array
-    for i in range(len1):
-        for j in range(len2):
-            _edit_dist_step(
-                lev,
-                i + 1,
-                j + 1,
-                s1,
-                s2,
-                substitution_cost=substitution_cost,
-                transpositions=transpositions,
+
+class EditDistanceIndex(object):
+    """
+    An index of candidate strings for finding the ones nearest to a query
+    string by ``edit_distance()``.  Candidates are bucketed by length, and
+    the buckets are searched in order of increasing length difference from
+    the query, since the length difference is a lower bound on the
+    distance.  The distance to each candidate is computed with the query's
+    bit vectors, and abandoned as soon as it cannot make the k best.
+
+        >>> index = EditDistanceIndex(["rain", "shine", "train", "brain", "sign"])
+        >>> index.nearest("rai", k=2)
+        [('rain', 1), ('train', 2)]
+    """
+
+    def __init__(self, candidates=(), substitution_cost=1, transpositions=False):
+        self._substitution_cost = substitution_cost
+        self._transpositions = transpositions
+        self._candidates = []
+        self._by_length = {}
+        for candidate in candidates:
+            self.add(candidate)
+
+    def add(self, candidate):
+        """Add a candidate string to the index."""
+        self._by_length.setdefault(len(candidate), []).append(len(self._candidates))
+        self._candidates.append(candidate)
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def _distances(self, query, ids, max_distance):
+        """The distances from query to the candidates ids, abandoning each
+        one beyond max_distance."""
+        candidates = self._candidates
+        if _is_unit_cost(self._substitution_cost):
+            try:
+                masks = _pattern_masks(query)
+            except TypeError:
+                pass
+            else:
+                for i in ids:
+                    yield i, _edit_dist_bit_parallel(
+                        masks,
+                        len(query),
+                        candidates[i],
+                        self._transpositions,
+                        max_distance,
+                    )
+                return
+        for i in ids:
+            yield i, edit_distance(
+                query,
+                candidates[i],
+                self._substitution_cost,
+                self._transpositions,
+                max_distance,
             )
-    return lev[len1][len2]
+
+    def nearest(self, query, k=1, max_distance=None):
+        """
+        Return the k candidates nearest to query, as a list of
+        ``(candidate, distance)`` pairs ordered by distance and then by the
+        order in which the candidates were added.  If max_distance is given,
+        only candidates within that distance are returned.
+
+        :param query: The string to search for
+        :param k: The number of candidates to return
+        :param max_distance: The largest distance of a candidate returned
+        :rtype: list(tuple)
+        """
+        if k <= 0:
+            return []
+        lengths = sorted(self._by_length, key=lambda n: (abs(n - len(query)), n))
+        # with a negative substitution cost, lengths are no bound on distance
+        bounded = self._substitution_cost >= 0
+
+        # the k best (distance, id) pairs so far, and the distance to beat
+        best = []
+        cutoff = max_distance
+        for length in lengths:
+            if bounded and cutoff is not None and abs(length - len(query)) > cutoff:
+                break
+            for i, dist in self._distances(query, self._by_length[length], cutoff):
+                if cutoff is not None and dist > cutoff:
+                    continue
+                bisect.insort(best, (dist, i))
+                if len(best) >= k:
+                    del best[k:]
+                    cutoff = best[-1][0]
+        return [(self._candidates[i], dist) for dist, i in best]
+
+    def nearest_many(self, queries, k=1, max_distance=None, processes=1):
+        """
+        Return the result of ``nearest()`` for each of the queries,
+        searching in ``processes`` worker processes.
+
+        :rtype: list(list(tuple))
+        """
+        return _call_many(self, "nearest", queries, (k, max_distance), processes)
+
+
+def _call_many(index, method, queries, args, processes):
+    """Call the named method of index with each query and the further args,
+    in a pool of worker processes if processes > 1."""
+    if processes <= 1:
+        return [getattr(index, method)(query, *args) for query in queries]
+
+    from multiprocessing import Pool
+
+    pool = Pool(processes, initializer=_set_worker_index, initargs=(index,))
+    try:
+        return pool.map(
+            _worker_call, [(method, (query,) + tuple(args)) for query in queries]
+        )
+    finally:
+        pool.close()
+        pool.join()
+
+
+_worker_index = None
+
+
+def _set_worker_index(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _worker_call(args):
+    method, args = args
+    return getattr(_worker_index, method)(*args)
+
+
+def nearest(
+    query, candidates, k=1, max_distance=None, substitution_cost=1, transpositions=False
+):
+    """
+    Return the k candidates nearest to query by ``edit_distance()``, as a
+    list of ``(candidate, distance)`` pairs.  To search the same candidates
+    repeatedly, build an ``EditDistanceIndex`` once instead.
+
+        >>> nearest("lnaguage", ["language", "luggage", "lineage"], k=2)
+        [('language', 2), ('luggage', 3)]
+
+    :rtype: list(tuple)
+    """
+    index = EditDistanceIndex(candidates, substitution_cost, transpositions)
+    return index.nearest(query, k, max_distance)
 
 
 def _edit_dist_backtrace(lev):
@@ -289,6 +570,25 @@ def jaro_similarity(s1, s2):
         - m is the no. of matching characters
         - t is the half no. of possible transpositions.
 
+    """
+    return _jaro(s1, s2, _positions(s2))
+
+
+def _positions(s):
+    """Map each symbol of s to the list of positions at which it occurs."""
+    positions = {}
+    for j, symbol in enumerate(s):
+        positions.setdefault(symbol, []).append(j)
+    return positions
+
+
+def _jaro(s1, s2, positions2):
+    """
+    The Jaro similarity of s1 and s2, given the ``_positions()`` of s2.
+    Each symbol of s1 is matched to the first unmatched occurrence of the
+    same symbol in s2 within the match bound.  As the window only moves
+    right, the occurrences of each symbol are matched in order, and are
+    found by advancing a pointer into their positions.
     """
     # First, store the length of the strings
     # because they will be re-used several times.
@@ -296,40 +596,42 @@ def jaro_similarity(s1, s2):
 
     # The upper bound of the distance for being a matched character.
     match_bound = max(len_s1, len_s2) // 2 - 1
+    if match_bound < 0:
+        return 0
 
-    # Initialize the counts for matches and transpositions.
-    matches = 0  # no.of matched characters in s1 and s2
-    transpositions = 0  # no. of transpositions between s1 and s2
-    flagged_1 = []  # positions in s1 which are matches to some character in s2
-    flagged_2 = []  # positions in s2 which are matches to some character in s1
-
-    # Iterate through sequences, check for matches and compute transpositions.
-    for i in range(len_s1):  # Iterate through each character.
-        upperbound = min(i + match_bound, len_s2 - 1)
-        lowerbound = max(0, i - match_bound)
-        for j in range(lowerbound, upperbound + 1):
-            if s1[i] == s2[j] and j not in flagged_2:
-                matches += 1
-                flagged_1.append(i)
-                flagged_2.append(j)
-                break
-    flagged_2.sort()
-    for i, j in zip(flagged_1, flagged_2):
-        if s1[i] != s2[j]:
-            transpositions += 1
-
+    next_match = {}  # index of the next candidate position of each symbol
+    matched_1 = []  # symbols of s1 which are matches to some character in s2
+    matched_2 = []  # positions in s2 which are matches to some character in s1
+    for i, symbol in enumerate(s1):
+        positions = positions2.get(symbol)
+        if positions is None:
+            continue
+        k = next_match.get(symbol, 0)
+        while k < len(positions) and positions[k] < i - match_bound:
+            k += 1
+        if k < len(positions) and positions[k] <= i + match_bound:
+            matched_1.append(symbol)
+            matched_2.append(positions[k])
+            k += 1
+        next_match[symbol] = k
+
+    matches = len(matched_1)
     if matches == 0:
         return 0
-    else:
-        return (
-            1
-            / 3
-            * (
-                matches / len_s1
-                + matches / len_s2
-                + (matches - transpositions // 2) / matches
-            )
+    matched_2.sort()
+    transpositions = 0  # no. of transpositions between s1 and s2
+    for symbol, j in zip(matched_1, matched_2):
+        if symbol != s2[j]:
+            transpositions += 1
+    return (
+        1
+        / 3
+        * (
+            matches / len_s1
+            + matches / len_s2
+            + (matches - transpositions // 2) / matches
         )
+    )
 
 
 def jaro_winkler_similarity(s1, s2, p=0.1, max_l=4):
@@ -418,6 +720,22 @@ def jaro_winkler_similarity(s1, s2, p=0.1, max_l=4):
 
 
     """
+    _check_winkler_factors(p, max_l)
+
+    # Compute the Jaro similarity
+    jaro_sim = jaro_similarity(s1, s2)
+
+    # Initialize the upper bound for the no. of prefixes.
+    # if user did not pre-define the upperbound,
+    # use shorter length between s1 and s2
+
+    # Compute the prefix matches.
+    l = _prefix_length(s1, s2, max_l)
+    # Return the similarity value as described in docstring.
+    return jaro_sim + (l * p * (1 - jaro_sim))
+
+
+def _check_winkler_factors(p, max_l):
     # To ensure that the output of the Jaro-Winkler's similarity
     # falls between [0,1], the product of l * p needs to be
     # also fall between [0,1].
@@ -429,14 +747,9 @@ def jaro_winkler_similarity(s1, s2, p=0.1, max_l=4):
             )
         )
 
-    # Compute the Jaro similarity
-    jaro_sim = jaro_similarity(s1, s2)
-
-    # Initialize the upper bound for the no. of prefixes.
-    # if user did not pre-define the upperbound,
-    # use shorter length between s1 and s2
 
-    # Compute the prefix matches.
+def _prefix_length(s1, s2, max_l):
+    """The length of the common prefix of s1 and s2, up to max_l."""
     l = 0
     # zip() will automatically loop until the end of shorter string.
     for s1_i, s2_i in zip(s1, s2):
@@ -446,8 +759,169 @@ def jaro_winkler_similarity(s1, s2, p=0.1, max_l=4):
             break
         if l == max_l:
             break
-    # Return the similarity value as described in docstring.
-    return jaro_sim + (l * p * (1 - jaro_sim))
+    return l
+
+
+def _jaro_upper_bound(len_s1, len_s2):
+    """The largest Jaro similarity of two strings of the given lengths."""
+    matches = min(len_s1, len_s2)
+    if matches == 0 or max(len_s1, len_s2) // 2 - 1 < 0:
+        return 0
+    return 1 / 3 * (matches / len_s1 + matches / len_s2 + 1)
+
+
+class JaroWinklerIndex(object):
+    """
+    An index of candidate strings for scoring query strings against all
+    of them by ``jaro_winkler_similarity(query, candidate)``.  The
+    positions of the symbols of each candidate are computed once.
+    Candidates are blocked by length: since the number of matches is at
+    most the length of the shorter string, the lengths bound the Jaro
+    similarity, and with the common prefix, the Jaro-Winkler similarity.
+    Blocks and candidates whose bound falls below the threshold, or below
+    the k best scores found so far, are never scored.
+
+        >>> index = JaroWinklerIndex(["MARTHA", "MARHTA", "MARTIN", "DWAYNE", "DUANE"])
+        >>> [(c, round(s, 3)) for c, s in index.topk("MARHTA", k=2)]
+        [('MARHTA', 1.0), ('MARTHA', 0.961)]
+    """
+
+    def __init__(self, candidates=(), p=0.1, max_l=4):
+        _check_winkler_factors(p, max_l)
+        self._p = p
+        self._max_l = max_l
+        self._candidates = []
+        self._positions = []
+        self._by_length = {}
+        for candidate in candidates:
+            self.add(candidate)
+
+    def add(self, candidate):
+        """Add a candidate string to the index."""
+        self._by_length.setdefault(len(candidate), []).append(len(self._candidates))
+        self._candidates.append(candidate)
+        self._positions.append(_positions(candidate))
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def _winkler(self, jaro_sim, l):
+        return jaro_sim + (l * self._p * (1 - jaro_sim))
+
+    def _upper_bound(self, jaro_bound, l):
+        # the similarity is linear in jaro_sim, so its largest value over
+        # [0, jaro_bound] is at one end
+        return max(self._winkler(0, l), self._winkler(jaro_bound, l))
+
+    def _blocks(self, query, threshold):
+        """The (bound, ids) of the blocks of candidates that may score at
+        least threshold against query, best bound first."""
+        blocks = []
+        for length, ids in self._by_length.items():
+            bound = self._upper_bound(
+                _jaro_upper_bound(len(query), length),
+                min(self._max_l, len(query), length),
+            )
+            if threshold is None or bound >= threshold:
+                blocks.append((bound, ids))
+        blocks.sort(key=lambda block: -block[0])
+        return blocks
+
+    def _score(self, query, i, jaro_bound, cutoff):
+        """The similarity of query and candidate i, or None if it must be
+        below cutoff."""
+        candidate = self._candidates[i]
+        l = _prefix_length(query, candidate, self._max_l)
+        if cutoff is not None and self._upper_bound(jaro_bound, l) < cutoff:
+            return None
+        return self._winkler(_jaro(query, candidate, self._positions[i]), l)
+
+    def similarities(self, query, threshold=None):
+        """
+        Return the list of the similarities of query to each candidate.
+        If threshold is given, similarities below it are returned as 0.0.
+
+        :rtype: list(float)
+        """
+        scores = [0.0] * len(self._candidates)
+        for bound, ids in self._blocks(query, threshold):
+            jaro_bound = _jaro_upper_bound(len(query), len(self._candidates[ids[0]]))
+            for i in ids:
+                score = self._score(query, i, jaro_bound, threshold)
+                if score is not None and (threshold is None or score >= threshold):
+                    scores[i] = score
+        return scores
+
+    def topk(self, query, k=1, threshold=None):
+        """
+        Return the k candidates most similar to query, as a list of
+        ``(candidate, similarity)`` pairs ordered by decreasing similarity
+        and then by the order in which the candidates were added.  If
+        threshold is given, only candidates at least that similar are
+        returned.
+
+        :rtype: list(tuple)
+        """
+        if k <= 0:
+            return []
+        # the k best (-similarity, id) pairs so far, and the score to reach
+        best = []
+        cutoff = threshold
+        for bound, ids in self._blocks(query, threshold):
+            if cutoff is not None and bound < cutoff:
+                break
+            jaro_bound = _jaro_upper_bound(len(query), len(self._candidates[ids[0]]))
+            for i in ids:
+                score = self._score(query, i, jaro_bound, cutoff)
+                if score is None or (cutoff is not None and score < cutoff):
+                    continue
+                bisect.insort(best, (-score, i))
+                if len(best) >= k:
+                    del best[k:]
+                    cutoff = -best[-1][0]
+        return [(self._candidates[i], -score) for score, i in best]
+
+    def similarities_many(self, queries, threshold=None, processes=1):
+        """
+        Return the result of ``similarities()`` for each of the queries,
+        computed in ``processes`` worker processes.
+        """
+        return _call_many(self, "similarities", queries, (threshold,), processes)
+
+    def topk_many(self, queries, k=1, threshold=None, processes=1):
+        """
+        Return the result of ``topk()`` for each of the queries, searching
+        in ``processes`` worker processes.
+        """
+        return _call_many(self, "topk", queries, (k, threshold), processes)
+
+
+def jaro_winkler_matrix(left, right, p=0.1, max_l=4, threshold=None, processes=1):
+    """
+    Return the matrix of ``jaro_winkler_similarity(s1, s2, p, max_l)`` for
+    each s1 in left and s2 in right, as a list of rows.  If threshold is
+    given, pairs that cannot reach it are not scored, and similarities
+    below it are returned as 0.0.
+
+        >>> jaro_winkler_matrix(["JON", "JOHN"], ["JOHN", "JAN"])
+        [[0.9333333333333333, 0.7999999999999999], [1.0, 0.7499999999999999]]
+
+    :rtype: list(list(float))
+    """
+    index = JaroWinklerIndex(right, p, max_l)
+    return index.similarities_many(left, threshold, processes)
+
+
+def jaro_winkler_topk(query, candidates, k=1, threshold=None, p=0.1, max_l=4):
+    """
+    Return the k candidates most similar to query by
+    ``jaro_winkler_similarity(query, candidate, p, max_l)``, as a list of
+    ``(candidate, similarity)`` pairs.  To search the same candidates
+    repeatedly, build a ``JaroWinklerIndex`` once instead.
+
+    :rtype: list(tuple)
+    """
+    return JaroWinklerIndex(candidates, p, max_l).topk(query, k, threshold)
 
 
 def demo():
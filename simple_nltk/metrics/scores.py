@@ -6,18 +6,19 @@
 # URL: <http://simple_nltk.org/>
 # For license information, see LICENSE.TXT
 
-from math import fabs
-import operator
-from random import shuffle
-from functools import reduce
+from math import fabs, lgamma, log, factorial
+import random
+
+try:
+    import numpy
+except ImportError:
+    pass
 
 try:
     from scipy.stats.stats import betai
 except ImportError:
     betai = None
 
-from simple_nltk.util import LazyConcatenation, LazyMap
-
 
 def accuracy(reference, test):
     """
@@ -148,6 +149,12 @@ def approxrand(a, b, **kwargs):
     statistic of the permutated lists varies from the actual statistic of
     the unpermuted argument lists.
 
+    With the default statistic, the mean, and numpy installed, the shuffles
+    are drawn in batches, and their means computed by matrix operations.
+    Other statistics are computed one shuffle at a time, optionally spread
+    over several processes, in which case the statistic must be picklable
+    (a module-level function, not a lambda).
+
     :return: a tuple containing an approximate significance level, the count
              of the number of times the pseudo-statistic varied from the
              actual statistic, and the number of shuffles
@@ -156,53 +163,152 @@ def approxrand(a, b, **kwargs):
     :type a: list
     :param b: another list of independently generated test values
     :type b: list
+    :param shuffles: the number of shuffles to draw (default 999)
+    :param statistic: a function of a list of values (default the mean)
+    :param processes: the number of processes used to compute a custom
+        statistic (default 1)
+    :param seed: a seed for the random shuffles
+    :param verbose: whether to print progress
     """
     shuffles = kwargs.get("shuffles", 999)
-    # there's no point in trying to shuffle beyond all possible permutations
-    shuffles = min(shuffles, reduce(operator.mul, range(1, len(a) + len(b) + 1)))
-    stat = kwargs.get("statistic", lambda lst: sum(lst) / len(lst))
+    # there's no point in trying to shuffle beyond all possible permutations;
+    # compare in log space so as not to compute a huge factorial
+    n = len(a) + len(b)
+    if lgamma(n + 1) < log(max(shuffles, 1)) + 1:
+        shuffles = min(shuffles, factorial(n))
+    stat = kwargs.get("statistic")
+    processes = kwargs.get("processes", 1)
+    seed = kwargs.get("seed")
     verbose = kwargs.get("verbose", False)
 
     if verbose:
         print("shuffles: %d" % shuffles)
 
+    values = None
+    if stat is None:
+        stat = _mean
+        try:
+            values = numpy.asarray(list(a) + list(b), dtype=numpy.float64)
+        except (NameError, TypeError, ValueError):
+            pass
+
     actual_stat = fabs(stat(a) - stat(b))
 
     if verbose:
         print("actual statistic: %f" % actual_stat)
         print("-" * 60)
 
-    c = 1e-100
-    lst = LazyConcatenation([a, b])
-    indices = list(range(len(a) + len(b)))
+    if values is not None:
+        count = _approxrand_means(values, len(a), actual_stat, shuffles, seed, verbose)
+    elif processes > 1:
+        from multiprocessing import Pool
+
+        rng = random.Random(seed)
+        chunks = [
+            shuffles // processes + (i < shuffles % processes) for i in range(processes)
+        ]
+        tasks = [
+            (list(a), list(b), stat, actual_stat, chunk, rng.getrandbits(64), False)
+            for chunk in chunks
+        ]
+        with Pool(processes) as pool:
+            count = sum(pool.map(_approxrand_shuffles, tasks))
+    else:
+        count = _approxrand_shuffles((a, b, stat, actual_stat, shuffles, seed, verbose))
+
+    c = 1e-100 + count
+    significance = (c + 1) / (shuffles + 1)
+
+    if verbose:
+        print("significance: %f" % significance)
+        if betai:
+            for phi in [0.01, 0.05, 0.10, 0.15, 0.25, 0.50]:
+                print("prob(phi<=%f): %f" % (phi, betai(c, shuffles, phi)))
+
+    return (significance, c, shuffles)
 
+
+def _mean(lst):
+    return sum(lst) / len(lst)
+
+
+def _approxrand_shuffles(args):
+    """
+    Count the shuffles of the values of a and b whose statistic differs by
+    at least actual_stat, drawing the given number of shuffles one at a
+    time.
+    """
+    a, b, stat, actual_stat, shuffles, seed, verbose = args
+    lst = list(a) + list(b)
+    indices = list(range(len(lst)))
+    rng = random.Random(seed) if seed is not None else random
+    count = 0
     for i in range(shuffles):
         if verbose and i % 10 == 0:
             print("shuffle: %d" % i)
 
-        shuffle(indices)
+        rng.shuffle(indices)
 
-        pseudo_stat_a = stat(LazyMap(lambda i: lst[i], indices[: len(a)]))
-        pseudo_stat_b = stat(LazyMap(lambda i: lst[i], indices[len(a) :]))
+        pseudo_stat_a = stat([lst[i] for i in indices[: len(a)]])
+        pseudo_stat_b = stat([lst[i] for i in indices[len(a) :]])
         pseudo_stat = fabs(pseudo_stat_a - pseudo_stat_b)
 
         if pseudo_stat >= actual_stat:
-            c += 1
+            count += 1
 
         if verbose and i % 10 == 0:
             print("pseudo-statistic: %f" % pseudo_stat)
-            print("significance: %f" % ((c + 1) / (i + 1)))
+            print("significance: %f" % ((count + 1) / (i + 1)))
             print("-" * 60)
+    return count
 
-    significance = (c + 1) / (shuffles + 1)
 
-    if verbose:
-        print("significance: %f" % significance)
-        if betai:
-            for phi in [0.01, 0.05, 0.10, 0.15, 0.25, 0.50]:
-                print("prob(phi<=%f): %f" % (phi, betai(c, shuffles, phi)))
+_APPROXRAND_BATCH_SIZE = 1 << 21
 
-    return (significance, c, shuffles)
+
+def _approxrand_means(values, len_a, actual_stat, shuffles, seed, verbose):
+    """
+    Count the shuffles of values whose first len_a and remaining values
+    have means differing by at least actual_stat.  Only the sum of the
+    smaller part of each shuffle is needed.  If the values take few
+    distinct values, as with 0/1 scores, the number of times each occurs
+    in that part is drawn from the multivariate hypergeometric
+    distribution.  Otherwise its indices are drawn in batches, as the
+    rows of a matrix, by partitioning random keys.
+    """
+    rng = numpy.random.default_rng(seed)
+    n = len(values)
+    total = values.sum()
+    small = min(len_a, n - len_a)
+    distinct, counts = numpy.unique(values, return_counts=True)
+    batch = max(1, _APPROXRAND_BATCH_SIZE // max(n, 1))
+    count = 0
+    done = 0
+    while done < shuffles:
+        rows = min(batch, shuffles - done)
+        if len(distinct) * 8 <= small:
+            drawn = rng.multivariate_hypergeometric(
+                counts, small, size=rows, method="marginals"
+            )
+            sums = drawn @ distinct
+        elif small:
+            keys = rng.random((rows, n))
+            indices = keys.argpartition(small - 1, axis=1)[:, :small]
+            sums = values[indices].sum(axis=1)
+        else:
+            sums = numpy.zeros(rows)
+        if small == len_a:
+            sums_a, sums_b = sums, total - sums
+        else:
+            sums_a, sums_b = total - sums, sums
+        pseudo_stats = numpy.abs(sums_a / len_a - sums_b / (n - len_a))
+        count += int(numpy.count_nonzero(pseudo_stats >= actual_stat))
+        done += rows
+        if verbose:
+            print("shuffle: %d" % done)
+            print("significance: %f" % ((count + 1) / (done + 1)))
+            print("-" * 60)
+    return count
 
 
 def demo():
@@ -82,40 +82,66 @@ def windowdiff(seg1, seg2, k, boundary="1", weighted=False):
         raise ValueError(
             "Window width k should be smaller or equal than segmentation lengths"
         )
-    wd = 0
-    for i in range(len(seg1) - k + 1):
-        ndiff = abs(seg1[i : i + k].count(boundary) - seg2[i : i + k].count(boundary))
-        if weighted:
-            wd += ndiff
-        else:
-            wd += min(1, ndiff)
+    ndiff = _window_counts(seg1, k, boundary) - _window_counts(seg2, k, boundary)
+    if weighted:
+        wd = int(np.abs(ndiff).sum())
+    else:
+        wd = int(np.count_nonzero(ndiff))
     return wd / (len(seg1) - k + 1.0)
 
 
-# Generalized Hamming Distance
+def _window_counts(seg, k, boundary, length=None):
+    """
+    The number of boundaries in each window of k items of seg, computed
+    as differences of the prefix sums of its boundary indicators.  If a
+    length is given, seg is truncated or padded with non-boundaries to
+    that length.
+    """
+    if length is None:
+        length = len(seg)
+    n = min(length, len(seg))
+    indicators = np.zeros(length + 1, dtype=np.int64)
+    indicators[1 : n + 1] = np.fromiter(
+        (val == boundary for val in seg[:n]), dtype=bool, count=n
+    )
+    prefix = np.cumsum(indicators)
+    return prefix[k:] - prefix[: max(len(prefix) - k, 0)]
 
 
-def _init_mat(nrows, ncols, ins_cost, del_cost):
-    mat = np.empty((nrows, ncols))
-    mat[0, :] = ins_cost * np.arange(ncols)
-    mat[:, 0] = del_cost * np.arange(nrows)
-    return mat
+# Generalized Hamming Distance
 
 
-def _ghd_aux(mat, rowv, colv, ins_cost, del_cost, shift_cost_coeff):
+def _ghd_aux(rowv, colv, ins_cost, del_cost, shift_cost_coeff):
+    """
+    Fill in the dynamic programming matrix of the Generalized Hamming
+    Distance a row at a time, and return its last cell.  The boundaries of
+    colv after the boundary rowi are matched through insertions, which
+    chain along the row; their costs are a running minimum.
+    """
+    colv = np.asarray(colv, dtype=np.float64)
+    ncols = len(colv)
+    steps = np.arange(ncols)
+    prev = ins_cost * np.arange(ncols + 1)
     for i, rowi in enumerate(rowv):
-        for j, colj in enumerate(colv):
-            shift_cost = shift_cost_coeff * abs(rowi - colj) + mat[i, j]
-            if rowi == colj:
-                # boundaries are at the same location, no transformation required
-                tcost = mat[i, j]
-            elif rowi > colj:
-                # boundary match through a deletion
-                tcost = del_cost + mat[i, j + 1]
-            else:
-                # boundary match through an insertion
-                tcost = ins_cost + mat[i + 1, j]
-            mat[i + 1, j + 1] = min(tcost, shift_cost)
+        shift_cost = shift_cost_coeff * np.abs(rowi - colv) + prev[:-1]
+        # boundaries are at the same location, no transformation required,
+        # or a boundary match through a deletion
+        tcost = np.where(colv == rowi, prev[:-1], del_cost + prev[1:])
+        row = np.empty(ncols + 1)
+        row[0] = del_cost * (i + 1)
+        row[1:] = np.minimum(tcost, shift_cost)
+
+        # boundary match through an insertion:
+        # row[j + 1] = min(ins_cost + row[j], shift_cost[j])
+        first = int(np.searchsorted(colv, rowi, side="right"))
+        if first < ncols:
+            offsets = steps[: ncols - first]
+            reachable = np.minimum.accumulate(shift_cost[first:] - ins_cost * offsets)
+            row[first + 1 :] = np.minimum(
+                reachable + ins_cost * offsets, row[first] + ins_cost * (offsets + 1)
+            )
+        prev = row
+    return prev[-1]
 
 
 def ghd(ref, hyp, ins_cost=2.0, del_cost=2.0, shift_cost_coeff=1.0, boundary="1"):
@@ -177,9 +203,7 @@ def ghd(ref, hyp, ins_cost=2.0, del_cost=2.0, shift_cost_coeff=1.0, boundary="1"
     elif nref_bound == 0 and nhyp_bound > 0:
         return nhyp_bound * del_cost
 
-    mat = _init_mat(nhyp_bound + 1, nref_bound + 1, ins_cost, del_cost)
-    _ghd_aux(mat, hyp_idx, ref_idx, ins_cost, del_cost, shift_cost_coeff)
-    return mat[-1, -1]
+    return float(_ghd_aux(hyp_idx, ref_idx, ins_cost, del_cost, shift_cost_coeff))
 
 
 # Beeferman's Pk text segmentation evaluation metric
@@ -213,15 +237,46 @@ def pk(ref, hyp, k=None, boundary="1"):
     if k is None:
         k = int(round(len(ref) / (ref.count(boundary) * 2.0)))
 
-    err = 0
-    for i in range(len(ref) - k + 1):
-        r = ref[i : i + k].count(boundary) > 0
-        h = hyp[i : i + k].count(boundary) > 0
-        if r != h:
-            err += 1
+    r = _window_counts(ref, k, boundary) > 0
+    h = _window_counts(hyp, k, boundary, length=len(ref)) > 0
+    err = int(np.count_nonzero(r != h))
     return err / (len(ref) - k + 1.0)
 
 
+def _evaluate(args):
+    metric, ref, hyp, kwargs = args
+    return metric(ref, hyp, **kwargs)
+
+
+def evaluate_segmentations(pairs, metric=windowdiff, processes=1, **kwargs):
+    """
+    Compute a segmentation metric for each of a sequence of (reference,
+    hypothesis) pairs, in a pool of ``processes`` worker processes.  Any
+    further keyword arguments are passed to the metric.
+
+        >>> pairs = [("000100000010", "000010000100"), ("0100" * 5, "0100" * 5)]
+        >>> ['%.2f' % score for score in evaluate_segmentations(pairs, k=3)]
+        ['0.30', '0.00']
+        >>> ['%.2f' % score for score in evaluate_segmentations(pairs, pk, k=2)]
+        ['0.36', '0.00']
+
+    :param pairs: the (reference, hypothesis) segmentations
+    :param metric: windowdiff, pk, ghd or another function of two
+        segmentations
+    :param processes: the number of worker processes
+    :rtype: list(float)
+    """
+    tasks = [(metric, ref, hyp, kwargs) for ref, hyp in pairs]
+    if processes <= 1:
+        return [_evaluate(task) for task in tasks]
+
+    from multiprocessing import Pool
+
+    with Pool(processes) as pool:
+        chunksize = max(1, len(tasks) // (4 * processes))
+        return pool.map(_evaluate, tasks, chunksize=chunksize)
+
+
 # skip doctests if numpy is not installed
 def setup_module(module):
     from nose import SkipTest
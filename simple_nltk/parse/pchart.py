@@ -37,8 +37,10 @@ argument beam_size.  If non-zero, this controls the size of the beam
 # [XX] This might not be implemented quite right -- it would be better
 # to associate probabilities with child pointer lists.
 
+import itertools
 import random
 from functools import reduce
+from heapq import heappop, heappush
 from simple_nltk.tree import Tree, ProbabilisticTree
 from simple_nltk.grammar import Nonterminal, PCFG
 
@@ -172,7 +174,9 @@ class BottomUpProbabilisticChartParser(ParserI):
     ``BottomUpProbabilisticChartParser``.  Different sorting orders will
     result in different search strategies.  The sorting order for the
     queue is defined by the method ``sort_queue``; subclasses are required
-    to provide a definition for this method.
+    to provide a definition for this method.  Subclasses whose order
+    is given by a key of each edge may define ``sort_key`` instead,
+    and the queue is then kept as a heap.
 
     :type _grammar: PCFG
     :ivar _grammar: The grammar used to parse sentences.
@@ -241,25 +245,28 @@ class BottomUpProbabilisticChartParser(ParserI):
                 )
             queue.append(edge)
 
-        while len(queue) > 0:
-            # Re-sort the queue.
-            self.sort_queue(queue, chart)
-
-            # Prune the queue to the correct size if a beam was defined
-            if self.beam_size:
-                self._prune(queue, chart)
-
-            # Get the best edge.
-            edge = queue.pop()
-            if self._trace > 0:
-                print(
-                    "  %-50s [%s]"
-                    % (chart.pretty_format_edge(edge, width=2), edge.prob())
-                )
-
-            # Apply BU & FR to it.
-            queue.extend(bu.apply(chart, grammar, edge))
-            queue.extend(fr.apply(chart, grammar, edge))
+        if self._sorts_by_key():
+            self._parse_agenda(chart, grammar, queue, bu, fr)
+        else:
+            while len(queue) > 0:
+                # Re-sort the queue.
+                self.sort_queue(queue, chart)
+
+                # Prune the queue to the correct size if a beam was defined
+                if self.beam_size:
+                    self._prune(queue, chart)
+
+                # Get the best edge.
+                edge = queue.pop()
+                if self._trace > 0:
+                    print(
+                        "  %-50s [%s]"
+                        % (chart.pretty_format_edge(edge, width=2), edge.prob())
+                    )
+
+                # Apply BU & FR to it.
+                queue.extend(bu.apply(chart, grammar, edge))
+                queue.extend(fr.apply(chart, grammar, edge))
 
         # Get a list of complete parses.
         parses = list(chart.parses(grammar.start(), ProbabilisticTree))
@@ -276,6 +283,78 @@ class BottomUpProbabilisticChartParser(ParserI):
 
         return iter(parses)
 
+    def _parse_agenda(self, chart, grammar, edges, bu, fr):
+        """
+        Add the edges *edges*, and those they produce, to the chart in
+        the order given by ``sort_key()``.  The agenda is a heap keyed on
+        push; like the sorted queue, it prefers the most recent of edges
+        with equal keys, and the beam discards the lowest keys first,
+        the oldest first.
+        """
+        best = []
+        worst = [] if self.beam_size else None
+        removed = set()
+        counter = itertools.count()
+
+        def push(edge):
+            key = self.sort_key(edge)
+            n = next(counter)
+            heappush(best, (-key, -n, edge))
+            if worst is not None:
+                heappush(worst, (key, n, edge))
+
+        for edge in edges:
+            push(edge)
+        size = len(edges)
+
+        while size > 0:
+            # Prune the agenda to the correct size if a beam was defined
+            while worst is not None and size > self.beam_size:
+                key, n, edge = heappop(worst)
+                if n in removed:
+                    continue
+                removed.add(n)
+                size -= 1
+                if self._trace > 2:
+                    print("  %-50s [DISCARDED]" % chart.pretty_format_edge(edge, 2))
+
+            # Get the best edge.
+            key, n, edge = heappop(best)
+            if -n in removed:
+                continue
+            if worst is not None:
+                removed.add(-n)
+            size -= 1
+            if self._trace > 0:
+                print(
+                    "  %-50s [%s]"
+                    % (chart.pretty_format_edge(edge, width=2), edge.prob())
+                )
+
+            # Apply BU & FR to it.
+            for new_edge in bu.apply(chart, grammar, edge):
+                push(new_edge)
+                size += 1
+            for new_edge in fr.apply(chart, grammar, edge):
+                push(new_edge)
+                size += 1
+
+    def _sorts_by_key(self):
+        """
+        Return True if this parser's queue order is given by ``sort_key()``,
+        i.e. if no class overrides ``sort_queue()`` after defining it.
+        """
+        mro = type(self).__mro__
+
+        def owner(name):
+            return next(i for i, cls in enumerate(mro) if name in cls.__dict__)
+
+        key_owner = owner("sort_key")
+        return (
+            mro[key_owner] is not BottomUpProbabilisticChartParser
+            and key_owner <= owner("sort_queue")
+        )
+
     def _setprob(self, tree, prod_probs):
         if tree.prob() is not None:
             return
@@ -316,6 +395,18 @@ class BottomUpProbabilisticChartParser(ParserI):
         """
         raise NotImplementedError()
 
+    def sort_key(self, edge):
+        """
+        Return the key of the given ``Edge``, such that edges with higher
+        keys are tried first; or None, if the queue is ordered by
+        ``sort_queue()`` instead.  The key is computed once, when the
+        edge is added to the queue.
+
+        :type edge: Edge
+        :rtype: float or None
+        """
+        return None
+
     def _prune(self, queue, chart):
         """ Discard items in the queue if the queue is longer than the beam."""
         if len(queue) > self.beam_size:
@@ -360,6 +451,9 @@ class InsideChartParser(BottomUpProbabilisticChartParser):
         """
         queue.sort(key=lambda edge: edge.prob())
 
+    def sort_key(self, edge):
+        return edge.prob()
+
 
 # Eventually, this will become some sort of inside-outside parser:
 # class InsideOutsideParser(BottomUpProbabilisticChartParser):
@@ -410,6 +504,9 @@ class UnsortedChartParser(BottomUpProbabilisticChartParser):
     def sort_queue(self, queue, chart):
         return
 
+    def sort_key(self, edge):
+        return 0
+
 
 class LongestChartParser(BottomUpProbabilisticChartParser):
     """
@@ -422,6 +519,9 @@ class LongestChartParser(BottomUpProbabilisticChartParser):
     def sort_queue(self, queue, chart):
         queue.sort(key=lambda edge: edge.length())
 
+    def sort_key(self, edge):
+        return edge.length()
+
 
 ##//////////////////////////////////////////////////////
 ##  Test Code
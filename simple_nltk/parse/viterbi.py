@@ -8,9 +8,15 @@
 
 from functools import reduce
 from simple_nltk.tree import Tree, ProbabilisticTree
+from simple_nltk.grammar import Nonterminal
 
 from simple_nltk.parse.api import ParserI
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 ##//////////////////////////////////////////////////////
 ##  Viterbi PCFG Parser
 ##//////////////////////////////////////////////////////
@@ -65,6 +71,14 @@ class ViterbiParser(ParserI):
     |             MLC[start, start+width, prod.lhs] = new_tree
     | Return MLC[0, len(text), start_symbol]
 
+    If numpy is installed, the table is instead filled in by the grammar
+    compiled into arrays of binary and unary rules: the best constituent
+    of each node value over every span of a given width is found at
+    once, by taking the maximum over all splits and productions, and
+    only the trees of the best parse are built.  Detailed tracing
+    (``trace`` > 1) reports every insertion into the table, and so
+    uses the algorithm above.
+
     :type _grammar: PCFG
     :ivar _grammar: The grammar used to parse sentences.
     :type _trace: int
@@ -87,6 +101,7 @@ class ViterbiParser(ParserI):
         """
         self._grammar = grammar
         self._trace = trace
+        self._compiled = None
 
     def grammar(self):
         return self._grammar
@@ -110,6 +125,14 @@ class ViterbiParser(ParserI):
         tokens = list(tokens)
         self._grammar.check_coverage(tokens)
 
+        if numpy is not None and self._trace < 2:
+            if self._compiled is None:
+                self._compiled = _CompiledPCFG(self._grammar)
+            tree = self._compiled.parse(tokens, self._grammar.start(), self._trace)
+            if tree is not None:
+                yield tree
+            return
+
         # The most likely constituent table.  This table specifies the
         # most likely constituent for a given span and type.
         # Constituents can be either Trees or tokens.  For Trees,
@@ -323,6 +346,237 @@ class ViterbiParser(ParserI):
         return "<ViterbiParser for %r>" % self._grammar
 
 
+class _CompiledPCFG(object):
+    """
+    A ``PCFG`` compiled for ``ViterbiParser`` into arrays of binary and
+    unary rules over integer state ids, with log probabilities.
+
+    Productions are binarised with right factoring, as by
+    ``treetransforms.chomsky_normal_form``: ``A -> B C D`` becomes
+    ``A -> B <C D>`` and ``<C D> -> C D``, where the intermediate state
+    ``<C D>`` has probability 1 and is shared by every production whose
+    right hand side ends in ``C D``.  Intermediate states are flattened
+    again when trees are built.  Lexical productions ``A -> 'w'`` are
+    looked up by token, to give the scores of the spans of one token;
+    only the terminals of longer productions are states of their own,
+    which cover the tokens equal to them.  Empty productions never
+    cover a span, and are left out.
+    """
+
+    def __init__(self, grammar):
+        self._ids = {}
+        self._terminals = {}
+        self._kinds = []
+        self._lexicon = {}
+        self._lexical = []
+        binary = []
+        unary = []
+        for production in grammar.productions():
+            rhs = production.rhs()
+            if not rhs:
+                continue
+            parent = self._state(production.lhs())
+            if len(rhs) == 1 and self._kind(rhs[0]) == "terminal":
+                with numpy.errstate(divide="ignore"):
+                    logp = numpy.log(production.prob())
+                entries = self._lexicon.setdefault(rhs[0], [])
+                entries.append((parent, logp, len(self._lexical)))
+                self._lexical.append(production)
+                continue
+            if len(rhs) == 1:
+                unary.append((parent, self._state(rhs[0]), production))
+                continue
+            right = self._state(rhs[-1])
+            for k in range(len(rhs) - 2, 0, -1):
+                suffix = rhs[k:]
+                if suffix in self._ids:
+                    right = self._ids[suffix]
+                    continue
+                state = self._state(suffix)
+                binary.append((state, self._state(rhs[k]), right, None))
+                right = state
+            binary.append((parent, self._state(rhs[0]), right, production))
+
+        (
+            self._bparent,
+            self._bleft,
+            self._bright,
+            self._blogp,
+            self._bproductions,
+            self._bgroups,
+        ) = self._rules(binary)
+        (
+            self._uparent,
+            self._uchild,
+            _,
+            self._ulogp,
+            self._uproductions,
+            self._ugroups,
+        ) = self._rules([(p, c, 0, prod) for (p, c, prod) in unary])
+
+    def _state(self, symbol):
+        """
+        Return the id of the state for *symbol*: a ``Nonterminal``, a
+        terminal, or a tuple of symbols for an intermediate state.
+        """
+        ids = self._terminals if self._kind(symbol) == "terminal" else self._ids
+        if symbol not in ids:
+            ids[symbol] = len(self._kinds)
+            self._kinds.append(self._kind(symbol))
+        return ids[symbol]
+
+    @staticmethod
+    def _kind(symbol):
+        if isinstance(symbol, Nonterminal):
+            return "nonterminal"
+        if isinstance(symbol, tuple):
+            return "intermediate"
+        return "terminal"
+
+    @staticmethod
+    def _rules(rules):
+        """
+        Return the parents, children, log probabilities and productions
+        of *rules*, sorted by parent, and the groups of rules that share
+        a parent, as (first rule, parent, group of each rule).
+        """
+        rules = sorted(rules, key=lambda rule: rule[0])
+        parents = numpy.array([rule[0] for rule in rules], dtype=int)
+        left = numpy.array([rule[1] for rule in rules], dtype=int)
+        right = numpy.array([rule[2] for rule in rules], dtype=int)
+        probs = [1.0 if rule[3] is None else rule[3].prob() for rule in rules]
+        with numpy.errstate(divide="ignore"):
+            logp = numpy.log(numpy.array(probs, dtype=float))
+        firsts = numpy.flatnonzero(numpy.diff(parents, prepend=-1))
+        sizes = numpy.diff(firsts, append=len(rules))
+        group = numpy.repeat(numpy.arange(len(firsts)), sizes)
+        groups = (firsts, parents[firsts], group)
+        return parents, left, right, logp, [rule[3] for rule in rules], groups
+
+    def parse(self, tokens, start, trace=0):
+        """
+        Return the most likely ``ProbabilisticTree`` for *tokens* whose
+        node value is *start*, or None if there is none.
+        """
+        n = len(tokens)
+        root = self._ids.get(start)
+        if n == 0 or root is None:
+            return None
+
+        # The tables are indexed by the start and the width of a span,
+        # and a state.  A split of 0 marks a unary rule, and a split of
+        # -1 a lexical production.
+        shape = (n + 1, n + 1, len(self._kinds))
+        scores = numpy.full(shape, -numpy.inf)
+        rules = numpy.zeros(shape, dtype=numpy.int32)
+        splits = numpy.zeros(shape, dtype=numpy.int32)
+
+        if trace:
+            print(("Inserting tokens into the most likely" + " constituents table..."))
+        for index, token in enumerate(tokens):
+            if token in self._terminals:
+                scores[index, 1, self._terminals[token]] = 0.0
+            for state, logp, lexical in self._lexicon.get(token, ()):
+                if logp > scores[index, 1, state]:
+                    scores[index, 1, state] = logp
+                    rules[index, 1, state] = lexical
+                    splits[index, 1, state] = -1
+
+        for width in range(1, n + 1):
+            if trace:
+                print(
+                    (
+                        "Finding the most likely constituents"
+                        + " spanning %d text elements..." % width
+                    )
+                )
+            table = (
+                scores[: n - width + 1, width],
+                rules[: n - width + 1, width],
+                splits[: n - width + 1, width],
+            )
+            if width > 1 and len(self._bparent):
+                self._combine(scores, width, table)
+            while len(self._uparent):
+                values = table[0][:, self._uchild] + self._ulogp
+                if not self._update(table, values, None, self._ugroups):
+                    break
+
+        if scores[0, n, root] == -numpy.inf:
+            return None
+
+        def children(start, width, state):
+            kind = self._kinds[state]
+            if kind == "terminal":
+                return [tokens[start]]
+            if kind == "nonterminal":
+                return [tree(start, width, state)]
+            rule, split = rules[start, width, state], splits[start, width, state]
+            return children(start, split, self._bleft[rule]) + children(
+                start + split, width - split, self._bright[rule]
+            )
+
+        def tree(start, width, state):
+            rule, split = rules[start, width, state], splits[start, width, state]
+            if split < 0:
+                production = self._lexical[rule]
+                kids = [tokens[start]]
+            elif split:
+                production = self._bproductions[rule]
+                kids = children(start, split, self._bleft[rule]) + children(
+                    start + split, width - split, self._bright[rule]
+                )
+            else:
+                production = self._uproductions[rule]
+                kids = children(start, width, self._uchild[rule])
+            subtrees = [c for c in kids if isinstance(c, Tree)]
+            p = reduce(lambda pr, t: pr * t.prob(), subtrees, production.prob())
+            return ProbabilisticTree(production.lhs().symbol(), kids, prob=p)
+
+        return tree(0, n, root)
+
+    def _combine(self, scores, width, table):
+        """
+        Fill in *table*, the best binary constituents of each span of
+        *width* tokens, from the constituents of the narrower spans.
+        """
+        starts = numpy.arange(len(table[0]))[:, None, None]
+        splits = numpy.arange(1, width)[None, :, None]
+        values = (
+            scores[starts, splits, self._bleft]
+            + scores[starts + splits, width - splits, self._bright]
+            + self._blogp
+        )
+        best = values.argmax(axis=1)
+        values = numpy.take_along_axis(values, best[:, None, :], axis=1)[:, 0]
+        self._update(table, values, best + 1, self._bgroups)
+
+    @staticmethod
+    def _update(table, values, splits, groups):
+        """
+        Replace the scores in *table* of the parents of the rules with
+        the given *values* where the best of those is higher, and return
+        True if any score was replaced.  Ties go to the first rule.
+        *splits* gives the split of each value, or is None for unary
+        rules.
+        """
+        scores, rules, rule_splits = table
+        firsts, parents, group = groups
+        best = numpy.maximum.reduceat(values, firsts, axis=1)
+        index = numpy.arange(values.shape[1])
+        winner = numpy.where(values == best[:, group], index, len(index))
+        winner = numpy.minimum.reduceat(winner, firsts, axis=1)
+        rows, cols = numpy.nonzero(best > scores[:, parents])
+        if not len(rows):
+            return False
+        states = parents[cols]
+        winner = winner[rows, cols]
+        scores[rows, states] = best[rows, cols]
+        rules[rows, states] = winner
+        rule_splits[rows, states] = 0 if splits is None else splits[rows, winner]
+        return True
+
+
 ##//////////////////////////////////////////////////////
 ##  Test Code
 ##//////////////////////////////////////////////////////
@@ -76,6 +76,7 @@ from simple_nltk.tag.sequential import (
     TrigramTagger,
     AffixTagger,
     RegexpTagger,
+    CompiledBackoffTagger,
     ClassifierBasedTagger,
     ClassifierBasedPOSTagger,
 )
@@ -84,5 +85,5 @@ from simple_nltk.tag.brill_trainer import BrillTaggerTrainer
 from simple_nltk.tag.tnt import TnT
 from simple_nltk.tag.hunpos import HunposTagger
 from simple_nltk.tag.hmm import HiddenMarkovModelTagger, HiddenMarkovModelTrainer
-from simple_nltk.tag.mapping import tagset_mapping, map_tag
+from simple_nltk.tag.mapping import tagset_mapping, map_tag, tag_mapper, TagMapper
 from simple_nltk.tag.crf import CRFTagger
@@ -10,13 +10,19 @@
 Interface for tagging each token in a sentence with supplementary
 information, such as its part of speech.
 """
+import time
 from abc import ABCMeta, abstractmethod
-from itertools import chain
+from collections import deque
+from itertools import islice
 
 
 from simple_nltk.internals import overridden
-from simple_nltk.metrics import accuracy
-from simple_nltk.tag.util import untag
+from simple_nltk.tag.util import (
+    TagScore,
+    _set_worker_tagger,
+    _tag_batch,
+    _worker_tag_batch,
+)
 
 
 class TaggerI(metaclass=ABCMeta):
@@ -54,7 +60,7 @@ class TaggerI(metaclass=ABCMeta):
         """
         return [self.tag(sent) for sent in sentences]
 
-    def evaluate(self, gold):
+    def evaluate(self, gold, batch_size=1000, processes=1):
         """
         Score the accuracy of the tagger against the gold standard.
         Strip the tags from the gold standard text, retag it using
@@ -62,13 +68,51 @@ class TaggerI(metaclass=ABCMeta):
 
         :type gold: list(list(tuple(str, str)))
         :param gold: The list of tagged sentences to score the tagger on.
+        :param batch_size: The number of sentences passed to
+            ``tag_sents()`` at a time.
+        :param processes: The number of worker processes to tag with.
         :rtype: float
         """
+        return self.score(gold, batch_size, processes).accuracy()
 
-        tagged_sents = self.tag_sents(untag(sent) for sent in gold)
-        gold_tokens = list(chain(*gold))
-        test_tokens = list(chain(*tagged_sents))
-        return accuracy(gold_tokens, test_tokens)
+    def score(self, gold, batch_size=1000, processes=1):
+        """
+        Score the tagger against the gold standard in a single pass,
+        retagging ``batch_size`` sentences at a time with ``tag_sents()``.
+        With ``processes > 1`` the batches are tagged by a pool of worker
+        processes, with a bounded number of batches in flight, so the
+        gold standard may be an arbitrarily long stream.  The returned
+        ``TagScore`` reports the accuracy of the tagger along with its
+        throughput in tokens per second, measured in wall clock time.
+
+        :type gold: iter(list(tuple(str, str)))
+        :param gold: The tagged sentences to score the tagger on.
+        :rtype: TagScore
+        """
+        start = time.perf_counter()
+        score = TagScore()
+        gold = iter(gold)
+        batches = iter(lambda: list(islice(gold, batch_size)), [])
+        if processes <= 1:
+            for batch in batches:
+                score.merge(_tag_batch(self, batch))
+        else:
+            from multiprocessing import Pool
+
+            pool = Pool(processes, initializer=_set_worker_tagger, initargs=(self,))
+            try:
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.apply_async(_worker_tag_batch, (batch,)))
+                    if len(pending) >= 2 * processes:
+                        score.merge(pending.popleft().get())
+                while pending:
+                    score.merge(pending.popleft().get())
+            finally:
+                pool.close()
+                pool.join()
+        score._seconds = time.perf_counter() - start
+        return score
 
     def _check_params(self, train, model):
         if (train and model) or (not train and not model):
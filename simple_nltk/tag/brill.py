@@ -11,9 +11,13 @@
 from collections import defaultdict, Counter
 
 from simple_nltk.tag import TaggerI
-from simple_nltk.tbl import Feature, Template
+from simple_nltk.tbl import Feature, Template, Rule
 from simple_nltk import jsontags
 
+# Padding between the sentences of a flattened corpus; it never equals
+# the value of a condition.
+_PAD = object()
+
 
 ######################################################################
 # Brill Templates
@@ -223,6 +227,7 @@ class BrillTagger(TaggerI):
         self._initial_tagger = initial_tagger
         self._rules = tuple(rules)
         self._training_stats = training_stats
+        self._cascade, self._width = self._compile()
 
     def encode_json_obj(self):
         return self._initial_tagger, self._rules, self._training_stats
@@ -256,12 +261,113 @@ class BrillTagger(TaggerI):
         else:
             return self._training_stats.get(statistic)
 
+    def _compile(self):
+        """
+        Compile the rules into a cascade of (original tag, replacement
+        tag, conditions) triples, where each condition is a (property,
+        positions, value) triple testing the word (property 0) or the
+        tag (property 1) of nearby tokens.
+
+        :return: the cascade and the largest distance any condition
+            looks at, or (None, 0) if some rule is not a ``Rule`` on
+            ``Word`` and ``Pos`` features
+        """
+        cascade = []
+        width = 0
+        for rule in self._rules:
+            if type(rule) is not Rule:
+                return None, 0
+            conditions = []
+            for (feature, value) in rule._conditions:
+                if type(feature) is Word:
+                    prop = 0
+                elif type(feature) is Pos:
+                    prop = 1
+                else:
+                    return None, 0
+                conditions.append((prop, tuple(feature.positions), value))
+                width = max([width] + [abs(pos) for pos in feature.positions])
+            cascade.append((rule.original_tag, rule.replacement_tag, tuple(conditions)))
+        return cascade, width
+
     def tag(self, tokens):
         # Inherit documentation from TaggerI
 
         # Run the initial tagger.
         tagged_tokens = self._initial_tagger.tag(tokens)
+        if self._cascade is not None:
+            return self._apply_cascade([tagged_tokens])[0]
+        return self._apply_rules(tagged_tokens)
+
+    def tag_sents(self, sentences):
+        """
+        Apply the ``tag()`` method to all sentences at once: the initial
+        tagging of the sentences is flattened into one array of tokens,
+        and each rule is applied across all of them in turn.
 
+        :rtype: list(list(tuple(str, str)))
+        """
+        tagged_sents = self._initial_tagger.tag_sents(sentences)
+        if self._cascade is not None:
+            return self._apply_cascade(tagged_sents)
+        return [self._apply_rules(tagged_tokens) for tagged_tokens in tagged_sents]
+
+    def _apply_cascade(self, tagged_sents):
+        """
+        Apply the compiled rules to the tagged sentences *tagged_sents*,
+        as one flattened array of tokens.  The sentences are separated
+        by padding that no condition matches, so that no rule looks
+        across them.
+        """
+        pad = [_PAD] * self._width
+        words = list(pad)
+        tags = list(pad)
+        spans = []
+        for sent in tagged_sents:
+            start = len(words)
+            for (word, tag) in sent:
+                words.append(word)
+                tags.append(tag)
+            spans.append((start, len(words)))
+            words.extend(pad)
+            tags.extend(pad)
+
+        # Map each tag to the positions of the tokens that have it.
+        tag_to_positions = defaultdict(set)
+        for start, end in spans:
+            for i in range(start, end):
+                tag_to_positions[tags[i]].add(i)
+
+        # Apply each rule, in order, at the positions that have its
+        # original tag.
+        properties = (words, tags)
+        for (original_tag, replacement_tag, conditions) in self._cascade:
+            positions = tag_to_positions.get(original_tag)
+            if not positions:
+                continue
+            changed = []
+            for i in positions:
+                for (prop, offsets, value) in conditions:
+                    values = properties[prop]
+                    for offset in offsets:
+                        if values[i + offset] == value:
+                            break
+                    else:
+                        break
+                else:
+                    changed.append(i)
+            if changed:
+                for i in changed:
+                    tags[i] = replacement_tag
+                positions.difference_update(changed)
+                tag_to_positions[replacement_tag].update(changed)
+
+        return [list(zip(words[start:end], tags[start:end])) for start, end in spans]
+
+    def _apply_rules(self, tagged_tokens):
+        """
+        Apply the rules, in order, to the tagged sentence *tagged_tokens*.
+        """
         # Create a dictionary that maps each tag to a list of the
         # indices of tokens that have that tag.
         tag_to_positions = defaultdict(set)
@@ -13,6 +13,7 @@ import textwrap
 from collections import defaultdict
 
 from simple_nltk.tag import untag, BrillTagger
+from simple_nltk.tbl.template import Template
 
 ######################################################################
 #  Brill Tagger Trainer
@@ -89,15 +90,40 @@ class BrillTaggerTrainer(object):
            if the rule applies.  This records the next position we
            need to check to see if the rule messed anything up."""
 
+        self._unknown_by_tag = None
+        """Mapping from tags to the rules in _first_unknown_position
+           with that original tag, i.e. the only ones of these rules
+           that may apply at a position with that tag."""
+
+        self._values = None
+        """List of the property values of each sentence in the test
+           corpus, as returned by Template.property_values() for the
+           Feature classes of the templates; or None if some templates
+           are not plain Templates.  Rules are instantiated and checked
+           by looking up these values."""
+
+        # When all templates are plain Templates, the property values
+        # of the corpus can be indexed, and the neighborhood of a
+        # position (see Template.get_neighborhood) is a single window.
+        self._feature_classes = None
+        if templates and all(type(t) is Template for t in templates):
+            features = [f for t in templates for f in t._features]
+            self._feature_classes = list(dict.fromkeys(f.__class__ for f in features))
+            positions = [0] + [p for f in features for p in f.positions]
+            self._window = (min(positions), max(positions))
+
     # Training
 
-    def train(self, train_sents, max_rules=200, min_score=2, min_acc=None):
+    def train(
+        self, train_sents, max_rules=200, min_score=2, min_acc=None, processes=1
+    ):
         """
         Trains the Brill tagger on the corpus *train_sents*,
         producing at most *max_rules* transformations, each of which
         reduces the net number of errors in the corpus by at least
         *min_score*, and each of which has accuracy not lower than
-        *min_acc*.
+        *min_acc*.  The initial useful rules are found by *processes*
+        worker processes, each scanning a share of the corpus.
 
         #imports
         >>> from simple_nltk.tbl.template import Template
@@ -232,6 +258,9 @@ class BrillTaggerTrainer(object):
         :type min_score: int
         :param min_acc: discard any rule with lower accuracy than min_acc
         :type min_acc: float or None
+        :param processes: number of worker processes for finding the
+            initial rules
+        :type processes: int
         :return: the learned tagger
         :rtype: BrillTagger
 
@@ -278,7 +307,7 @@ class BrillTaggerTrainer(object):
         # rules, which are added to the rule mappings.
         if self._trace:
             print("Finding initial useful rules...")
-        self._init_mappings(test_sents, train_sents)
+        self._init_mappings(test_sents, train_sents, processes)
         if self._trace:
             print(("    Found {} useful rules.".format(len(self._rule_scores))))
 
@@ -331,7 +360,7 @@ class BrillTaggerTrainer(object):
         # Create and return a tagger from the rules we found.
         return BrillTagger(self._initial_tagger, rules, trainstats)
 
-    def _init_mappings(self, test_sents, train_sents):
+    def _init_mappings(self, test_sents, train_sents, processes=1):
         """
         Initialize the tag position mapping & the rule related
         mappings.  For each error in test_sents, find new rules that
@@ -343,19 +372,77 @@ class BrillTaggerTrainer(object):
         self._rules_by_score = defaultdict(set)
         self._rule_scores = defaultdict(int)
         self._first_unknown_position = defaultdict(int)
+        self._unknown_by_tag = defaultdict(set)
+        if self._feature_classes is not None:
+            self._values = [
+                Template.property_values(sent, self._feature_classes)
+                for sent in test_sents
+            ]
         # Scan through the corpus, initializing the tag_positions
-        # mapping and all the rule-related mappings.
+        # mapping.
         for sentnum, sent in enumerate(test_sents):
             for wordnum, (word, tag) in enumerate(sent):
-
-                # Initialize tag_positions
                 self._tag_positions[tag].append((sentnum, wordnum))
 
-                # If it's an error token, update the rule-related mappings.
-                correct_tag = train_sents[sentnum][wordnum][1]
-                if tag != correct_tag:
-                    for rule in self._find_rules(sent, wordnum, correct_tag):
-                        self._update_rule_applies(rule, sentnum, wordnum, train_sents)
+        # Find the rules that repair the errors of each shard of the
+        # corpus.  Each rule found at an error position replaces the
+        # wrong tag with the correct one, so its effect there is 1.
+        shards = self._shards(test_sents, train_sents, processes)
+        if processes <= 1:
+            results = map(_find_useful_rules, shards)
+            self._add_useful_rules(results)
+        else:
+            from multiprocessing import Pool
+
+            pool = Pool(processes)
+            try:
+                self._add_useful_rules(pool.imap(_find_useful_rules, shards))
+            finally:
+                pool.close()
+                pool.join()
+        # Every score up to the best one is a key of _rules_by_score, as
+        # if the rules had been added one position at a time; the keys
+        # decide which scores _best_rule() visits.
+        for score in range(max(self._rule_scores.values(), default=0) + 1):
+            self._rules_by_score[score]
+        for rule, score in self._rule_scores.items():
+            self._rules_by_score[score].add(rule)
+
+    def _shards(self, test_sents, train_sents, processes):
+        """
+        Split the error positions of the corpus into *processes* shards
+        of consecutive sentences, for ``_find_useful_rules``.
+        """
+        size = -(-len(test_sents) // max(processes, 1)) or 1
+        for start in range(0, len(test_sents), size):
+            errors = []
+            for sentnum in range(start, min(start + size, len(test_sents))):
+                sent = test_sents[sentnum]
+                values = self._values[sentnum] if self._values is not None else None
+                wordnums = [
+                    wordnum
+                    for (wordnum, (token, truth)) in enumerate(
+                        zip(sent, train_sents[sentnum])
+                    )
+                    if token[1] != truth[1]
+                ]
+                if wordnums:
+                    gold_tags = [tag for (word, tag) in train_sents[sentnum]]
+                    errors.append((sentnum, sent, gold_tags, values, wordnums))
+            yield self._templates, errors
+
+    def _add_useful_rules(self, results):
+        """
+        Add the rules found by ``_find_useful_rules`` to the rule
+        mappings, in corpus order.
+        """
+        for found in results:
+            for rule, positions in found.items():
+                positions_by_rule = self._positions_by_rule[rule]
+                for pos in positions:
+                    positions_by_rule[pos] = 1
+                    self._rules_by_position[pos].add(rule)
+                self._rule_scores[rule] += len(positions)
 
     def _clean(self):
         self._tag_positions = None
@@ -364,16 +451,32 @@ class BrillTaggerTrainer(object):
         self._rules_by_score = None
         self._rule_scores = None
         self._first_unknown_position = None
+        self._unknown_by_tag = None
+        self._values = None
 
-    def _find_rules(self, sent, wordnum, new_tag):
+    def _find_rules(self, sent, wordnum, new_tag, values=None):
         """
         Use the templates to find rules that apply at index *wordnum*
         in the sentence *sent* and generate the tag *new_tag*.
         """
         for template in self._templates:
-            for rule in template.applicable_rules(sent, wordnum, new_tag):
+            if values is not None:
+                rules = template.applicable_rules(sent, wordnum, new_tag, values)
+            else:
+                rules = template.applicable_rules(sent, wordnum, new_tag)
+            for rule in rules:
                 yield rule
 
+    def _applies(self, rule, test_sents, sentnum, wordnum):
+        """
+        Return True if *rule* applies at the position *(sentnum,
+        wordnum)*, looking up the property values of the sentence if
+        they are indexed.
+        """
+        if self._values is None:
+            return rule.applies(test_sents[sentnum], wordnum)
+        return rule.applies(test_sents[sentnum], wordnum, self._values[sentnum])
+
     def _update_rule_applies(self, rule, sentnum, wordnum, train_sents):
         """
         Update the rule data tables to reflect the fact that
@@ -454,14 +557,16 @@ class BrillTaggerTrainer(object):
 
                 for i in range(start, len(positions)):
                     sentnum, wordnum = positions[i]
-                    if rule.applies(test_sents[sentnum], wordnum):
+                    if self._applies(rule, test_sents, sentnum, wordnum):
                         self._update_rule_applies(rule, sentnum, wordnum, train_sents)
                         if self._rule_scores[rule] < max_score:
                             self._first_unknown_position[rule] = (sentnum, wordnum + 1)
+                            self._unknown_by_tag[rule.original_tag].add(rule)
                             break  # The update demoted the rule.
 
                 if self._rule_scores[rule] == max_score:
                     self._first_unknown_position[rule] = (len(train_sents) + 1, 0)
+                    self._unknown_by_tag[rule.original_tag].add(rule)
                     # optimization: if no min_acc threshold given, don't bother computing accuracy
                     if min_acc is None:
                         return rule
@@ -499,6 +604,13 @@ class BrillTaggerTrainer(object):
             text = test_sents[sentnum][wordnum][0]
             test_sents[sentnum][wordnum] = (text, new_tag)
 
+        # Update the property values of the changed sentences.
+        if self._values is not None:
+            for sentnum in set(sentnum for (sentnum, wordnum) in update_positions):
+                self._values[sentnum] = Template.property_values(
+                    test_sents[sentnum], self._feature_classes
+                )
+
     def _update_tag_positions(self, rule):
         """
         Update _tag_positions to reflect the changes to tags that are
@@ -522,6 +634,14 @@ class BrillTaggerTrainer(object):
         # Collect a list of all positions that might be affected.
         neighbors = set()
         for sentnum, wordnum in self._positions_by_rule[rule]:
+            if self._values is not None:
+                start, end = self._window
+                n = range(
+                    max(0, wordnum - end),
+                    min(wordnum - start + 1, len(test_sents[sentnum])),
+                )
+                neighbors.update([(sentnum, i) for i in n])
+                continue
             for template in self._templates:
                 n = template.get_neighborhood(test_sents[sentnum], wordnum)
                 neighbors.update([(sentnum, i) for i in n])
@@ -530,6 +650,7 @@ class BrillTaggerTrainer(object):
         num_obsolete = num_new = num_unseen = 0
         for sentnum, wordnum in neighbors:
             test_sent = test_sents[sentnum]
+            values = self._values[sentnum] if self._values is not None else None
             correct_tag = train_sents[sentnum][wordnum][1]
 
             # Check if the change causes any rule at this position to
@@ -537,38 +658,38 @@ class BrillTaggerTrainer(object):
             # accordingly.
             old_rules = set(self._rules_by_position[sentnum, wordnum])
             for old_rule in old_rules:
-                if not old_rule.applies(test_sent, wordnum):
+                if not self._applies(old_rule, test_sents, sentnum, wordnum):
                     num_obsolete += 1
                     self._update_rule_not_applies(old_rule, sentnum, wordnum)
 
             # Check if the change causes our templates to propose any
             # new rules for this position.
-            for template in self._templates:
-                for new_rule in template.applicable_rules(
-                    test_sent, wordnum, correct_tag
-                ):
-                    if new_rule not in old_rules:
-                        num_new += 1
-                        if new_rule not in self._rule_scores:
-                            num_unseen += 1
-                        old_rules.add(new_rule)
-                        self._update_rule_applies(
-                            new_rule, sentnum, wordnum, train_sents
-                        )
+            for new_rule in self._find_rules(test_sent, wordnum, correct_tag, values):
+                if new_rule not in old_rules:
+                    num_new += 1
+                    if new_rule not in self._rule_scores:
+                        num_unseen += 1
+                    old_rules.add(new_rule)
+                    self._update_rule_applies(new_rule, sentnum, wordnum, train_sents)
 
             # We may have caused other rules to match here, that are
             # not proposed by our templates -- in particular, rules
             # that are harmful or neutral.  We therefore need to
             # update any rule whose first_unknown_position is past
-            # this rule.
-            for new_rule, pos in self._first_unknown_position.items():
-                if pos > (sentnum, wordnum):
-                    if new_rule not in old_rules:
-                        num_new += 1
-                        if new_rule.applies(test_sent, wordnum):
-                            self._update_rule_applies(
-                                new_rule, sentnum, wordnum, train_sents
-                            )
+            # this rule.  Only the rules for the current tag can apply.
+            for new_rule in self._unknown_by_tag[test_sent[wordnum][1]]:
+                pos = self._first_unknown_position[new_rule]
+                if pos > (sentnum, wordnum) and new_rule not in old_rules:
+                    if self._applies(new_rule, test_sents, sentnum, wordnum):
+                        self._update_rule_applies(
+                            new_rule, sentnum, wordnum, train_sents
+                        )
+            if self._trace > 3:
+                num_new += sum(
+                    1
+                    for new_rule, pos in self._first_unknown_position.items()
+                    if pos > (sentnum, wordnum) and new_rule not in old_rules
+                )
 
         if self._trace > 3:
             self._trace_update_rules(num_obsolete, num_new, num_unseen)
@@ -627,3 +748,32 @@ class BrillTaggerTrainer(object):
             ("  - {} rule applications added ({} novel)".format(num_new, num_unseen)),
         )
         print(prefix)
+
+
+def _find_useful_rules(args):
+    """
+    Find the rules that repair the errors in a shard of the corpus.
+
+    :param args: the templates, and the (sentnum, sentence, gold tags,
+        property values, error word numbers) of each sentence with errors
+    :return: a mapping from each rule found to the positions it repairs,
+        in corpus order
+    """
+    templates, errors = args
+    found = defaultdict(list)
+    for sentnum, sent, gold_tags, values, wordnums in errors:
+        for wordnum in wordnums:
+            pos = sentnum, wordnum
+            for template in templates:
+                if values is not None:
+                    rules = template.applicable_rules(
+                        sent, wordnum, gold_tags[wordnum], values
+                    )
+                else:
+                    rules = template.applicable_rules(sent, wordnum, gold_tags[wordnum])
+                for rule in rules:
+                    positions = found[rule]
+                    # A template may propose the same rule twice here.
+                    if not positions or positions[-1] != pos:
+                        positions.append(pos)
+    return found
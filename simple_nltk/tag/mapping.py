@@ -34,6 +34,11 @@ from os.path import join
 
 from simple_nltk.data import load
 
+try:
+    import numpy
+except ImportError:
+    pass
+
 _UNIVERSAL_DATA = "taggers/universal_tagset"
 _UNIVERSAL_TAGS = (
     "VERB",
@@ -54,6 +59,9 @@ _UNIVERSAL_TAGS = (
 # the mapping between tagset T1 and T2 returns UNK if appied to an unrecognized tag
 _MAPPINGS = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: "UNK")))
 
+# the compiled TagMappers, by (source, target)
+_MAPPERS = {}
+
 
 def _load_universal_map(fileid):
     contents = load(join(_UNIVERSAL_DATA, fileid + ".map"), format="text")
@@ -114,23 +122,151 @@ def tagset_mapping(source, target):
     return _MAPPINGS[source][target]
 
 
-def map_tag(source, target, source_tag):
+class TagMapper(object):
     """
-    Maps the tag from the source tagset to the target tagset.
+    A mapping from the tags of a source tagset to the tags of a target
+    tagset, compiled for mapping many tags at once.  Each source tag
+    has an integer id, so that id-encoded corpora can be mapped with a
+    single array lookup.
 
-    >>> map_tag('en-ptb', 'universal', 'VBZ')
-    'VERB'
-    >>> map_tag('en-ptb', 'universal', 'VBP')
-    'VERB'
-    >>> map_tag('en-ptb', 'universal', '``')
-    '.'
+        >>> from simple_nltk.tag.mapping import TagMapper
+        >>> mapper = TagMapper({'NN': 'NOUN', 'NNS': 'NOUN', 'VB': 'VERB'}, 'X')
+        >>> mapper.map_tag('NNS'), mapper.map_tag('FW')
+        ('NOUN', 'X')
+        >>> mapper.map_tags([[('dogs', 'NNS'), ('bark', 'VB')], [('ok', 'UH')]])
+        [[('dogs', 'NOUN'), ('bark', 'VERB')], [('ok', 'X')]]
+        >>> ids = mapper.encode(['VB', 'NN', 'UH'])
+        >>> mapper.decode(mapper.map_ids(ids))
+        ['VERB', 'NOUN', 'X']
+
+    :param mapping: the target tag of each source tag
+    :type mapping: dict(str, str)
+    :param default: the target tag of source tags that are not in
+        *mapping*; if None, mapping them raises a ``KeyError``
+    :type default: str or None
     """
 
+    def __init__(self, mapping, default=None):
+        self._mapping = dict(mapping)
+        self._default = default
+
+        self.source_tags = list(self._mapping)
+        """The source tags, in the order of their ids.  Unknown source
+           tags have the id ``len(source_tags)``."""
+
+        targets = list(self._mapping.values())
+        if default is not None:
+            targets.append(default)
+        self.target_tags = list(dict.fromkeys(targets))
+        """The target tags, in the order of their ids."""
+
+        self._source_ids = {tag: i for i, tag in enumerate(self.source_tags)}
+        target_ids = {tag: i for i, tag in enumerate(self.target_tags)}
+        self._table = [target_ids[self._mapping[tag]] for tag in self.source_tags]
+        self._table.append(-1 if default is None else target_ids[default])
+
+    def map_tag(self, tag):
+        """
+        Map the source tag *tag* to the target tagset.
+        """
+        if self._default is None:
+            return self._mapping[tag]
+        return self._mapping.get(tag, self._default)
+
+    def map_tags(self, sentences):
+        """
+        Map the tags of the tagged sentences *sentences* to the target
+        tagset.
+
+        :type sentences: list(list(tuple(str, str)))
+        :rtype: list(list(tuple(str, str)))
+        """
+        mapping = self._mapping
+        if self._default is None:
+            return [
+                [(word, mapping[tag]) for (word, tag) in sent] for sent in sentences
+            ]
+        default = self._default
+        return [
+            [(word, mapping.get(tag, default)) for (word, tag) in sent]
+            for sent in sentences
+        ]
+
+    def encode(self, tags):
+        """
+        Return the ids of the source tags *tags*, as an array.
+
+        :rtype: numpy.ndarray
+        """
+        tags = list(tags)
+        unknown = len(self.source_tags)
+        ids = [self._source_ids.get(tag, unknown) for tag in tags]
+        if self._default is None and unknown in ids:
+            raise KeyError(tags[ids.index(unknown)])
+        return numpy.array(ids, dtype=numpy.intp)
+
+    def map_ids(self, ids):
+        """
+        Map the ids *ids* of source tags, as returned by ``encode()``,
+        to the ids of their target tags.  If there is no default target
+        tag, mapping the id of unknown source tags raises a ``KeyError``.
+
+        :type ids: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        ids = numpy.asarray(ids, dtype=numpy.intp)
+        unknown = len(self.source_tags)
+        if ids.size and (ids.min() < 0 or ids.max() > unknown):
+            raise IndexError("source tag id out of range")
+        if self._default is None and (ids == unknown).any():
+            raise KeyError(unknown)
+        return numpy.asarray(self._table, dtype=numpy.intp)[ids]
+
+    def decode(self, ids):
+        """
+        Return the target tags with the ids *ids*.
+
+        :rtype: list(str)
+        """
+        return [self.target_tags[i] for i in ids]
+
+
+def _canonical_source(source, target):
     # we need a systematic approach to naming
     if target == "universal":
         if source == "wsj":
             source = "en-ptb"
         if source == "brown":
             source = "en-brown"
+    return source
+
 
-    return tagset_mapping(source, target)[source_tag]
+def tag_mapper(source, target):
+    """
+    Return the ``TagMapper`` between tagsets, compiling it on first use.
+
+    >>> tag_mapper('en-ptb', 'universal').map_tags([[('dogs', 'NNS')]])
+    [[('dogs', 'NOUN')]]
+    """
+    source = _canonical_source(source, target)
+    mapper = _MAPPERS.get((source, target))
+    if mapper is None:
+        mapping = tagset_mapping(source, target)
+        factory = getattr(mapping, "default_factory", None)
+        mapper = TagMapper(mapping, factory() if factory else None)
+        _MAPPERS[source, target] = mapper
+    return mapper
+
+
+def map_tag(source, target, source_tag):
+    """
+    Maps the tag from the source tagset to the target tagset.
+
+    >>> map_tag('en-ptb', 'universal', 'VBZ')
+    'VERB'
+    >>> map_tag('en-ptb', 'universal', 'VBP')
+    'VERB'
+    >>> map_tag('en-ptb', 'universal', '``')
+    '.'
+    """
+    return tag_mapper(source, target).map_tag(source_tag)
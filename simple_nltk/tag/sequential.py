@@ -19,11 +19,13 @@ backoff tagger for any other SequentialBackoffTagger.
 """
 import ast
 from abc import abstractmethod
+from functools import lru_cache
+from operator import itemgetter
 
 import re
 
-from simple_nltk.probability import ConditionalFreqDist
 from simple_nltk.classify import NaiveBayesClassifier
+from simple_nltk.collections import AbstractLazySequence, LazyConcatenation, LazyMap
 
 from simple_nltk.tag.api import TaggerI, FeaturesetTaggerI
 
@@ -85,6 +87,16 @@ class SequentialBackoffTagger(TaggerI):
                 break
         return tag
 
+    def compile(self):
+        """
+        Flatten this tagger and its backoff taggers into lookup tables,
+        for faster tagging.  The tables are a snapshot: later changes to
+        the taggers are not reflected in the compiled tagger.
+
+        :rtype: CompiledBackoffTagger
+        """
+        return CompiledBackoffTagger(self)
+
     @abstractmethod
     def choose_tag(self, tokens, index, history):
         """
@@ -175,29 +187,39 @@ class ContextTagger(SequentialBackoffTagger):
         # perfectly by the backoff tagger.
         useful_contexts = set()
 
-        # Count how many times each tag occurs in each context.
-        fd = ConditionalFreqDist()
+        # The backoff chain is flattened once, rather than dispatching
+        # through each of its taggers for every token.
+        backoff = self.backoff.compile() if self.backoff is not None else None
+
+        # Count how many times each tag occurs in each context.  The
+        # history grows as the sentence is read, instead of being
+        # sliced from the gold tags for every token.
+        counts = {}
         for sentence in tagged_corpus:
             tokens, tags = zip(*sentence)
-            for index, (token, tag) in enumerate(sentence):
+            history = []
+            for index, tag in enumerate(tags):
                 # Record the event.
                 token_count += 1
-                context = self.context(tokens, index, tags[:index])
-                if context is None:
-                    continue
-                fd[context][tag] += 1
-                # If the backoff got it wrong, this context is useful:
-                if self.backoff is None or tag != self.backoff.tag_one(
-                    tokens, index, tags[:index]
-                ):
-                    useful_contexts.add(context)
+                context = self.context(tokens, index, history)
+                if context is not None:
+                    tag_counts = counts.get(context)
+                    if tag_counts is None:
+                        tag_counts = counts[context] = {}
+                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+                    # If the backoff got it wrong, this context is useful:
+                    if context not in useful_contexts and (
+                        backoff is None
+                        or tag != backoff.tag_one(tokens, index, history)
+                    ):
+                        useful_contexts.add(context)
+                history.append(tag)
 
         # Build the context_to_tag table -- for each context, figure
         # out what the most likely tag is.  Only include contexts that
         # we've seen at least `cutoff` times.
         for context in useful_contexts:
-            best_tag = fd[context].max()
-            hits = fd[context][best_tag]
+            best_tag, hits = max(counts[context].items(), key=itemgetter(1))
             if hits > cutoff:
                 self._context_to_tag[context] = best_tag
                 hit_count += hits
@@ -206,7 +228,7 @@ class ContextTagger(SequentialBackoffTagger):
         if verbose:
             size = len(self._context_to_tag)
             backoff = 100 - (hit_count * 100.0) / token_count
-            pruning = 100 - (size * 100.0) / len(fd.conditions())
+            pruning = 100 - (size * 100.0) / len(counts)
             print("[Trained Unigram tagger:", end=" ")
             print("size={}, backoff={:.2f}%, pruning={:.2f}%]".format(size, backoff, pruning))
 
@@ -560,6 +582,157 @@ class RegexpTagger(SequentialBackoffTagger):
         return "<Regexp Tagger: size={}>".format(len(self._regexps))
 
 
+class CompiledBackoffTagger(TaggerI):
+    """
+    A chain of sequential backoff taggers, flattened for fast tagging.
+    It tags exactly as the chain does, but:
+
+      - the tables of successive n-gram taggers (n > 1) are merged into
+        a single table, indexed by word, that holds only the tag
+        contexts in which each word was seen;
+      - the taggers at the end of the chain that only look at the word
+        itself (unigram, affix, regexp and default taggers) are
+        consulted once per distinct word, and their answer cached.
+
+    Other taggers in the chain are consulted through ``choose_tag()``
+    as usual.  Use ``SequentialBackoffTagger.compile()`` to create one.
+
+        >>> from simple_nltk.tag import DefaultTagger, UnigramTagger, BigramTagger
+        >>> train = [[('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')],
+        ...          [('they', 'PRP'), ('dog', 'VBP'), ('us', 'PRP')]]
+        >>> tagger = BigramTagger(train, backoff=UnigramTagger(
+        ...     train, backoff=DefaultTagger('NN')))
+        >>> compiled = tagger.compile()
+        >>> compiled.tag(['they', 'dog', 'the', 'dog'])
+        [('they', 'PRP'), ('dog', 'VBP'), ('the', 'DT'), ('dog', 'NN')]
+        >>> compiled.tag_sents([['they', 'dog']]) == tagger.tag_sents([['they', 'dog']])
+        True
+
+    :param tagger: The first tagger of the chain.
+    :type tagger: SequentialBackoffTagger
+    """
+
+    def __init__(self, tagger):
+        taggers = tagger._taggers
+        # The taggers at the end of the chain that only look at the word.
+        start = len(taggers)
+        while start > 0 and _is_word_tagger(taggers[start - 1]):
+            start -= 1
+        self._tail = taggers[start:]
+        self._tail_tags = {}
+        self._levels = []
+        for level in taggers[:start]:
+            if type(level) in _NGRAM_TAGGERS:
+                if not (self._levels and type(self._levels[-1]) is dict):
+                    self._levels.append({})
+                merged = self._levels[-1]
+                history_size = level._n - 1
+                for (tag_context, word), tag in level._context_to_tag.items():
+                    contexts = merged.setdefault(word, [])
+                    if not contexts or contexts[-1][0] is not level:
+                        contexts.append((level, history_size, {}))
+                    contexts[-1][2][tag_context] = tag
+            else:
+                self._levels.append(level)
+        # Drop the taggers, which were only needed to group the tables.
+        for merged in self._levels:
+            if type(merged) is dict:
+                for word, contexts in merged.items():
+                    merged[word] = [(size, table) for (_, size, table) in contexts]
+
+    def _tail_tag(self, word):
+        try:
+            return self._tail_tags[word]
+        except KeyError:
+            tag = None
+            for tagger in self._tail:
+                tag = tagger.choose_tag([word], 0, [])
+                if tag is not None:
+                    break
+            self._tail_tags[word] = tag
+            return tag
+
+    def tag_one(self, tokens, index, history):
+        """
+        Determine the tag for the specified token, as
+        ``SequentialBackoffTagger.tag_one()`` does.
+
+        :rtype: str
+        :type tokens: list
+        :param tokens: The list of words that are being tagged.
+        :type index: int
+        :param index: The index of the word whose tag should be
+            returned.
+        :type history: list(str)
+        :param history: A list of the tags for all words before *index*.
+        """
+        word = tokens[index]
+        for level in self._levels:
+            if type(level) is dict:
+                for size, table in level.get(word, ()):
+                    tag = table.get(tuple(history[max(0, index - size) : index]))
+                    if tag is not None:
+                        return tag
+            else:
+                tag = level.choose_tag(tokens, index, history)
+                if tag is not None:
+                    return tag
+        return self._tail_tag(word)
+
+    def tag(self, tokens):
+        # docs inherited from TaggerI
+        return self.tag_sents([tokens])[0]
+
+    def tag_sents(self, sentences):
+        # docs inherited from TaggerI
+        # This is tag_one() inlined, for a history that always holds
+        # exactly the tags before the current token.
+        levels = self._levels
+        tail_tags = self._tail_tags
+        tail_tag = self._tail_tag
+        tagged = []
+        for tokens in sentences:
+            history = []
+            for index, word in enumerate(tokens):
+                tag = None
+                for level in levels:
+                    if type(level) is dict:
+                        for size, table in level.get(word, ()):
+                            if index > size:
+                                tag = table.get(tuple(history[index - size :]))
+                            else:
+                                tag = table.get(tuple(history))
+                            if tag is not None:
+                                break
+                    else:
+                        tag = level.choose_tag(tokens, index, history)
+                    if tag is not None:
+                        break
+                else:
+                    tag = tail_tags[word] if word in tail_tags else tail_tag(word)
+                history.append(tag)
+            tagged.append(list(zip(tokens, history)))
+        return tagged
+
+    def __repr__(self):
+        return "<CompiledBackoffTagger: levels={}>".format(
+            len(self._levels) + len(self._tail)
+        )
+
+
+# The taggers whose tables a CompiledBackoffTagger can merge.  Their
+# subclasses may override context(), so only these exact types qualify.
+_NGRAM_TAGGERS = (NgramTagger, BigramTagger, TrigramTagger)
+_WORD_TAGGERS = (UnigramTagger, AffixTagger, RegexpTagger, DefaultTagger)
+
+
+def _is_word_tagger(tagger):
+    """Whether the tag chosen by ``tagger`` only depends on the word."""
+    if type(tagger) in _NGRAM_TAGGERS:
+        return tagger._n == 1
+    return type(tagger) in _WORD_TAGGERS
+
+
 class ClassifierBasedTagger(SequentialBackoffTagger, FeaturesetTaggerI):
     """
     A sequential tagger that uses a classifier to choose the tag for
@@ -651,28 +824,93 @@ class ClassifierBasedTagger(SequentialBackoffTagger, FeaturesetTaggerI):
         tag = pdist.max()
         return tag if pdist.prob(tag) >= self._cutoff_prob else None
 
+    def choose_tags(self, featuresets):
+        """
+        Use the classifier to pick a tag for each of the featuresets
+        *featuresets* at once, as ``choose_tag()`` does for one.
+
+        :rtype: list(str or None)
+        """
+        if self._cutoff_prob is None:
+            return self._classifier.classify_many(featuresets)
+
+        tags = []
+        for pdist in self._classifier.prob_classify_many(featuresets):
+            tag = pdist.max()
+            tags.append(tag if pdist.prob(tag) >= self._cutoff_prob else None)
+        return tags
+
+    def tag_sents(self, sentences):
+        """
+        Apply the ``tag()`` method to all sentences at once: the tokens
+        at each index of all the sentences are classified in a single
+        batch, since the featureset of each token depends on the tags
+        before it.
+
+        :rtype: list(list(tuple(str, str)))
+        """
+        sentences = list(sentences)
+        histories = [[] for tokens in sentences]
+        # Sort the sentences from longest to shortest, so that those
+        # that reach each index come first.
+        order = sorted(
+            range(len(sentences)), key=lambda i: len(sentences[i]), reverse=True
+        )
+        active = len(order)
+        for index in range(len(sentences[order[0]]) if order else 0):
+            while len(sentences[order[active - 1]]) <= index:
+                active -= 1
+            featuresets = [
+                self.feature_detector(sentences[i], index, histories[i])
+                for i in order[:active]
+            ]
+            tags = self.choose_tags(featuresets)
+            for i, tag in zip(order[:active], tags):
+                if tag is None and self.backoff is not None:
+                    tag = self.backoff.tag_one(sentences[i], index, histories[i])
+                histories[i].append(tag)
+        return [list(zip(tokens, tags)) for tokens, tags in zip(sentences, histories)]
+
     def _train(self, tagged_corpus, classifier_builder, verbose):
         """
         Build a new classifier, based on the given training data
-        *tagged_corpus*.
+        *tagged_corpus*.  The labeled featuresets are constructed
+        lazily, one sentence at a time, whenever the classifier
+        builder reads them.
         """
-
-        classifier_corpus = []
         if verbose:
             print("Constructing training corpus for classifier.")
 
-        for sentence in tagged_corpus:
-            history = []
-            untagged_sentence, tags = zip(*sentence)
-            for index in range(len(sentence)):
-                featureset = self.feature_detector(untagged_sentence, index, history)
-                classifier_corpus.append((featureset, tags[index]))
-                history.append(tags[index])
+        if not isinstance(tagged_corpus, (list, tuple, AbstractLazySequence)):
+            tagged_corpus = list(tagged_corpus)
+        classifier_corpus = LazyConcatenation(
+            LazyMap(self._labeled_featuresets, tagged_corpus)
+        )
 
         if verbose:
-            print("Training classifier ({} instances)".format(len(classifier_corpus)))
+            print(
+                "Training classifier ({} instances)".format(
+                    sum(len(sentence) for sentence in tagged_corpus)
+                )
+            )
         self._classifier = classifier_builder(classifier_corpus)
 
+    def _labeled_featuresets(self, sentence):
+        """
+        Return the list of (featureset, tag) pairs for the tagged
+        sentence *sentence*.
+        """
+        if not sentence:
+            return []
+        history = []
+        labeled_featuresets = []
+        untagged_sentence, tags = zip(*sentence)
+        for index in range(len(sentence)):
+            featureset = self.feature_detector(untagged_sentence, index, history)
+            labeled_featuresets.append((featureset, tags[index]))
+            history.append(tags[index])
+        return labeled_featuresets
+
     def __repr__(self):
         return "<ClassifierBasedTagger: {}>".format(self._classifier)
 
@@ -709,42 +947,52 @@ class ClassifierBasedPOSTagger(ClassifierBasedTagger):
             prevword = prevprevword = None
             prevtag = prevprevtag = None
         elif index == 1:
-            prevword = tokens[index - 1].lower()
+            prevword = _word_shape(tokens[index - 1])[0]
             prevprevword = None
             prevtag = history[index - 1]
             prevprevtag = None
         else:
-            prevword = tokens[index - 1].lower()
-            prevprevword = tokens[index - 2].lower()
+            prevword = _word_shape(tokens[index - 1])[0]
+            prevprevword = _word_shape(tokens[index - 2])[0]
             prevtag = history[index - 1]
             prevprevtag = history[index - 2]
 
-        if re.match("[0-9]+(\.[0-9]*)?|[0-9]*\.[0-9]+$", word):
-            shape = "number"
-        elif re.match("\W+$", word):
-            shape = "punct"
-        elif re.match("[A-Z][a-z]+$", word):
-            shape = "upcase"
-        elif re.match("[a-z]+$", word):
-            shape = "downcase"
-        elif re.match("\w+$", word):
-            shape = "mixedcase"
-        else:
-            shape = "other"
+        lower, shape = _word_shape(word)
 
         features = {
             "prevtag": prevtag,
             "prevprevtag": prevprevtag,
             "word": word,
-            "word.lower": word.lower(),
-            "suffix3": word.lower()[-3:],
-            "suffix2": word.lower()[-2:],
-            "suffix1": word.lower()[-1:],
+            "word.lower": lower,
+            "suffix3": lower[-3:],
+            "suffix2": lower[-2:],
+            "suffix1": lower[-1:],
             "prevprevword": prevprevword,
             "prevword": prevword,
-            "prevtag+word": "{}+{}".format(prevtag, word.lower()),
-            "prevprevtag+word": "{}+{}".format(prevprevtag, word.lower()),
-            "prevword+word": "{}+{}".format(prevword, word.lower()),
+            "prevtag+word": "{}+{}".format(prevtag, lower),
+            "prevprevtag+word": "{}+{}".format(prevprevtag, lower),
+            "prevword+word": "{}+{}".format(prevword, lower),
             "shape": shape,
         }
         return features
+
+
+@lru_cache(maxsize=100000)
+def _word_shape(word):
+    """
+    Return the lowercased form and the shape of *word*, the features of
+    ``ClassifierBasedPOSTagger`` that do not depend on the history.
+    """
+    if re.match("[0-9]+(\.[0-9]*)?|[0-9]*\.[0-9]+$", word):
+        shape = "number"
+    elif re.match("\W+$", word):
+        shape = "punct"
+    elif re.match("[A-Z][a-z]+$", word):
+        shape = "upcase"
+    elif re.match("[a-z]+$", word):
+        shape = "downcase"
+    elif re.match("\w+$", word):
+        shape = "mixedcase"
+    else:
+        shape = "other"
+    return word.lower(), shape
@@ -19,6 +19,9 @@ from operator import itemgetter
 
 from simple_nltk.probability import FreqDist, ConditionalFreqDist
 from simple_nltk.tag.api import TaggerI
+from simple_nltk.tag.util import _set_worker_tagger, _worker_tag_sents
+
+_EMPTY = {}
 
 
 class TnT(TaggerI):
@@ -131,6 +134,8 @@ class TnT(TaggerI):
         self.unknown = 0
         self.known = 0
 
+        self._compile()
+
     def train(self, data):
         """
         Uses a set of tagged data to train the tagger.
@@ -173,6 +178,9 @@ class TnT(TaggerI):
         # compute lambda values from the trained frequency distributions
         self._compute_lambda()
 
+        # precompute the probabilities used while tagging
+        self._compile()
+
     def _compute_lambda(self):
         """
         creates lambda values based upon training data
@@ -264,22 +272,94 @@ class TnT(TaggerI):
         else:
             return v1 / v2
 
-    def tagdata(self, data):
+    def _compile(self):
+        """
+        Precompute the probabilities used while tagging, over integer
+        tag ids, so that decoding does not go through the frequency
+        distributions:
+
+        - ``_p_uni[k]``: P(t_i) of the tag with id k
+        - ``_p_bi[h2][k]``: P(t_i | t_i-1) for the seen tag bigrams
+        - ``_p_tri[h1, h2][k]``: P(t_i | t_i-2, t_i-1) for the seen
+          tag trigrams
+        - ``_lexicon[word]``: the possible tags of each known word,
+          as (tag, tag id, log(P(w_i | t_i), 2)) tuples, in the order
+          they were first seen
+
+        NOTE: a tag id stands for a (tag, C) pair
+        """
+        self._tags = list(self._uni)
+        self._tag_ids = {tC: k for (k, tC) in enumerate(self._tags)}
+        for history in self._tri.conditions():
+            for tC in history:
+                self._tag_id(tC)
+        tag_id = self._tag_ids.get
+
+        self._p_uni = [self._uni.freq(tC) for tC in self._tags]
+        self._p_bi = {}
+        for h2 in self._bi.conditions():
+            fd = self._bi[h2]
+            self._p_bi[tag_id(h2)] = {tag_id(tC): fd.freq(tC) for tC in fd}
+        self._p_tri = {}
+        for (h1, h2) in self._tri.conditions():
+            fd = self._tri[(h1, h2)]
+            self._p_tri[tag_id(h1), tag_id(h2)] = {
+                tag_id(tC): fd.freq(tC) for tC in fd
+            }
+
+        self._lexicon = {}
+        for word in self._wd.conditions():
+            C = bool(self._C and word[0].isupper())
+            candidates = []
+            for t, count in self._wd[word].items():
+                tC = (t, C)
+                p_wd = count / self._uni[tC]
+                candidates.append((t, tag_id(tC), log(p_wd, 2)))
+            self._lexicon[word] = candidates
+
+    def _tag_id(self, tC):
+        """
+        Return the id of a (tag, C) pair, adding it to the known tags
+        if it is new (e.g. a tag chosen by the unknown word tagger).
+        """
+        k = self._tag_ids.get(tC)
+        if k is None:
+            k = self._tag_ids[tC] = len(self._tags)
+            self._tags.append(tC)
+        return k
+
+    def tagdata(self, data, processes=1, batch_size=100):
         """
         Tags each sentence in a list of sentences
 
         :param data:list of list of words
         :type data: [[string,],]
+        :param processes: the number of worker processes to tag with
+        :type processes: int
+        :param batch_size: the number of sentences sent to a worker
+            process at a time
+        :type batch_size: int
         :return: list of list of (word, tag) tuples
 
         Invokes tag(sent) function for each sentence
         compiles the results into a list of tagged sentences
         each tagged sentence is a list of (word, tag) tuples
         """
-        res = []
-        for sent in data:
-            res1 = self.tag(sent)
-            res.append(res1)
+        if processes <= 1:
+            return [self.tag(sent) for sent in data]
+
+        from multiprocessing import Pool
+
+        data = list(data)
+        batches = [data[i : i + batch_size] for i in range(0, len(data), batch_size)]
+        pool = Pool(processes, initializer=_set_worker_tagger, initargs=(self,))
+        try:
+            res = []
+            for tagged in pool.imap(_worker_tag_sents, batches):
+                res.extend(tagged)
+        finally:
+            pool.close()
+            pool.join()
         return res
 
     def tag(self, data):
@@ -291,122 +371,128 @@ class TnT(TaggerI):
 
         :return: [(word, tag),]
 
-        Calls recursive function '_tagword'
-        to produce a list of tags
+        Calls '_tagword' to produce a list of tags
 
         Associates the sequence of returned tags
         with the correct words in the input sequence
 
         returns a list of (word, tag) tuples
         """
-
-        current_state = [(["BOS", "BOS"], 0.0)]
-
         sent = list(data)
+        tags = self._tagword(sent)
+        return list(zip(sent, tags))
 
-        tags = self._tagword(sent, current_state)
-
-        res = []
-        for i in range(len(sent)):
-            # unpack and discard the C flags
-            (t, C) = tags[i + 2]
-            res.append((sent[i], t))
-
-        return res
-
-    def _tagword(self, sent, current_states):
+    def _tagword(self, sent):
         """
-        :param sent : List of words remaining in the sentence
+        :param sent : List of words in the sentence
         :type sent  : [word,]
-        :param current_states : List of possible tag combinations for
-                                the sentence so far, and the log probability
-                                associated with each tag combination
-        :type current_states  : [([tag, ], logprob), ]
+        :return: the most probable tags for the words
 
-        Tags the first word in the sentence and
-        recursively tags the reminder of sentence
+        Tags the words of the sentence from left to right with a
+        trigram Viterbi beam search, using the formula specified above
+        to calculate the probability of a particular tag.
 
-        Uses formula specified above to calculate the probability
-        of a particular tag
+        Each state of the search is a pair (t_i-1, t_i) of tag ids.
+        The paths reaching the same state can only be extended in the
+        same ways, so only the most probable of them is kept.  After
+        each word, the N most probable states are kept (the beam).
         """
-
-        # if this word marks the end of the sentance,
-        # return the most probable tag
-        if sent == []:
-            (h, logp) = current_states[0]
-            return h
-
-        # otherwise there are more words to be tagged
-        word = sent[0]
-        sent = sent[1:]
-        new_states = []
-
-        # if the Capitalisation is requested,
-        # initalise the flag for this word
-        C = False
-        if self._C and word[0].isupper():
-            C = True
-
-        # if word is known
-        # compute the set of possible tags
-        # and their associated log probabilities
-        if word in self._wd:
-            self.known += 1
-
-            for (history, curr_sent_logprob) in current_states:
-                logprobs = []
-
-                for t in self._wd[word].keys():
-                    tC = (t, C)
-                    p_uni = self._uni.freq(tC)
-                    p_bi = self._bi[history[-1]].freq(tC)
-                    p_tri = self._tri[tuple(history[-2:])].freq(tC)
-                    p_wd = self._wd[word][t] / self._uni[tC]
-                    p = self._l1 * p_uni + self._l2 * p_bi + self._l3 * p_tri
-                    p2 = log(p, 2) + log(p_wd, 2)
-
-                    # compute the result of appending each tag to this history
-                    new_states.append((history + [tC], curr_sent_logprob + p2))
-
-        # otherwise a new word, set of possible tags is unknown
-        else:
-            self.unknown += 1
-
-            # since a set of possible tags,
-            # and the probability of each specific tag
-            # can not be returned from most classifiers:
-            # specify that any unknown words are tagged with certainty
-            p = 1
-
-            # if no unknown word tagger has been specified
-            # then use the tag 'Unk'
-            if self._unk is None:
-                tag = ("Unk", C)
-
-            # otherwise apply the unknown word tagger
+        p_uni = self._p_uni
+        p_bi = self._p_bi
+        p_tri = self._p_tri
+        l1, l2, l3 = self._l1, self._l2, self._l3
+
+        # Each state is (h1, h2, logprob), with its back pointer into
+        # the states of the previous word.  The sentence starts in the
+        # state (BOS, BOS), whose tag id -1 has no transitions.
+        states = [(-1, -1, 0.0)]
+        lattice = []
+
+        for word in sent:
+            # if the Capitalisation is requested,
+            # initalise the flag for this word
+            C = False
+            if self._C and word[0].isupper():
+                C = True
+
+            candidates = self._lexicon.get(word)
+
+            # if word is known
+            # compute the set of possible tags
+            # and their associated log probabilities
+            if candidates is not None:
+                self.known += 1
+
+                new_states = []
+                for (parent, (h1, h2, logprob)) in enumerate(states):
+                    bi = p_bi.get(h2, _EMPTY)
+                    tri = p_tri.get((h1, h2), _EMPTY)
+                    for (t, k, logp_wd) in candidates:
+                        p = l1 * p_uni[k] + l2 * bi.get(k, 0.0) + l3 * tri.get(k, 0.0)
+                        p2 = log(p, 2) + logp_wd
+                        new_states.append((logprob + p2, h2, k, parent))
+
+                # sort states by log prob
+                # set is now ordered greatest to least log probability
+                new_states.sort(reverse=True, key=itemgetter(0))
+
+                # keep the most probable path into each state, up to N
+                # states (the beam search cut)
+                seen = set()
+                states = []
+                pointers = []
+                for (logprob, h2, k, parent) in new_states:
+                    if (h2, k) not in seen:
+                        seen.add((h2, k))
+                        states.append((h2, k, logprob))
+                        pointers.append(parent)
+                        if len(states) == self._N:
+                            break
+
+            # otherwise a new word, set of possible tags is unknown
             else:
-                [(_w, t)] = list(self._unk.tag([word]))
-                tag = (t, C)
-
-            for (history, logprob) in current_states:
-                history.append(tag)
+                self.unknown += 1
 
-            new_states = current_states
+                # since a set of possible tags,
+                # and the probability of each specific tag
+                # can not be returned from most classifiers:
+                # specify that any unknown words are tagged with certainty
 
-        # now have computed a set of possible new_states
+                # if no unknown word tagger has been specified
+                # then use the tag 'Unk'
+                if self._unk is None:
+                    tag = ("Unk", C)
 
-        # sort states by log prob
-        # set is now ordered greatest to least log probability
-        new_states.sort(reverse=True, key=itemgetter(1))
-
-        # del everything after N (threshold)
-        # this is the beam search cut
-        if len(new_states) > self._N:
-            new_states = new_states[: self._N]
-
-        # compute the tags for the rest of the sentence
-        # return the best list of tags for the sentence
-        return self._tagword(sent, new_states)
+                # otherwise apply the unknown word tagger
+                else:
+                    [(_w, t)] = list(self._unk.tag([word]))
+                    tag = (t, C)
+
+                k = self._tag_id(tag)
+                # the order of the states is unchanged, but states
+                # that only differed in t_i-1 now coincide
+                seen = set()
+                new_states = states
+                states = []
+                pointers = []
+                for (parent, (h1, h2, logprob)) in enumerate(new_states):
+                    if h2 not in seen:
+                        seen.add(h2)
+                        states.append((h2, k, logprob))
+                        pointers.append(parent)
+
+            lattice.append((states, pointers))
+
+        # follow the back pointers from the most probable final state,
+        # and discard the C flags
+        tags = []
+        best = 0
+        for (states, pointers) in reversed(lattice):
+            (t, C) = self._tags[states[best][1]]
+            tags.append(t)
+            best = pointers[best]
+        tags.reverse()
+        return tags
 
 
 ########################################
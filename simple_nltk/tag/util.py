@@ -6,6 +6,8 @@
 # URL: <http://simple_nltk.org/>
 # For license information, see LICENSE.TXT
 
+from operator import eq
+
 
 def str2tuple(s, sep="/"):
     """
@@ -70,3 +72,128 @@ def untag(tagged_sentence):
 
     """
     return [w for (w, t) in tagged_sentence]
+
+
+class TagScore(object):
+    """
+    The accumulated results of a tagger on tagged sentences: the number
+    of tokens and sentences tagged, the number of tokens tagged
+    correctly, and the time spent tagging them.  Only these counts are
+    kept, so a tagger can be scored on a corpus of any size; the scores
+    of several parts of a corpus are combined with ``merge()``.
+    ``TaggerI.score()`` computes the score of a tagger on a corpus.
+
+        >>> from simple_nltk.tag.util import TagScore
+        >>> score = TagScore()
+        >>> score.score([[('the', 'DT'), ('dog', 'NN')], [('ran', 'VBD')]],
+        ...             [[('the', 'DT'), ('dog', 'VB')], [('ran', 'VBD')]])
+        >>> score.accuracy()
+        0.6666666666666666
+        >>> len(score)
+        3
+    """
+
+    def __init__(self):
+        self._correct = 0
+        self._tokens = 0
+        self._sentences = 0
+        self._seconds = 0.0
+
+    def score(self, gold, tagged):
+        """
+        Add a batch of tagged sentences.
+
+        :param gold: the gold standard tagged sentences
+        :type gold: list(list(tuple(str, str)))
+        :param tagged: the same sentences, as tagged by the tagger
+        :type tagged: list(list(tuple(str, str)))
+        :raise ValueError: If a sentence was tagged with a different
+            number of tokens than its gold standard, or the number of
+            sentences differs.
+        """
+        if len(gold) != len(tagged):
+            raise ValueError("Lists must have the same length.")
+        for gold_sent, tagged_sent in zip(gold, tagged):
+            if len(gold_sent) != len(tagged_sent):
+                raise ValueError("Lists must have the same length.")
+            self._correct += sum(map(eq, gold_sent, tagged_sent))
+            self._tokens += len(gold_sent)
+            self._sentences += 1
+
+    def merge(self, other):
+        """Add the results accumulated in another ``TagScore``."""
+        self._correct += other._correct
+        self._tokens += other._tokens
+        self._sentences += other._sentences
+        self._seconds += other._seconds
+
+    def accuracy(self):
+        """
+        :return: The fraction of tokens tagged correctly.
+        :rtype: float
+        :raise ZeroDivisionError: If no tokens were scored.
+        """
+        return self._correct / self._tokens
+
+    def sentences(self):
+        """
+        :return: The number of sentences scored.
+        :rtype: int
+        """
+        return self._sentences
+
+    def seconds(self):
+        """
+        :return: The time spent tagging the scored sentences, in seconds.
+        :rtype: float
+        """
+        return self._seconds
+
+    def tokens_per_second(self):
+        """
+        :return: The number of tokens tagged per second, or None if no
+            time was recorded.
+        :rtype: float
+        """
+        if not self._seconds:
+            return None
+        return self._tokens / self._seconds
+
+    def __len__(self):
+        return self._tokens
+
+    def __repr__(self):
+        return "<TagScore of %d tokens>" % self._tokens
+
+    def __str__(self):
+        speed = self.tokens_per_second()
+        return (
+            "Tagging score:\n"
+            + "    Accuracy:   {:5.1f}%\n".format(self.accuracy() * 100)
+            + "    Tokens:     {:d}\n".format(self._tokens)
+            + "    Tokens/sec: {}".format("-" if speed is None else "%.0f" % speed)
+        )
+
+
+def _tag_batch(tagger, gold):
+    """Tag a batch of gold standard sentences, returning its ``TagScore``."""
+    tagged = tagger.tag_sents([untag(sent) for sent in gold])
+    score = TagScore()
+    score.score(gold, [list(sent) for sent in tagged])
+    return score
+
+
+_worker_tagger = None
+
+
+def _set_worker_tagger(tagger):
+    global _worker_tagger
+    _worker_tagger = tagger
+
+
+def _worker_tag_batch(gold):
+    return _tag_batch(_worker_tagger, gold)
+
+
+def _worker_tag_sents(sentences):
+    return _worker_tagger.tag_sents(sentences)
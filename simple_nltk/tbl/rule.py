@@ -152,19 +152,37 @@ class Rule(TagRule):
             tuple(tuple(feat) for feat in obj["conditions"])
         )
 
-    def applies(self, tokens, index):
-        # Inherit docs from TagRule
-
+    def applies(self, tokens, index, values=None):
+        """
+        See L{TagRule.applies}.
+
+        :param values: optionally, the property values of C{tokens},
+            as a mapping from each Feature class to the list of values
+            of its property at each position (see
+            L{Template.property_values}).  They are looked up instead
+            of being extracted again.
+        :type values: dict or None
+        """
         # Does the given token have this Rule's "original tag"?
         if tokens[index][1] != self.original_tag:
             return False
 
         # Check to make sure that every condition holds.
+        n = len(tokens)
         for (feature, val) in self._conditions:
 
             # Look for *any* token that satisfies the condition.
+            if values is not None:
+                props = values[feature.__class__]
+                for pos in feature.positions:
+                    if 0 <= index + pos < n and props[index + pos] == val:
+                        break
+                else:
+                    return False
+                continue
+
             for pos in feature.positions:
-                if not (0 <= index + pos < len(tokens)):
+                if not (0 <= index + pos < n):
                     continue
                 if feature.extract_property(tokens, index + pos) == val:
                     break
@@ -187,6 +205,13 @@ class Rule(TagRule):
     def __ne__(self, other):
         return not (self == other)
 
+    def __getstate__(self):
+        # The cached hash depends on the string hashing of this process,
+        # so it must not travel to another one.
+        state = self.__dict__.copy()
+        state.pop("_Rule__hash", None)
+        return state
+
     def __hash__(self):
 
         # Cache our hash value (justified by profiling.)
@@ -148,7 +148,16 @@ class Template(BrillTemplateI):
             ",".join([str(f) for f in self._features]),
         )
 
-    def applicable_rules(self, tokens, index, correct_tag):
+    def applicable_rules(self, tokens, index, correct_tag, values=None):
+        """
+        See L{BrillTemplateI.applicable_rules}.
+
+        :param values: optionally, the property values of C{tokens},
+            as a mapping from each Feature class to the list of values
+            of its property at each position (see L{property_values}).
+            They are looked up instead of being extracted again.
+        :type values: dict or None
+        """
         if tokens[index][1] == correct_tag:
             return []
 
@@ -157,11 +166,11 @@ class Template(BrillTemplateI):
         # Then, generate one Rule for each combination of features
         # (the crossproduct of the conditions).
 
-        applicable_conditions = self._applicable_conditions(tokens, index)
+        applicable_conditions = self._applicable_conditions(tokens, index, values)
         xs = list(it.product(*applicable_conditions))
         return [Rule(self.id, tokens[index][1], correct_tag, tuple(x)) for x in xs]
 
-    def _applicable_conditions(self, tokens, index):
+    def _applicable_conditions(self, tokens, index, values=None):
         """
         :returns: A set of all conditions for rules
         that are applicable to C{tokens[index]}.
@@ -170,13 +179,43 @@ class Template(BrillTemplateI):
 
         for feature in self._features:
             conditions.append([])
+            if values is not None:
+                props = values[feature.__class__]
             for pos in feature.positions:
                 if not (0 <= index + pos < len(tokens)):
                     continue
-                value = feature.extract_property(tokens, index + pos)
+                if values is not None:
+                    value = props[index + pos]
+                else:
+                    value = feature.extract_property(tokens, index + pos)
                 conditions[-1].append((feature, value))
         return conditions
 
+    @staticmethod
+    def property_values(tokens, feature_classes):
+        """
+        Extract the property values of C{tokens} for the given Feature
+        classes, for use with C{applicable_rules()} and C{Rule.applies()}.
+
+        >>> from simple_nltk.tbl.template import Template
+        >>> from simple_nltk.tag.brill import Word, Pos
+        >>> values = Template.property_values([('a', 'DT'), ('cat', 'NN')], [Word, Pos])
+        >>> values[Word], values[Pos]
+        (['a', 'cat'], ['DT', 'NN'])
+
+        :param tokens: a tagged sentence
+        :type tokens: list(tuple)
+        :param feature_classes: the Feature classes whose properties
+            to extract
+        :returns: a mapping from each Feature class to the list of
+            values of its property at each position of C{tokens}
+        :rtype: dict
+        """
+        return {
+            cls: [cls.extract_property(tokens, i) for i in range(len(tokens))]
+            for cls in feature_classes
+        }
+
     def get_neighborhood(self, tokens, index):
         # inherit docs from BrillTemplateI
 
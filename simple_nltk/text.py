@@ -15,17 +15,23 @@ distributional similarity.
 """
 
 from math import log
-from collections import defaultdict, Counter, namedtuple
-from functools import reduce
+from array import array
+from collections import namedtuple
+import os
+import pickle
 import re
 import sys
 
+try:
+    import numpy
+except ImportError:
+    pass
+
 from simple_nltk.lm import MLE
 from simple_nltk.lm.preprocessing import padded_everygram_pipeline
 from simple_nltk.probability import FreqDist
-from simple_nltk.probability import ConditionalFreqDist as CFD
 from simple_nltk.util import tokenwrap, LazyConcatenation
-from simple_nltk.metrics import f_measure, BigramAssocMeasures
+from simple_nltk.metrics import BigramAssocMeasures
 from simple_nltk.collocations import BigramCollocationFinder
 from simple_nltk.tokenize import simple_sent_tokenize
 
@@ -41,6 +47,12 @@ class ContextIndex(object):
     The context of a word is usually defined to be the words that occur
     in a fixed window around the word; but other definitions may also
     be used by providing a custom context function.
+
+    Words and contexts are interned as integer ids, and the word/context
+    co-occurrence counts are stored as a sparse matrix in compressed row
+    form, once indexed by word and once by context.  Similarity queries
+    are then sparse row products over these arrays.  An index can be
+    saved with ``save()`` and reloaded in another process with ``load()``.
     """
 
     @staticmethod
@@ -59,11 +71,37 @@ class ContextIndex(object):
             self._context_func = self._default_context
         if filter:
             tokens = [t for t in tokens if filter(t)]
-        self._word_to_contexts = CFD(
-            (self._key(w), self._context_func(tokens, i)) for i, w in enumerate(tokens)
+
+        # intern the words and contexts, in order of first occurrence
+        self._word_ids = {}
+        self._context_ids = {}
+        word_ids = array("q")
+        context_ids = array("q")
+        for i, w in enumerate(tokens):
+            w = self._key(w)
+            c = self._context_func(tokens, i)
+            word_ids.append(self._word_ids.setdefault(w, len(self._word_ids)))
+            context_ids.append(self._context_ids.setdefault(c, len(self._context_ids)))
+        self._words = list(self._word_ids)
+        self._contexts = list(self._context_ids)
+
+        # count each (word, context) pair, remembering where it first occurred
+        word_ids = numpy.frombuffer(word_ids, numpy.int64)
+        context_ids = numpy.frombuffer(context_ids, numpy.int64)
+        pairs, first, counts = numpy.unique(
+            word_ids * max(len(self._contexts), 1) + context_ids,
+            return_index=True,
+            return_counts=True,
+        )
+        word_ids = word_ids[first]
+        context_ids = context_ids[first]
+
+        # the rows of each matrix list their entries in order of first occurrence
+        self._word_index = _CompressedRows(
+            word_ids, context_ids, counts, first, len(self._words)
         )
-        self._context_to_words = CFD(
-            (self._context_func(tokens, i), self._key(w)) for i, w in enumerate(tokens)
+        self._context_index = _CompressedRows(
+            context_ids, word_ids, counts, first, len(self._contexts)
         )
 
     def tokens(self):
@@ -74,30 +112,114 @@ class ContextIndex(object):
         """
         return self._tokens
 
+    def save(self, path):
+        """
+        Save the index to ``path``, so that it can be reloaded with
+        ``ContextIndex.load()`` without recounting the document.  The
+        document itself and the key and context functions are not saved.
+        """
+        state = {
+            "words": self._words,
+            "contexts": self._contexts,
+            "word_index": self._word_index,
+            "context_index": self._context_index,
+        }
+        with open(path, "wb") as outfile:
+            pickle.dump(state, outfile, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, key=lambda x: x, tokens=None):
+        """
+        Load an index saved with ``save()``.
+
+        :param key: The key function that the index was built with.
+        :param tokens: The document that the index was built from, if
+            it is needed by ``tokens()``.
+        """
+        with open(path, "rb") as infile:
+            state = pickle.load(infile)
+        index = cls.__new__(cls)
+        index._key = key
+        index._tokens = tokens
+        index._context_func = None
+        index._words = state["words"]
+        index._contexts = state["contexts"]
+        index._word_ids = {w: i for i, w in enumerate(index._words)}
+        index._context_ids = {c: i for i, c in enumerate(index._contexts)}
+        index._word_index = state["word_index"]
+        index._context_index = state["context_index"]
+        return index
+
+    def _overlap(self, word_id, binary):
+        """
+        Score every word by its shared contexts with the given word: the
+        number of shared contexts if ``binary``, and otherwise the sum
+        over shared contexts of the product of the two words' counts.
+        """
+        contexts, counts = self._word_index.row(word_id)
+        words, positions = self._context_index.gather(contexts)
+        if binary:
+            weights = None
+        else:
+            weights = self._context_index.counts[words] * numpy.repeat(
+                counts, positions
+            )
+        return numpy.bincount(
+            self._context_index.indices[words],
+            weights=weights,
+            minlength=len(self._words),
+        )
+
+    def _top_words(self, scores, n, exclude):
+        """
+        The ``n`` highest scoring words, ignoring words that score zero;
+        words with equal scores are ordered by first occurrence.
+        """
+        scores[exclude] = 0
+        candidates = numpy.flatnonzero(scores > 0)
+        if len(candidates) > n:
+            kth = len(candidates) - n
+            threshold = numpy.partition(scores[candidates], kth)[kth]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = numpy.lexsort((candidates, -scores[candidates]))
+        return [self._words[i] for i in candidates[order][:n]]
+
+    def __contains__(self, word):
+        """
+        Whether ``word``, after applying the index's key, occurs in the
+        indexed tokens.
+        """
+        return self._key(word) in self._word_ids
+
     def word_similarity_dict(self, word):
         """
         Return a dictionary mapping from words to 'similarity scores,'
         indicating how often these two words occur in the same
         context.
         """
-        word = self._key(word)
-        word_contexts = set(self._word_to_contexts[word])
+        word_id = self._word_ids.get(self._key(word))
+        if word_id is None:
+            return dict.fromkeys(self._words)
 
-        scores = {}
-        for w, w_contexts in self._word_to_contexts.items():
-            scores[w] = f_measure(word_contexts, set(w_contexts))
+        # the f-measure (with alpha = 0.5) of the two sets of contexts
+        shared = self._overlap(word_id, binary=True)
+        sizes = self._word_index.row_lengths()
+        scores = 2 * shared / (sizes + sizes[word_id])
+        return dict(zip(self._words, scores.tolist()))
 
-        return scores
+    def similar_words(self, word, n=20, binary=False):
+        """
+        Return the ``n`` words that occur most often in the same contexts
+        as ``word``.
 
-    def similar_words(self, word, n=20):
-        scores = defaultdict(int)
-        for c in self._word_to_contexts[self._key(word)]:
-            for w in self._context_to_words[c]:
-                if w != word:
-                    scores[w] += (
-                        self._context_to_words[c][word] * self._context_to_words[c][w]
-                    )
-        return sorted(scores, key=scores.get, reverse=True)[:n]
+        :param binary: If true, score words by the number of distinct
+            contexts they share with ``word``; otherwise by the sum over
+            shared contexts of the product of the two words' counts.
+        """
+        word_id = self._word_ids.get(self._key(word))
+        if word_id is None:
+            return []
+        return self._top_words(self._overlap(word_id, binary), n, word_id)
 
     def common_contexts(self, words, fail_on_unknown=False):
         """
@@ -111,20 +233,420 @@ class ContextIndex(object):
             any of the given words do not occur at all in the index.
         """
         words = [self._key(w) for w in words]
-        contexts = [set(self._word_to_contexts[w]) for w in words]
-        empty = [words[i] for i in range(len(words)) if not contexts[i]]
-        common = reduce(set.intersection, contexts)
+        empty = [w for w in words if w not in self._word_ids]
         if empty and fail_on_unknown:
-            raise ValueError("The following word(s) were not found:", " ".join(words))
-        elif not common:
-            # nothing in common -- just return an empty freqdist.
+            raise ValueError("The following word(s) were not found:", " ".join(empty))
+        elif empty:
             return FreqDist()
-        else:
-            fd = FreqDist(
-                c for w in words for c in self._word_to_contexts[w] if c in common
+
+        rows = [self._word_index.row(self._word_ids[w]) for w in words]
+        # the contexts of the first word, most frequent first
+        contexts, counts = rows[0]
+        contexts = contexts[numpy.argsort(-counts, kind="stable")]
+        for other, _ in rows[1:]:
+            contexts = contexts[numpy.isin(contexts, other)]
+        # each common context is counted once for each word
+        fd = FreqDist()
+        for c in contexts:
+            fd[self._contexts[c]] = len(words)
+        return fd
+
+
+class _CompressedRows(object):
+    """
+    A sparse matrix of counts in compressed row form, whose rows keep
+    their entries in a given order.
+    """
+
+    def __init__(self, rows, columns, counts, order, num_rows):
+        order = numpy.lexsort((order, rows))
+        self.indices = columns[order].astype(numpy.int32)
+        self.counts = counts[order].astype(numpy.int32)
+        self.indptr = numpy.zeros(num_rows + 1, numpy.int64)
+        numpy.cumsum(numpy.bincount(rows, minlength=num_rows), out=self.indptr[1:])
+
+    def row_lengths(self):
+        return numpy.diff(self.indptr)
+
+    def row(self, row):
+        """The column indices and counts of the given row."""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.counts[start:end]
+
+    def gather(self, rows):
+        """
+        The positions, in ``indices`` and ``counts``, of the entries of
+        every given row; and the number of entries of each row.
+        """
+        starts = self.indptr[rows]
+        lengths = self.indptr[numpy.asarray(rows) + 1] - starts
+        offsets = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths)
+        return offsets + numpy.arange(lengths.sum()), lengths
+
+
+class PositionalIndex(object):
+    """
+    A positional inverted index over a document, mapping each word (or
+    key) to the sorted offsets at which it occurs.  The document itself
+    is kept as an array of token ids, so the index can stand in for the
+    list of tokens it was built from: it supports ``len()``, indexing and
+    slicing.
+
+    An index may be built incrementally, one batch of tokens at a time,
+    with ``add()``.  ``save()`` writes it to a directory, where the
+    postings are stored delta-encoded; ``PositionalIndex.load()`` memory
+    maps those files, so that a large corpus can be queried without
+    reading all of its tokens into memory.
+
+        >>> from simple_nltk.text import PositionalIndex
+        >>> index = PositionalIndex("the cat sat on the mat".split())
+        >>> index.offsets("the")
+        [0, 4]
+        >>> index.phrase_offsets(["the", "mat"])
+        [4]
+        >>> index.findall("<the>(<.*>)")
+        [['cat'], ['mat']]
+    """
+
+    _VOCAB = "vocab.pickle"
+    _ARRAYS = ("surface", "surface_keys", "firsts", "pointers", "deltas")
+
+    def __init__(self, tokens=(), key=lambda x: x):
+        """
+        :param tokens: The first batch of tokens in the document.
+        :param key: A function that maps each token to a normalized
+            version that will be used as a key in the index.
+        """
+        self._key = key
+        self._surface_ids = {}
+        self._surface_words = []
+        self._key_ids = {}
+        self._key_words = []
+        self._surface_key_ids = array("q")
+        self._token_ids = array("q")
+        self._loaded = False
+        self._compiled = None
+        self._raw = None
+        self.add(tokens)
+
+    def add(self, tokens):
+        """
+        Append a batch of tokens to the end of the indexed document.
+        """
+        if self._loaded:
+            raise ValueError("An index loaded from disk cannot be extended")
+        for token in tokens:
+            surface_id = self._surface_ids.get(token)
+            if surface_id is None:
+                surface_id = self._surface_ids[token] = len(self._surface_words)
+                self._surface_words.append(token)
+                key = self._key(token)
+                key_id = self._key_ids.get(key)
+                if key_id is None:
+                    key_id = self._key_ids[key] = len(self._key_words)
+                    self._key_words.append(key)
+                self._surface_key_ids.append(key_id)
+            self._token_ids.append(surface_id)
+        self._compiled = None
+        self._raw = None
+
+    def _arrays(self):
+        """
+        The token ids of the document, the key id of each token id, and the
+        postings of each key: its first offset and the gaps between its
+        offsets, stored in ``deltas[pointers[k]:pointers[k + 1]]``.
+        """
+        if self._compiled is None:
+            surface = numpy.frombuffer(self._token_ids, numpy.int64)
+            surface_keys = numpy.frombuffer(self._surface_key_ids, numpy.int64)
+            keys = surface_keys[surface]
+            offsets = numpy.argsort(keys, kind="stable")
+            pointers = numpy.zeros(len(self._key_words) + 1, numpy.int64)
+            numpy.cumsum(
+                numpy.bincount(keys, minlength=len(self._key_words)),
+                out=pointers[1:],
             )
-            return fd
+            # every key occurs, so each list starts at pointers[:-1]
+            firsts = offsets[pointers[:-1]]
+            deltas = numpy.diff(offsets, prepend=0)
+            deltas[pointers[:-1]] = 0
+            dtype = numpy.uint32 if deltas.max(initial=0) < 2 ** 32 else numpy.uint64
+            self._compiled = {
+                "surface": surface.astype(numpy.int32),
+                "surface_keys": surface_keys.astype(numpy.int32),
+                "firsts": firsts.astype(numpy.int64),
+                "pointers": pointers,
+                "deltas": deltas.astype(dtype),
+            }
+        return self._compiled
+
+    def save(self, directory):
+        """
+        Save the index to ``directory``, which is created if necessary.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, self._VOCAB), "wb") as outfile:
+            pickle.dump(
+                (self._surface_words, self._key_words),
+                outfile,
+                pickle.HIGHEST_PROTOCOL,
+            )
+        for name, values in self._arrays().items():
+            numpy.save(os.path.join(directory, name + ".npy"), values)
+
+    @classmethod
+    def load(cls, directory, key=lambda x: x):
+        """
+        Load an index saved with ``save()``.  Its token ids and postings
+        are memory mapped rather than read into memory.
+
+        :param key: The key function that the index was built with.
+        """
+        index = cls.__new__(cls)
+        index._key = key
+        with open(os.path.join(directory, cls._VOCAB), "rb") as infile:
+            index._surface_words, index._key_words = pickle.load(infile)
+        index._surface_ids = {w: i for i, w in enumerate(index._surface_words)}
+        index._key_ids = {k: i for i, k in enumerate(index._key_words)}
+        index._compiled = {
+            name: numpy.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+            for name in cls._ARRAYS
+        }
+        index._loaded = True
+        index._raw = None
+        return index
+
+    def __len__(self):
+        if self._loaded:
+            return len(self._compiled["surface"])
+        return len(self._token_ids)
+
+    def __getitem__(self, i):
+        if self._loaded:
+            surface = self._compiled["surface"]
+        else:
+            surface = self._token_ids
+        if isinstance(i, slice):
+            return [self._surface_words[t] for t in surface[i]]
+        return self._surface_words[surface[i]]
 
+    def __iter__(self):
+        for i in range(0, len(self), 65536):
+            yield from self[i : i + 65536]
+
+    def __repr__(self):
+        return "<PositionalIndex for %d tokens (%d types)>" % (
+            len(self),
+            len(self._key_words),
+        )
+
+    def vocabulary(self):
+        """
+        :rtype: list(str)
+        :return: The keys of the index, in order of first occurrence.
+        """
+        return self._key_words
+
+    def _postings(self, key_id):
+        compiled = self._arrays()
+        start, end = compiled["pointers"][key_id], compiled["pointers"][key_id + 1]
+        deltas = numpy.asarray(compiled["deltas"][start:end], numpy.int64)
+        return compiled["firsts"][key_id] + numpy.cumsum(deltas)
+
+    def _word_postings(self, word):
+        return self._key_postings(self._key(word))
+
+    def _key_postings(self, key):
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            return numpy.zeros(0, numpy.int64)
+        return self._postings(key_id)
+
+    def agrees_with(self, key):
+        """
+        :rtype: bool
+        :return: Whether the function ``key`` gives every token of the
+            index the same key as the index's own key function.
+        """
+        if key is self._key:
+            return True
+        surface_keys = self._arrays()["surface_keys"].tolist()
+        return all(
+            key(word) == self._key_words[key_id]
+            for word, key_id in zip(self._surface_words, surface_keys)
+        )
+
+    def count(self, word):
+        """
+        :rtype: int
+        :return: The number of times ``word`` occurs, like ``list.count()``.
+        """
+        surface_id = self._surface_ids.get(word)
+        if surface_id is None:
+            return 0
+        return len(self._surface_postings([surface_id]))
+
+    def index(self, word):
+        """
+        :rtype: int
+        :return: The offset of the first occurrence of ``word``, like
+            ``list.index()``.
+        :raise ValueError: If ``word`` does not occur.
+        """
+        surface_id = self._surface_ids.get(word)
+        if surface_id is None:
+            raise ValueError("%r is not in index" % (word,))
+        return int(self._surface_postings([surface_id])[0])
+
+    def offsets(self, word):
+        """
+        :rtype: list(int)
+        :return: The offsets at which ``word`` (or a token with the same
+            key) occurs.
+        """
+        return self._word_postings(word).tolist()
+
+    def phrase_offsets(self, words):
+        """
+        :rtype: list(int)
+        :return: The offsets at which the sequence of ``words`` occurs.
+        """
+        postings = [self._word_postings(w) - i for i, w in enumerate(words)]
+        return _intersect(postings).tolist()
+
+    def findall(self, regexp):
+        """
+        Find instances of a regular expression over the tokens, in the
+        form accepted by ``TokenSearcher.findall()``: a pattern to match
+        a single token must be surrounded by angle brackets.
+
+        Patterns consisting of a sequence of tokens, of which one run may
+        be grouped in parentheses (e.g. ``"<a>(<.*>)<man>"``), are
+        answered by intersecting the postings of the words matching each
+        token.  Other patterns, e.g. those with quantifiers, fall back to
+        searching the whole document as a single string.
+
+        :rtype: list(list(str))
+        """
+        regexp = re.sub(r"\s", "", regexp)
+        parsed = _parse_token_pattern(regexp)
+        if parsed is None:
+            if self._raw is None:
+                self._raw = "".join("<" + w + ">" for w in self)
+            return _findall_raw(regexp, self._raw)
+
+        slots, group = parsed
+        width = len(slots)
+        postings = []
+        for i, slot in enumerate(slots):
+            slot = re.compile(re.sub(r"(?<!\\)\.", "[^>]", slot))
+            matched = [
+                surface_id
+                for surface_id, w in enumerate(self._surface_words)
+                if slot.fullmatch(w)
+            ]
+            if len(matched) < len(self._surface_words):
+                postings.append(self._surface_postings(matched) - i)
+        if postings:
+            starts = _intersect(postings)
+        else:
+            starts = numpy.arange(len(self))
+        starts = starts[(starts >= 0) & (starts <= len(self) - width)]
+
+        # like re.findall, only keep the matches that do not overlap
+        start, end = group if group else (0, width)
+        hits = []
+        last = -width
+        for i in starts.tolist():
+            if i >= last + width:
+                hits.append(self[i + start : i + end])
+                last = i
+        return hits
+
+    def _surface_postings(self, surface_ids):
+        """
+        The sorted offsets of every token with one of the ``surface_ids``.
+        """
+        compiled = self._arrays()
+        surface_keys = compiled["surface_keys"]
+        wanted = numpy.zeros(len(self._surface_words), bool)
+        wanted[surface_ids] = True
+        key_ids = numpy.unique(numpy.asarray(surface_keys)[surface_ids])
+        if len(key_ids) == 0:
+            return numpy.zeros(0, numpy.int64)
+        offsets = numpy.sort(numpy.concatenate([self._postings(k) for k in key_ids]))
+        # keys shared with unwanted surface forms need their offsets filtered
+        if not wanted[numpy.isin(surface_keys, key_ids)].all():
+            offsets = offsets[wanted[compiled["surface"][offsets]]]
+        return offsets
+
+
+def _intersect(postings):
+    """
+    The offsets common to every one of the sorted arrays of ``postings``,
+    intersecting the shortest arrays first.
+    """
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        result = result[numpy.isin(result, other, assume_unique=True)]
+    return result
+
+
+def _parse_token_pattern(regexp):
+    """
+    Split a ``TokenSearcher`` pattern which is a plain sequence of token
+    patterns into those patterns, and the range of tokens in its only
+    (optional) group.  Returns None for any other pattern.
+    """
+    slots = []
+    group = opened = None
+    i = 0
+    while i < len(regexp):
+        if regexp[i] == "<":
+            end = regexp.find(">", i)
+            if end < 0 or regexp[end - 1] == "\\":
+                return None
+            slots.append(regexp[i + 1 : end])
+            i = end + 1
+        elif regexp[i] == "(" and opened is None and group is None:
+            if regexp.startswith("(?", i):
+                return None
+            opened = len(slots)
+            i += 1
+        elif regexp[i] == ")" and opened is not None and opened < len(slots):
+            group = (opened, len(slots))
+            opened = None
+            i += 1
+        else:
+            return None
+    if opened is not None or not slots:
+        return None
+    return slots, group
+
+
+def _findall_raw(regexp, raw):
+    """
+    Search for a ``TokenSearcher`` pattern in the string of
+    angle-bracketed tokens ``raw``.
+    """
+    # preprocess the regular expression
+    regexp = re.sub(r"<", "(?:<(?:", regexp)
+    regexp = re.sub(r">", ")>)", regexp)
+    regexp = re.sub(r"(?<!\\)\.", "[^>]", regexp)
+
+    # perform the search
+    hits = re.findall(regexp, raw)
+
+    # Sanity check
+    for h in hits:
+        if not h.startswith("<") and h.endswith(">"):
+            raise ValueError("Bad regexp for TokenSearcher.findall")
+
+    # postprocess the output
+    hits = [h[1:-1].split("><") for h in hits]
+    return hits
 
 
 class ConcordanceIndex(object):
@@ -139,7 +661,10 @@ class ConcordanceIndex(object):
 
         :param tokens: The document (list of tokens) that this
             concordance index was created from.  This list can be used
-            to access the context of a given word occurrence.
+            to access the context of a given word occurrence.  It may
+            also be a ``PositionalIndex``, e.g. one loaded from disk,
+            whose postings are then used directly if its key agrees
+            with ``key`` on every token; otherwise a new index is built.
         :param key: A function that maps each token to a normalized
             version that will be used as a key in the index.  E.g., if
             you use ``key=lambda s:s.lower()``, then the index will be
@@ -152,12 +677,11 @@ class ConcordanceIndex(object):
         self._key = key
         """Function mapping each token to an index key (or None)."""
 
-        self._offsets = defaultdict(list)
-        """Dictionary mapping words (or keys) to lists of offset indices."""
-        # Initialize the index (self._offsets)
-        for index, word in enumerate(tokens):
-            word = self._key(word)
-            self._offsets[word].append(index)
+        if isinstance(tokens, PositionalIndex) and tokens.agrees_with(key):
+            self._index = tokens
+        else:
+            self._index = PositionalIndex(tokens, key)
+        """The positional index of the offsets of each word (or key)."""
 
     def tokens(self):
         """
@@ -174,13 +698,13 @@ class ConcordanceIndex(object):
             word occurs.  If a key function was specified for the
             index, then given word's key will be looked up.
         """
-        word = self._key(word)
-        return self._offsets[word]
+        # the index's key agrees with self._key, so look up the key itself
+        return self._index._key_postings(self._key(word)).tolist()
 
     def __repr__(self):
         return "<ConcordanceIndex for %d tokens (%d types)>" % (
             len(self._tokens),
-            len(self._offsets),
+            len(self._index.vocabulary()),
         )
 
     def find_concordance(self, word, width=80):
@@ -249,10 +773,17 @@ class TokenSearcher(object):
     passed to the ``findall()`` method is modified to treat angle
     brackets as non-capturing parentheses, in addition to matching the
     token boundaries; and to have ``'.'`` not match the angle brackets.
+
+    The tokens are held in a ``PositionalIndex``, so that patterns made
+    of a fixed sequence of tokens are answered from its postings, and
+    the tokenized string is only built for patterns that need it.
     """
 
     def __init__(self, tokens):
-        self._raw = "".join("<" + w + ">" for w in tokens)
+        if isinstance(tokens, PositionalIndex):
+            self._index = tokens
+        else:
+            self._index = PositionalIndex(tokens)
 
     def findall(self, regexp):
         """
@@ -278,24 +809,7 @@ class TokenSearcher(object):
         :param regexp: A regular expression
         :type regexp: str
         """
-        # preprocess the regular expression
-        regexp = re.sub(r"\s", "", regexp)
-        regexp = re.sub(r"<", "(?:<(?:", regexp)
-        regexp = re.sub(r">", ")>)", regexp)
-        regexp = re.sub(r"(?<!\\)\.", "[^>]", regexp)
-
-        # perform the search
-        hits = re.findall(regexp, self._raw)
-
-        # Sanity check
-        for h in hits:
-            if not h.startswith("<") and h.endswith(">"):
-                raise ValueError("Bad regexp for TokenSearcher.findall")
-
-        # postprocess the output
-        hits = [h[1:-1].split("><") for h in hits]
-        return hits
-
+        return self._index.findall(regexp)
 
 
 class Text(object):
@@ -331,7 +845,7 @@ class Text(object):
         :param tokens: The source text.
         :type tokens: sequence of str
         """
-        if self._COPY_TOKENS:
+        if self._COPY_TOKENS and not isinstance(tokens, PositionalIndex):
             tokens = list(tokens)
         self.tokens = tokens
 
@@ -483,19 +997,9 @@ class Text(object):
                 self.tokens, filter=lambda x: x.isalpha(), key=lambda s: s.lower()
             )
 
-        # words = self._word_context_index.similar_words(word, num)
-
         word = word.lower()
-        wci = self._word_context_index._word_to_contexts
-        if word in wci.conditions():
-            contexts = set(wci[word])
-            fd = Counter(
-                w
-                for w in wci.conditions()
-                for c in wci[w]
-                if c in contexts and not w == word
-            )
-            words = [w for w, _ in fd.most_common(num)]
+        if word in self._word_context_index:
+            words = self._word_context_index.similar_words(word, num, binary=True)
             print(tokenwrap(words))
         else:
             print("No matches")
@@ -635,7 +1139,7 @@ class Text(object):
         """
 
         if "_token_searcher" not in self.__dict__:
-            self._token_searcher = TokenSearcher(self)
+            self._token_searcher = TokenSearcher(self.tokens)
 
         hits = self._token_searcher.findall(regexp)
         hits = [" ".join(h) for h in hits]
@@ -762,6 +1266,7 @@ if __name__ == "__main__":
 __all__ = [
     "ContextIndex",
     "ConcordanceIndex",
+    "PositionalIndex",
     "TokenSearcher",
     "Text",
     "TextCollection",
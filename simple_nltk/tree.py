@@ -980,6 +980,10 @@ class ImmutableTree(Tree):
     def __hash__(self):
         return self._hash
 
+    def __reduce__(self):
+        # The default list pickling would call extend() on the new tree.
+        return (type(self), (self._label, tuple(self)))
+
     def set_label(self, value):
         """
         Set the node label.  This will only succeed the first time the
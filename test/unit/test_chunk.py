@@ -2,6 +2,7 @@
 import unittest
 
 from simple_nltk import RegexpParser
+from simple_nltk.chunk import ChunkScore
 
 
 class TestChunkRule(unittest.TestCase):
@@ -84,3 +85,48 @@ class TestChunkRule(unittest.TestCase):
   (CHUNK Mayor-nominate/NN-TL Ivan/NP Allen/NP Jr./NP)
   ./.)"""
         )
+
+
+class TestChunkScore(unittest.TestCase):
+    def setUp(self):
+        sents = [
+            [('the', 'DT'), ('big', 'JJ'), ('dog', 'NN'), ('ran', 'VBD')],
+            [('a', 'DT'), ('cat', 'NN'), ('saw', 'VBD'), ('the', 'DT'), ('dog', 'NN')],
+            [('dogs', 'NN'), ('bark', 'VBP')],
+        ] * 5
+        self.gold = [RegexpParser('NP: {<DT>?<JJ>*<NN>}').parse(s) for s in sents]
+        self.chunker = RegexpParser('NP: {<DT><JJ>*<NN>}')
+
+    def test_counts(self):
+        score = self.chunker.evaluate(self.gold, batch_size=4)
+        self.assertEqual(len(score), 20)
+        self.assertEqual(score.precision(), 1.0)
+        self.assertEqual(score.recall(), 0.75)
+        self.assertEqual([str(c) for c in score.missed()], ['(NP dogs/NN)'] * 5)
+        self.assertEqual(score.incorrect(), [])
+        self.assertEqual(len(score.correct()), 20)
+        self.assertEqual(len(score.guessed()), 15)
+
+    def test_max_examples(self):
+        score = ChunkScore(max_tp_examples=3, max_fn_examples=2)
+        for correct in self.gold:
+            score.score(correct, self.chunker.parse(correct.leaves()))
+        self.assertEqual(len(score.missed()), 2)
+        self.assertEqual(len(score.correct()), 20)
+        self.assertEqual(len(score.guessed()), 15)
+        self.assertEqual(score.recall(), 0.75)
+
+    def test_merge(self):
+        score = self.chunker.evaluate(self.gold)
+        merged = self.chunker.evaluate(self.gold[:7])
+        merged.merge(self.chunker.evaluate(self.gold[7:]))
+        self.assertEqual(merged.f_measure(), score.f_measure())
+        self.assertEqual(merged.accuracy(), score.accuracy())
+        self.assertEqual(merged.correct(), score.correct())
+        self.assertEqual(merged.guessed(), score.guessed())
+
+    def test_processes(self):
+        score = self.chunker.evaluate(self.gold, batch_size=4, processes=2)
+        expected = self.chunker.evaluate(self.gold)
+        self.assertEqual(score.f_measure(), expected.f_measure())
+        self.assertGreater(score.tokens_per_second(), 0)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+
+from simple_nltk.classify.naivebayes import NaiveBayesClassifier
+from simple_nltk.classify.util import (
+    ClassifierScore,
+    accuracy,
+    evaluate,
+    log_likelihood,
+)
+
+
+class EvaluateTest(unittest.TestCase):
+    train = [
+        ({'nice': True, 'good': True}, 'positive'),
+        ({'good': True}, 'positive'),
+        ({'bad': True, 'mean': True}, 'negative'),
+        ({'mean': True}, 'negative'),
+    ]
+    test = [
+        ({'nice': True}, 'positive'),
+        ({'bad': True}, 'negative'),
+        ({'mean': True, 'good': True}, 'positive'),
+        ({'good': True}, 'negative'),
+        ({'bad': True, 'nice': True}, 'negative'),
+    ] * 3
+
+    def setUp(self):
+        self.classifier = NaiveBayesClassifier.train(self.train)
+
+    def expected(self):
+        guessed = [self.classifier.classify(fs) for fs, l in self.test]
+        probs = [self.classifier.prob_classify(fs).prob(l) for fs, l in self.test]
+        correct = [g == l for g, (fs, l) in zip(guessed, self.test)]
+        return guessed, sum(correct) / len(correct), math.log(sum(probs) / len(probs))
+
+    def test_single_pass(self):
+        guessed, acc, ll = self.expected()
+        for processes in (1, 2):
+            score = evaluate(
+                self.classifier,
+                iter(self.test),
+                batch_size=4,
+                processes=processes,
+                log_likelihood=True,
+            )
+            self.assertAlmostEqual(score.accuracy(), acc)
+            self.assertAlmostEqual(score.log_likelihood(), ll)
+            self.assertEqual(
+                score.confusion()['negative', 'positive'],
+                sum(
+                    g == 'positive' and l == 'negative'
+                    for g, (fs, l) in zip(guessed, self.test)
+                ),
+            )
+
+    def test_functions(self):
+        guessed, acc, ll = self.expected()
+        self.assertAlmostEqual(accuracy(self.classifier, self.test), acc)
+        self.assertAlmostEqual(log_likelihood(self.classifier, self.test), ll)
+        self.assertEqual(accuracy(self.classifier, []), 0)
+        self.assertRaises(ZeroDivisionError, log_likelihood, self.classifier, [])
+
+    def test_merge(self):
+        first = evaluate(self.classifier, self.test[:7], log_likelihood=True)
+        first.merge(evaluate(self.classifier, self.test[7:], log_likelihood=True))
+        whole = evaluate(self.classifier, self.test, log_likelihood=True)
+        self.assertAlmostEqual(first.accuracy(), whole.accuracy())
+        self.assertAlmostEqual(first.log_likelihood(), whole.log_likelihood())
+        self.assertAlmostEqual(first.recall('positive'), whole.recall('positive'))
+        self.assertIsNone(ClassifierScore().log_likelihood())
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import unittest
+from random import Random
+
+import numpy
+
+from simple_nltk.cluster import (
+    EMClusterer,
+    GAAClusterer,
+    KMeansClusterer,
+    euclidean_distance,
+)
+
+
+def _two_blobs():
+    rng = numpy.random.RandomState(0)
+    return numpy.vstack([rng.randn(30, 3), rng.randn(30, 3) + 4])
+
+
+class TestEMClusterer(unittest.TestCase):
+    def test_manning_schutze(self):
+        # example from figure 14.10, page 519, Manning and Schutze
+        vectors = [numpy.array(f) for f in [[0.5, 0.5], [1.5, 0.5], [1, 3]]]
+        clusterer = EMClusterer([[4, 2], [4, 2.01]], bias=0.1)
+        self.assertEqual(clusterer.cluster(vectors, True), [0, 0, 1])
+        self.assertEqual(clusterer.classify(numpy.array([2, 2])), 1)
+        pdist = clusterer.classification_probdist(numpy.array([2, 2]))
+        self.assertAlmostEqual(pdist.prob(1), 0.93, places=2)
+
+    def test_two_blobs(self):
+        vectors = _two_blobs()
+        for covariance_type in ("full", "diag"):
+            clusterer = EMClusterer(
+                [[0.5, 0, 0], [3, 3, 3]], covariance_type=covariance_type
+            )
+            clusters = clusterer.cluster(list(vectors), True)
+            self.assertEqual(clusters, [0] * 30 + [1] * 30)
+            self.assertAlmostEqual(clusterer._priors.sum(), 1.0)
+
+    def test_processes(self):
+        vectors = list(_two_blobs())
+        single = EMClusterer([[0.5, 0, 0], [3, 3, 3]])
+        multi = EMClusterer([[0.5, 0, 0], [3, 3, 3]], processes=2)
+        self.assertEqual(single.cluster(vectors, True), multi.cluster(vectors, True))
+        numpy.testing.assert_allclose(single._means, multi._means)
+
+
+class TestGAAClusterer(unittest.TestCase):
+    def test_demo(self):
+        vectors = [
+            numpy.array(f) for f in [[3, 3], [1, 2], [4, 2], [4, 0], [2, 3], [3, 1]]
+        ]
+        clusterer = GAAClusterer(4)
+        self.assertEqual(clusterer.cluster(vectors, True), [0, 2, 3, 1, 2, 3])
+        self.assertEqual(clusterer.classify(numpy.array([3, 3])), 0)
+
+    def test_sparse(self):
+        from scipy.sparse import csr_matrix
+
+        vectors = [[1, 0], [1, 0.01], [1, 0.02], [0, 1], [-1, 0.5]]
+        dense = GAAClusterer(3)
+        sparse = GAAClusterer(3)
+        clusters = dense.cluster([numpy.array(v) for v in vectors], True)
+        self.assertEqual(clusters, [2, 2, 2, 0, 1])
+        self.assertEqual(sparse.cluster(csr_matrix(vectors), True), clusters)
+        self.assertEqual(sparse.classify(numpy.array([0.1, 1])), 0)
+
+    def test_float32(self):
+        vectors = list(numpy.random.RandomState(3).rand(200, 10))
+        clusters = GAAClusterer(5).cluster(vectors, True)
+        self.assertEqual(
+            GAAClusterer(5, dtype="float32").cluster(vectors, True), clusters
+        )
+
+
+class TestVectorSpaceClusterer(unittest.TestCase):
+    def setUp(self):
+        rng = numpy.random.RandomState(0)
+        noise = rng.rand(100, 200) * (rng.rand(100, 200) < 0.05)
+        noise[:50, :20] += 1
+        noise[50:, -20:] += 1
+        self.vectors = noise
+
+    def test_svd_projection(self):
+        clusterer = GAAClusterer(2, svd_dimensions=5)
+        clusters = clusterer.cluster(self.vectors, True)
+        self.assertEqual(len(set(clusters[:50])), 1)
+        self.assertEqual(len(set(clusters[50:])), 1)
+        self.assertNotEqual(clusters[0], clusters[-1])
+        self.assertEqual(clusterer.classify_many(self.vectors), clusters)
+        self.assertEqual(clusterer.classify(self.vectors[-1]), clusters[-1])
+
+    def test_sparse(self):
+        from scipy.sparse import csr_matrix
+
+        dense = KMeansClusterer(
+            2, euclidean_distance, normalise=True, svd_dimensions=5, rng=Random(1)
+        )
+        sparse = KMeansClusterer(
+            2, euclidean_distance, normalise=True, svd_dimensions=5, rng=Random(1)
+        )
+        clusters = dense.cluster(self.vectors, True)
+        self.assertEqual(sparse.cluster(csr_matrix(self.vectors), True), clusters)
+        self.assertEqual(sparse.classify_many(csr_matrix(self.vectors)), clusters)
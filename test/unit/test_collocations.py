@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 import unittest
 
-from simple_nltk.collocations import BigramCollocationFinder
-from simple_nltk.metrics import BigramAssocMeasures
+from simple_nltk.collocations import (
+    BigramCollocationFinder,
+    QuadgramCollocationFinder,
+    TrigramCollocationFinder,
+)
+from simple_nltk.metrics import (
+    BigramAssocMeasures,
+    QuadgramAssocMeasures,
+    TrigramAssocMeasures,
+)
 
 ## Test bigram counters with discontinuous bigrams and repeated words
 
@@ -156,3 +164,120 @@ class TestBigram(unittest.TestCase):
                 ),
             )
         )
+
+
+class TestScoreArrays(unittest.TestCase):
+    """The vectorised scoring path must agree with scoring one ngram at a
+    time."""
+
+    words = (
+        'the cat sat on the mat and the dog sat on the cat and the mat sat '
+        'on the dog while the cat and the dog sat on the mat'
+    ).split()
+
+    def scalar_scores(self, finder, score_fn):
+        scored = [
+            (ngram, finder.score_ngram(score_fn, *ngram)) for ngram in finder.ngram_fd
+        ]
+        return sorted(scored, key=lambda t: (-t[1], t[0]))
+
+    def check(self, finder, measures, names):
+        for name in names:
+            score_fn = getattr(measures, name)
+            self.assertIsNotNone(finder._score_arrays(score_fn), name)
+            expected = self.scalar_scores(finder, score_fn)
+            self.assertTrue(close_enough(finder.score_ngrams(score_fn), expected), name)
+            self.assertEqual(
+                finder.nbest(score_fn, 5), [ngram for ngram, _ in expected[:5]], name
+            )
+            min_score = expected[3][1]
+            self.assertEqual(
+                list(finder.above_score(score_fn, min_score)),
+                [ngram for ngram, score in expected if score > min_score],
+                name,
+            )
+
+    def test_bigram(self):
+        names = ['raw_freq', 'student_t', 'pmi', 'likelihood_ratio', 'dice', 'phi_sq']
+        for window_size in (2, 3):
+            finder = BigramCollocationFinder.from_words(self.words, window_size)
+            self.check(finder, BigramAssocMeasures, names)
+
+    def test_trigram(self):
+        finder = TrigramCollocationFinder.from_words(self.words)
+        names = ['raw_freq', 'pmi', 'poisson_stirling']
+        self.check(finder, TrigramAssocMeasures, names)
+
+    def test_quadgram(self):
+        finder = QuadgramCollocationFinder.from_words(self.words)
+        self.check(finder, QuadgramAssocMeasures, ['raw_freq', 'pmi', 'jaccard'])
+
+    def test_fallback(self):
+        finder = BigramCollocationFinder.from_words(self.words)
+        self.assertIsNone(finder._score_arrays(BigramAssocMeasures.fisher))
+        expected = self.scalar_scores(finder, BigramAssocMeasures.fisher)
+        self.assertEqual(
+            finder.nbest(BigramAssocMeasures.fisher, 3),
+            [ngram for ngram, _ in expected[:3]],
+        )
+
+    def test_filtered_ngrams_are_skipped(self):
+        finder = BigramCollocationFinder.from_words(self.words)
+        finder.apply_freq_filter(2)
+        ngrams, marginals = finder.marginals()
+        self.assertEqual(sorted(ngrams), sorted(finder.ngram_fd))
+        self.assertEqual(len(marginals[0]), len(ngrams))
+
+
+class TestShardedCounting(unittest.TestCase):
+    documents = [
+        'the cat sat on the mat'.split(),
+        'the dog sat on the cat'.split(),
+        [],
+        'a cat and a dog sat on a mat'.split(),
+        'the mat'.split(),
+    ]
+
+    def assertSameCounts(self, finder, expected):
+        self.assertEqual(finder.N, expected.N)
+        for name in expected._freqdists:
+            self.assertEqual(dict(getattr(finder, name)), dict(getattr(expected, name)))
+
+    def test_shards_match_single_pass(self):
+        for cls in (
+            BigramCollocationFinder,
+            TrigramCollocationFinder,
+            QuadgramCollocationFinder,
+        ):
+            expected = cls.from_documents(self.documents)
+            for processes in (1, 2):
+                finder = cls.from_documents(
+                    iter(self.documents), processes=processes, shard_size=2, min_freq=1
+                )
+                self.assertSameCounts(finder, expected)
+
+    def test_update(self):
+        finder = BigramCollocationFinder.from_documents(self.documents[:2])
+        finder.update(BigramCollocationFinder.from_documents(self.documents[2:]))
+        self.assertSameCounts(
+            finder, BigramCollocationFinder.from_documents(self.documents)
+        )
+        self.assertRaises(
+            ValueError,
+            finder.update,
+            BigramCollocationFinder.from_words(self.documents[0], window_size=3),
+        )
+        self.assertRaises(
+            TypeError,
+            finder.update,
+            TrigramCollocationFinder.from_documents(self.documents),
+        )
+
+    def test_shard_freq_filter(self):
+        finder = BigramCollocationFinder.from_documents(
+            self.documents, shard_size=2, min_freq=2
+        )
+        self.assertEqual(
+            dict(finder.ngram_fd),
+            {('the', 'cat'): 2, ('sat', 'on'): 2, ('on', 'the'): 2},
+        )
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import itertools
+import os
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from simple_nltk.tag import CRFTagger
+from simple_nltk.tag import crf
+
+
+TRAIN = [
+    [
+        ('University', 'Noun'),
+        ('is', 'Verb'),
+        ('a', 'Det'),
+        ('good', 'Adj'),
+        ('place', 'Noun'),
+    ],
+    [('dog', 'Noun'), ('eat', 'Verb'), ('meat', 'Noun')],
+]
+
+
+def _score(sent, labels, weights, transitions):
+    score = 0.0
+    for t, (ids, values) in enumerate(sent):
+        values = [1.0] * len(ids) if values is None else values
+        score += sum(weights[i, labels[t]] * v for i, v in zip(ids, values))
+        if t:
+            score += transitions[labels[t - 1], labels[t]]
+    return score
+
+
+def test_objective_and_viterbi():
+    rng = numpy.random.RandomState(0)
+    sents = [
+        [([0, 3], None)],
+        [([1], None), ([], None), ([2, 4], [0.5, 2.0])],
+        [([4], None), ([0, 1], None)],
+    ]
+    gold = [[1], [2, 0, 1], [0, 0]]
+    weights = rng.normal(size=(5, 3))
+    transitions = rng.normal(size=(3, 3))
+    batch = crf._Batch(sents, gold)
+
+    def nll(weights, transitions):
+        total = 0.0
+        for sent, labels in zip(sents, gold):
+            paths = itertools.product(range(3), repeat=len(sent))
+            scores = [_score(sent, path, weights, transitions) for path in paths]
+            total += numpy.logaddexp.reduce(scores)
+            total -= _score(sent, labels, weights, transitions)
+        return total
+
+    loss, weight_grad, transition_grad = batch.objective(weights, transitions)
+    assert abs(loss - nll(weights, transitions)) < 1e-9
+    eps = 1e-6
+    for i, j in itertools.product(range(5), range(3)):
+        shifted = weights.copy()
+        shifted[i, j] += eps
+        numeric = (nll(shifted, transitions) - loss) / eps
+        assert abs(numeric - weight_grad[i, j]) < 1e-4
+    for i, j in itertools.product(range(3), range(3)):
+        shifted = transitions.copy()
+        shifted[i, j] += eps
+        numeric = (nll(weights, shifted) - loss) / eps
+        assert abs(numeric - transition_grad[i, j]) < 1e-4
+
+    best = crf._viterbi(batch.emissions(weights)[1], transitions, batch.lengths)
+    for row, sent in enumerate(sents):
+        paths = itertools.product(range(3), repeat=len(sent))
+        expected = max(paths, key=lambda p: _score(sent, p, weights, transitions))
+        assert tuple(best[row, : len(sent)]) == expected
+
+
+def test_numpy_backend(tmp_path):
+    tagger = CRFTagger(backend="numpy")
+    model_file = os.path.join(str(tmp_path), "model.crf.tagger")
+    tagger.train(TRAIN, model_file)
+    sents = [['dog', 'is', 'good'], [], ['Cat', 'eat', 'meat']]
+    expected = [
+        [('dog', 'Noun'), ('is', 'Verb'), ('good', 'Adj')],
+        [],
+        [('Cat', 'Noun'), ('eat', 'Verb'), ('meat', 'Noun')],
+    ]
+    assert tagger.tag_sents(sents) == expected
+    assert tagger.tag(sents[0]) == expected[0]
+
+    loaded = CRFTagger(backend="numpy")
+    loaded.set_model_file(model_file)
+    assert loaded.tag_sents(sents) == expected
+
+    parallel = CRFTagger(backend="numpy")
+    parallel.train(TRAIN, processes=2)
+    assert parallel.tag_sents(sents) == expected
+
+    with pytest.raises(ValueError):
+        CRFTagger(backend="numpy", training_opt={"c1": 1.0})
+
+
+def test_numpy_backend_training_data():
+    for train_data in ([], [[], []]):
+        with pytest.raises(ValueError):
+            CRFTagger(backend="numpy").train(train_data)
+
+    # A single label is already optimal, without any line search.
+    tagger = CRFTagger(backend="numpy")
+    tagger.train([[('dog', 'Noun'), ('park', 'Noun')]])
+    assert tagger.tag(['cat']) == [('cat', 'Noun')]
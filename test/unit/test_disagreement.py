@@ -2,6 +2,7 @@
 import unittest
 
 from simple_nltk.metrics.agreement import AnnotationTask
+from simple_nltk.metrics.distance import interval_distance
 
 class TestDisagreement(unittest.TestCase):
 
@@ -139,3 +140,39 @@ class TestDisagreement(unittest.TestCase):
         annotation_task = AnnotationTask(data)
         self.assertAlmostEqual(annotation_task.alpha(), 0.743421052632)
 
+
+
+class TestCoefficients(unittest.TestCase):
+    data = [
+        ('c1', '1', 1), ('c2', '1', 1), ('c3', '1', 2),
+        ('c1', '2', 2), ('c2', '2', 3), ('c3', '2', 3),
+        ('c1', '3', 1), ('c2', '3', 1), ('c3', '3', 1),
+        ('c1', '4', 3), ('c2', '4', 2), ('c3', '4', 3),
+    ]
+
+    def test_interval_distance(self):
+        annotation_task = AnnotationTask(self.data, interval_distance)
+        self.assertAlmostEqual(annotation_task.avg_Ao(), 0.5)
+        self.assertAlmostEqual(annotation_task.pi(), 0.2340425532)
+        self.assertAlmostEqual(annotation_task.S(), 0.25)
+        self.assertAlmostEqual(annotation_task.kappa(), 0.2484848485)
+        self.assertAlmostEqual(annotation_task.multi_kappa(), 0.25)
+        self.assertAlmostEqual(annotation_task.alpha(), 0.691588785)
+        self.assertAlmostEqual(annotation_task.weighted_kappa(), 0.6736596737)
+        self.assertAlmostEqual(annotation_task.Disagreement({1: 2, 3: 1}), 8 / 3)
+
+    def test_counts(self):
+        annotation_task = AnnotationTask(self.data)
+        self.assertEqual(annotation_task.Nk(1), 5.0)
+        self.assertEqual(annotation_task.Nik('4', 3), 2.0)
+        self.assertEqual(annotation_task.Nck('c2', 2), 1.0)
+        self.assertEqual(annotation_task.Nck('c2', 4), 0.0)
+
+    def test_load_array(self):
+        annotation_task = AnnotationTask(self.data[:6])
+        self.assertAlmostEqual(annotation_task.avg_Ao(), 1 / 3)
+        annotation_task.load_array(self.data[6:])
+        self.assertAlmostEqual(
+            annotation_task.avg_Ao(), AnnotationTask(self.data).avg_Ao()
+        )
+        self.assertEqual(annotation_task.Nk(1), 5.0)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from simple_nltk.metrics.distance import (
+    EditDistanceIndex,
+    JaroWinklerIndex,
+    _edit_dist_init,
+    _edit_dist_step,
+    edit_distance,
+    jaro_similarity,
+    jaro_winkler_matrix,
+    jaro_winkler_similarity,
+    jaro_winkler_topk,
+    nearest,
+)
+
+
+def table_edit_distance(s1, s2, substitution_cost=1, transpositions=False):
+    """The edit distance computed with the full dynamic programming table."""
+    lev = _edit_dist_init(len(s1) + 1, len(s2) + 1)
+    for i in range(len(s1)):
+        for j in range(len(s2)):
+            _edit_dist_step(
+                lev, i + 1, j + 1, s1, s2, substitution_cost, transpositions
+            )
+    return lev[len(s1)][len(s2)]
+
+
+class TestEditDistance(unittest.TestCase):
+    pairs = [
+        ("", ""),
+        ("", "abc"),
+        ("rain", "shine"),
+        ("abcdef", "acbdef"),
+        ("language", "lnaguaeg"),
+        ("language", "lnaugage"),
+        ("language", "lngauage"),
+        ("ab", "ba"),
+        ("abc", "ca"),
+        ("kitten", "sitting"),
+        ("a" * 70 + "b", "b" + "a" * 70),
+    ]
+
+    def test_matches_table(self):
+        for s1, s2 in self.pairs:
+            for substitution_cost in (1, 2, 0.5):
+                for transpositions in (False, True):
+                    expected = table_edit_distance(
+                        s1, s2, substitution_cost, transpositions
+                    )
+                    self.assertEqual(
+                        edit_distance(s1, s2, substitution_cost, transpositions),
+                        expected,
+                    )
+                    self.assertEqual(
+                        edit_distance(s2, s1, substitution_cost, transpositions),
+                        table_edit_distance(s2, s1, substitution_cost, transpositions),
+                    )
+
+    def test_max_distance(self):
+        for s1, s2 in self.pairs:
+            for substitution_cost in (1, 2):
+                for transpositions in (False, True):
+                    dist = table_edit_distance(
+                        s1, s2, substitution_cost, transpositions
+                    )
+                    for max_distance in range(6):
+                        self.assertEqual(
+                            edit_distance(
+                                s1, s2, substitution_cost, transpositions, max_distance
+                            ),
+                            min(dist, max_distance + 1),
+                        )
+
+    def test_sequences(self):
+        self.assertEqual(edit_distance("the cat sat".split(), "a cat sat".split()), 1)
+        self.assertEqual(edit_distance([[1], [2]], [[2]]), 1)
+
+
+class TestEditDistanceIndex(unittest.TestCase):
+    candidates = ["rain", "shine", "train", "brain", "sign", "rein", "ran", ""]
+
+    def brute_force(self, query, k, max_distance, transpositions=False):
+        scored = sorted(
+            (edit_distance(query, c, transpositions=transpositions), i)
+            for i, c in enumerate(self.candidates)
+        )
+        if max_distance is not None:
+            scored = [(d, i) for d, i in scored if d <= max_distance]
+        return [(self.candidates[i], d) for d, i in scored[:k]]
+
+    def test_nearest(self):
+        for transpositions in (False, True):
+            index = EditDistanceIndex(self.candidates, transpositions=transpositions)
+            for query in ("rain", "rian", "shin", "", "brains"):
+                for k in (1, 3, 10):
+                    for max_distance in (None, 0, 1, 2):
+                        self.assertEqual(
+                            index.nearest(query, k, max_distance),
+                            self.brute_force(query, k, max_distance, transpositions),
+                        )
+
+    def test_nearest_function(self):
+        self.assertEqual(
+            nearest("rian", self.candidates, k=2, transpositions=True),
+            [("rain", 1), ("ran", 1)],
+        )
+
+    def test_nearest_many(self):
+        index = EditDistanceIndex(self.candidates)
+        queries = ["rain", "shin", "bran"]
+        expected = [index.nearest(q, 2) for q in queries]
+        self.assertEqual(index.nearest_many(queries, 2), expected)
+        self.assertEqual(index.nearest_many(queries, 2, processes=2), expected)
+
+
+def flagged_jaro_similarity(s1, s2):
+    """The Jaro similarity, matching with lists of flagged positions."""
+    match_bound = max(len(s1), len(s2)) // 2 - 1
+    flagged_1, flagged_2 = [], []
+    for i in range(len(s1)):
+        for j in range(max(0, i - match_bound), min(i + match_bound, len(s2) - 1) + 1):
+            if s1[i] == s2[j] and j not in flagged_2:
+                flagged_1.append(i)
+                flagged_2.append(j)
+                break
+    matches = len(flagged_1)
+    if matches == 0:
+        return 0
+    flagged_2.sort()
+    transpositions = sum(s1[i] != s2[j] for i, j in zip(flagged_1, flagged_2))
+    return (
+        1
+        / 3
+        * (
+            matches / len(s1)
+            + matches / len(s2)
+            + (matches - transpositions // 2) / matches
+        )
+    )
+
+
+class TestJaroWinkler(unittest.TestCase):
+    names = (
+        "SHACKLEFORD SHACKELFORD DUNNINGHAM CUNNIGHAM MASSEY MASSIE JON JOHN JAN "
+        "A AAAAB BAAAA ABAB"
+    ).split() + [""]
+
+    def test_jaro_similarity(self):
+        for s1 in self.names:
+            for s2 in self.names:
+                self.assertEqual(
+                    jaro_similarity(s1, s2), flagged_jaro_similarity(s1, s2)
+                )
+
+    def test_matrix(self):
+        expected = [
+            [jaro_winkler_similarity(s1, s2) for s2 in self.names[3:]]
+            for s1 in self.names
+        ]
+        self.assertEqual(jaro_winkler_matrix(self.names, self.names[3:]), expected)
+        self.assertEqual(
+            jaro_winkler_matrix(self.names, self.names[3:], processes=2), expected
+        )
+        thresholded = jaro_winkler_matrix(self.names, self.names[3:], threshold=0.9)
+        self.assertEqual(
+            thresholded,
+            [[s if s >= 0.9 else 0.0 for s in row] for row in expected],
+        )
+
+    def test_topk(self):
+        index = JaroWinklerIndex(self.names, p=0.2)
+        for query in self.names + ["MASEY", "SHAKLEFORD"]:
+            scores = [jaro_winkler_similarity(query, c, p=0.2) for c in self.names]
+            ranked = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+            for k in (1, 3):
+                for threshold in (None, 0.8):
+                    expected = [
+                        (self.names[i], scores[i])
+                        for i in ranked
+                        if threshold is None or scores[i] >= threshold
+                    ][:k]
+                    self.assertEqual(index.topk(query, k, threshold), expected)
+        self.assertEqual(jaro_winkler_topk("MASEY", self.names, k=1)[0][0], "MASSEY")
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from simple_nltk.metrics import ConfusionMatrix
+from simple_nltk.metrics.scores import approxrand, f_measure, precision, recall
+from simple_nltk.metrics.segmentation import evaluate_segmentations, ghd, pk, windowdiff
+
+
+def median(lst):
+    lst = sorted(lst)
+    return lst[len(lst) // 2]
+
+
+class TestApproxrand(unittest.TestCase):
+    a = [0.7, 0.9, 0.8, 0.95, 0.85, 0.75, 0.9, 0.8] * 5
+    b = [0.2, 0.3, 0.25, 0.1, 0.35, 0.3, 0.2, 0.15] * 5
+
+    def test_shuffles_capped_at_permutations(self):
+        significance, c, shuffles = approxrand([1, 2], [3], shuffles=999)
+        self.assertEqual(shuffles, 6)
+        significance, c, shuffles = approxrand(self.a * 100, self.b * 100, shuffles=10)
+        self.assertEqual(shuffles, 10)
+
+    def test_significant_difference(self):
+        for kwargs in (
+            {},
+            {"statistic": median},
+            {"statistic": median, "processes": 2},
+        ):
+            significance, c, shuffles = approxrand(
+                self.a, self.b, shuffles=200, seed=0, **kwargs
+            )
+            self.assertEqual(shuffles, 200)
+            self.assertLess(significance, 0.01)
+
+    def test_no_difference(self):
+        scores = [1, 0, 1, 1, 0, 1, 0, 1] * 10
+        for kwargs in ({}, {"statistic": median}):
+            significance, c, shuffles = approxrand(
+                scores, scores[::-1], shuffles=200, seed=0, **kwargs
+            )
+            self.assertGreater(significance, 0.99)
+
+    def test_seed(self):
+        values = self.a + self.b
+        first = approxrand(values[::2], values[1::2], shuffles=300, seed=7)
+        self.assertEqual(
+            approxrand(values[::2], values[1::2], shuffles=300, seed=7), first
+        )
+        self.assertTrue(0 < first[0] < 1)
+
+
+def sliced_windowdiff(seg1, seg2, k, boundary="1", weighted=False):
+    """windowdiff, counting the boundaries in each window separately."""
+    wd = 0
+    for i in range(len(seg1) - k + 1):
+        ndiff = abs(seg1[i : i + k].count(boundary) - seg2[i : i + k].count(boundary))
+        wd += ndiff if weighted else min(1, ndiff)
+    return wd / (len(seg1) - k + 1.0)
+
+
+def sliced_pk(ref, hyp, k, boundary="1"):
+    """pk, counting the boundaries in each window separately."""
+    err = 0
+    for i in range(len(ref) - k + 1):
+        r = ref[i : i + k].count(boundary) > 0
+        h = hyp[i : i + k].count(boundary) > 0
+        err += r != h
+    return err / (len(ref) - k + 1.0)
+
+
+class TestSegmentation(unittest.TestCase):
+    segmentations = [
+        "000100000010",
+        "000010000100",
+        "100000010000",
+        "111111111111",
+        "000000000000",
+        "010010001011",
+    ]
+
+    def test_windowdiff(self):
+        for seg1 in self.segmentations:
+            for seg2 in self.segmentations:
+                for k in (0, 1, 3, 12):
+                    for weighted in (False, True):
+                        self.assertEqual(
+                            windowdiff(seg1, seg2, k, weighted=weighted),
+                            sliced_windowdiff(seg1, seg2, k, weighted=weighted),
+                        )
+        self.assertEqual(
+            windowdiff([0, 1, 0, 0], [0, 0, 1, 0], 2, boundary=1),
+            sliced_windowdiff([0, 1, 0, 0], [0, 0, 1, 0], 2, boundary=1),
+        )
+        self.assertRaises(ValueError, windowdiff, "0101", "010", 2)
+        self.assertRaises(ValueError, windowdiff, "0101", "0100", 5)
+
+    def test_pk(self):
+        for ref in self.segmentations:
+            for hyp in self.segmentations:
+                for k in (1, 2, 5):
+                    self.assertEqual(pk(ref, hyp, k), sliced_pk(ref, hyp, k))
+        # a short hypothesis is treated as having no further boundaries
+        self.assertEqual(pk("0101010", "0101", 2), sliced_pk("0101010", "0101", 2))
+
+    def test_ghd(self):
+        self.assertEqual(ghd("1100100000", "1100010000", 1.0, 1.0, 0.5), 0.5)
+        self.assertEqual(ghd("1100100000", "1100000001", 1.0, 1.0, 0.5), 2.0)
+        # insertions chain along a row of the matrix
+        self.assertEqual(ghd("0111100000", "1000000000", 1.0, 1.0, 0.5), 3.5)
+        self.assertEqual(ghd("0000011110", "0100000000", 1.0, 1.0, 2.0), 5.0)
+
+    def test_evaluate_segmentations(self):
+        pairs = [(s1, s2) for s1 in self.segmentations for s2 in self.segmentations]
+        for metric, kwargs in ((windowdiff, {"k": 3}), (pk, {"k": 2}), (ghd, {})):
+            expected = [metric(ref, hyp, **kwargs) for ref, hyp in pairs]
+            self.assertEqual(evaluate_segmentations(pairs, metric, **kwargs), expected)
+            self.assertEqual(
+                evaluate_segmentations(pairs, metric, processes=2, **kwargs), expected
+            )
+
+
+class TestConfusionMatrix(unittest.TestCase):
+    ref = 'DET NN VB DET JJ NN NN IN DET NN'.split()
+    test = 'DET VB VB DET NN NN NN IN DET NN'.split()
+
+    def test_update_and_merge(self):
+        expected = ConfusionMatrix(self.ref, self.test)
+        cm = ConfusionMatrix()
+        for i in range(0, 10, 3):
+            cm.update(self.ref[i : i + 3], self.test[i : i + 3])
+        self.assertEqual(str(cm), str(expected))
+        self.assertEqual(repr(cm), repr(expected))
+
+        merged = ConfusionMatrix(self.ref[:4], self.test[:4])
+        merged.merge(ConfusionMatrix(self.ref[4:], self.test[4:]))
+        self.assertEqual(str(merged), str(expected))
+        self.assertEqual(merged['JJ', 'NN'], 1)
+        self.assertRaises(ValueError, cm.update, ['NN'], [])
+
+    def test_scores(self):
+        cm = ConfusionMatrix(self.ref, self.test)
+        for value in set(self.ref):
+            reference = set(i for i, v in enumerate(self.ref) if v == value)
+            test = set(i for i, v in enumerate(self.test) if v == value)
+            self.assertAlmostEqual(cm.precision(value), precision(reference, test) or 0)
+            self.assertAlmostEqual(cm.recall(value), recall(reference, test))
+            self.assertAlmostEqual(
+                cm.f_measure(value, 0.3), f_measure(reference, test, 0.3) or 0
+            )
+        self.assertEqual(cm.precision('JJ'), 0.0)
+        self.assertEqual(cm.accuracy(), 0.8)
+        self.assertEqual(cm.micro_average(), (0.8, 0.8, 0.8))
+        p, r, f = cm.macro_average()
+        self.assertAlmostEqual(p, (1 + 0.75 + 0.5 + 0 + 1) / 5)
+        self.assertAlmostEqual(r, (1 + 0.75 + 1 + 0 + 1) / 5)
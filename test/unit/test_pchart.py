@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from simple_nltk.grammar import toy_pcfg2
+from simple_nltk.parse import pchart
+
+
+class SortedInsideChartParser(pchart.InsideChartParser):
+    # Overriding sort_queue() selects the sorted-queue loop.
+    def sort_queue(self, queue, chart):
+        queue.sort(key=lambda edge: edge.prob())
+
+
+class SortedLongestChartParser(pchart.LongestChartParser):
+    def sort_queue(self, queue, chart):
+        queue.sort(key=lambda edge: edge.length())
+
+
+class SortedUnsortedChartParser(pchart.UnsortedChartParser):
+    def sort_queue(self, queue, chart):
+        return
+
+
+class PChartAgendaTest(unittest.TestCase):
+    def test_agenda_matches_sorted_queue(self):
+        tokens = "Jack saw a boy with a telescope under the table with Bob".split()
+        pairs = [
+            (pchart.InsideChartParser, SortedInsideChartParser),
+            (pchart.LongestChartParser, SortedLongestChartParser),
+            (pchart.UnsortedChartParser, SortedUnsortedChartParser),
+        ]
+        for parser, sorted_parser in pairs:
+            self.assertTrue(parser(toy_pcfg2)._sorts_by_key())
+            self.assertFalse(sorted_parser(toy_pcfg2)._sorts_by_key())
+            for beam_size in (0, 10, 30):
+                expected = list(sorted_parser(toy_pcfg2, beam_size).parse(tokens))
+                parses = list(parser(toy_pcfg2, beam_size).parse(tokens))
+                self.assertEqual(parses, expected)
+                self.assertEqual(
+                    [t.prob() for t in parses], [t.prob() for t in expected]
+                )
+
+    def test_random_parser_keeps_sorted_queue(self):
+        self.assertFalse(pchart.RandomChartParser(toy_pcfg2)._sorts_by_key())
@@ -27,3 +27,191 @@ def setup_module(module):
         import numpy
     except ImportError:
         raise SkipTest("numpy is required for simple_nltk.test.test_tag")
+
+
+def test_score():
+    from simple_nltk.tag import DefaultTagger, UnigramTagger
+
+    gold = [[('the', 'DT'), ('dog', 'NN')], [('dogs', 'NNS'), ('bark', 'VBP')]] * 3
+    tagger = UnigramTagger(gold[:1], backoff=DefaultTagger('NN'))
+    score = tagger.score(gold, batch_size=4)
+    assert len(score) == 12
+    assert score.sentences() == 6
+    assert score.accuracy() == 0.5
+    assert tagger.evaluate(gold) == 0.5
+    assert tagger.score(gold, batch_size=1, processes=2).accuracy() == 0.5
+    assert score.tokens_per_second() > 0
+
+
+def test_compiled_backoff_tagger():
+    from simple_nltk.tag import (
+        AffixTagger,
+        BigramTagger,
+        DefaultTagger,
+        RegexpTagger,
+        TrigramTagger,
+        UnigramTagger,
+    )
+
+    train = [
+        [('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')],
+        [('they', 'PRP'), ('dog', 'VBP'), ('us', 'PRP')],
+        [('the', 'DT'), ('barking', 'VBG'), ('dogs', 'NNS')],
+    ]
+    tagger = DefaultTagger('NN')
+    tagger = RegexpTagger([(r'.*ing$', 'VBG')], backoff=tagger)
+    tagger = AffixTagger(train, backoff=tagger)
+    tagger = UnigramTagger(train, backoff=tagger)
+    tagger = BigramTagger(train, backoff=tagger)
+    tagger = TrigramTagger(train, backoff=tagger)
+    sents = [
+        ['they', 'dog', 'the', 'dog'],
+        ['the', 'barking', 'cat', 'barks'],
+        [],
+        ['jumping', 'dogs', 'dog', 'us'],
+    ]
+    compiled = tagger.compile()
+    assert compiled.tag_sents(sents) == tagger.tag_sents(sents)
+    assert compiled.tag(sents[0]) == tagger.tag(sents[0])
+    for sent in sents:
+        for index in range(len(sent)):
+            history = [tag for (word, tag) in tagger.tag(sent)[:index]]
+            assert compiled.tag_one(sent, index, history) == tagger.tag_one(
+                sent, index, history
+            )
+
+    # Taggers that look at more than the word are consulted as usual.
+    tagger = RegexpTagger([(r'.*s$', 'NNS')], backoff=BigramTagger(train))
+    tagger = BigramTagger(train, backoff=tagger)
+    assert tagger.compile().tag_sents(sents) == tagger.tag_sents(sents)
+
+
+def test_tnt():
+    from simple_nltk.tag import TnT
+
+    train = [
+        [('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')],
+        [('they', 'PRP'), ('dog', 'VBP'), ('us', 'PRP')],
+        [('the', 'DT'), ('old', 'JJ'), ('dog', 'NN'), ('barks', 'VBZ')],
+    ]
+    tagger = TnT()
+    tagger.train(train)
+    assert tagger.tag(['they', 'dog', 'the', 'dog']) == [
+        ('they', 'PRP'),
+        ('dog', 'VBP'),
+        ('the', 'DT'),
+        ('dog', 'NN'),
+    ]
+    assert tagger.tag(['the', 'cat', 'barks']) == [
+        ('the', 'DT'),
+        ('cat', 'Unk'),
+        ('barks', 'VBZ'),
+    ]
+    assert tagger.tag([]) == []
+
+    # Decoding is iterative, so long inputs do not hit the recursion limit.
+    sent = ['the', 'old', 'dog', 'barks'] * 1000
+    assert len(tagger.tag(sent)) == len(sent)
+
+    sents = [['the', 'dog'], ['they', 'dog', 'us'], ['old']] * 5
+    assert tagger.tagdata(sents, processes=2, batch_size=4) == tagger.tagdata(sents)
+
+
+def test_brill_trainer_processes():
+    from simple_nltk.tag import BrillTaggerTrainer, UnigramTagger
+    from simple_nltk.tag.brill import fntbl37
+
+    train = [
+        [('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')],
+        [('they', 'PRP'), ('dog', 'VBP'), ('us', 'PRP')],
+        [('the', 'DT'), ('old', 'JJ'), ('dog', 'NN'), ('barks', 'VBZ')],
+        [('we', 'PRP'), ('dog', 'VBP'), ('them', 'PRP')],
+    ] * 3
+    tagger = UnigramTagger(train[:1])
+    trainer = BrillTaggerTrainer(tagger, fntbl37(), deterministic=True)
+    brill = trainer.train(train, max_rules=10)
+    assert brill.rules() == trainer.train(train, max_rules=10, processes=2).rules()
+    assert brill.tag(['they', 'dog', 'us']) == [
+        ('they', 'PRP'),
+        ('dog', 'VBP'),
+        ('us', 'PRP'),
+    ]
+
+
+def test_brill_tagger_cascade():
+    from simple_nltk.tag import BrillTagger, UnigramTagger
+    from simple_nltk.tag.brill import Pos, Word
+    from simple_nltk.tbl import Feature, Rule
+
+    class Suffix(Feature):
+        @staticmethod
+        def extract_property(tokens, index):
+            return tokens[index][0][-1:]
+
+    train = [[('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')]]
+    rules = [
+        Rule('001', None, 'JJ', [(Pos([1]), 'NN')]),
+        Rule('002', 'NN', 'VB', [(Pos([-1]), 'JJ'), (Word([-2, -1]), 'they')]),
+        Rule('003', 'VBZ', 'NNS', [(Word([-2]), 'the')]),
+    ]
+    tagger = BrillTagger(UnigramTagger(train), rules)
+    sents = [
+        ['they', 'dog'],
+        ['the', 'old', 'barks'],
+        [],
+        ['the', 'old'],
+        ['barks'],
+        ['the', 'old', 'dog'],
+    ]
+    expected = [
+        [('they', 'JJ'), ('dog', 'VB')],
+        [('the', 'DT'), ('old', None), ('barks', 'NNS')],
+        [],
+        [('the', 'DT'), ('old', None)],
+        [('barks', 'VBZ')],
+        [('the', 'DT'), ('old', 'JJ'), ('dog', 'NN')],
+    ]
+    assert tagger.tag_sents(sents) == expected
+    assert [tagger.tag(sent) for sent in sents] == expected
+
+    # Rules on other features are applied one sentence at a time.
+    rule = Rule('004', 'VBZ', 'NNS', [(Suffix([0]), 's')])
+    tagger = BrillTagger(UnigramTagger(train), rules + [rule])
+    assert tagger.tag_sents(sents)[4] == [('barks', 'NNS')]
+
+
+def test_classifier_based_tag_sents():
+    from simple_nltk.tag import ClassifierBasedPOSTagger, DefaultTagger
+
+    train = [
+        [('the', 'DT'), ('dog', 'NN'), ('barks', 'VBZ')],
+        [('they', 'PRP'), ('dog', 'VBP'), ('us', 'PRP')],
+        [('the', 'DT'), ('old', 'JJ'), ('dog', 'NN'), ('barks', 'VBZ')],
+    ]
+    sents = [['they', 'dog', 'the', 'dog'], [], ['the', 'cat'], ['Barks', '3.5']]
+    for cutoff_prob in (None, 0.9):
+        tagger = ClassifierBasedPOSTagger(
+            train=iter(train), cutoff_prob=cutoff_prob, backoff=DefaultTagger('NN')
+        )
+        assert tagger.tag_sents(sents) == [tagger.tag(sent) for sent in sents]
+    assert tagger.tag_sents([]) == []
+
+
+def test_tag_mapper_ids():
+    import pytest
+    from simple_nltk.tag.mapping import TagMapper
+
+    mapper = TagMapper({'NN': 'NOUN', 'VB': 'VERB'})
+    ids = mapper.encode(['VB', 'NN'])
+    assert mapper.decode(mapper.map_ids(ids)) == ['VERB', 'NOUN']
+    with pytest.raises(KeyError):
+        mapper.encode(['UH'])
+    with pytest.raises(KeyError):
+        mapper.map_ids([0, 2])
+    with pytest.raises(IndexError):
+        mapper.map_ids([-1])
+    with pytest.raises(IndexError):
+        mapper.map_ids([3])
+
+    mapper = TagMapper({'NN': 'NOUN', 'VB': 'VERB'}, 'X')
+    assert mapper.decode(mapper.map_ids([0, 2, 1])) == ['NOUN', 'X', 'VERB']
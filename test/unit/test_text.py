@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from simple_nltk.text import (
+    ConcordanceIndex,
+    ContextIndex,
+    PositionalIndex,
+    Text,
+    TokenSearcher,
+)
+
+TOKENS = (
+    "the cat sat on the mat . the dog sat on the rug . "
+    "a cat lay on a mat . the dog lay on the mat ."
+).split()
+
+
+class TestContextIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ContextIndex(TOKENS, key=lambda s: s.lower())
+
+    def test_similar_words(self):
+        self.assertEqual(self.index.similar_words("cat"), ["dog"])
+        self.assertEqual(self.index.similar_words("mat", binary=True), ["rug"])
+        self.assertEqual(self.index.similar_words("unknown"), [])
+
+    def test_contains(self):
+        self.assertIn("cat", self.index)
+        self.assertIn("Cat", self.index)
+        self.assertNotIn("unknown", self.index)
+
+    def test_word_similarity_dict(self):
+        scores = self.index.word_similarity_dict("mat")
+        self.assertEqual(scores["mat"], 1.0)
+        self.assertAlmostEqual(scores["rug"], 2 / 3)
+        self.assertEqual(scores["cat"], 0)
+
+    def test_common_contexts(self):
+        fd = self.index.common_contexts(["cat", "dog"])
+        self.assertEqual(list(fd), [("the", "sat")])
+        self.assertEqual(fd[("the", "sat")], 2)
+        self.assertRaises(
+            ValueError, self.index.common_contexts, ["cat", "unknown"], True
+        )
+
+    def test_save_load(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.index.save(path)
+            loaded = ContextIndex.load(path, key=lambda s: s.lower())
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.similar_words("Cat"), ["dog"])
+        self.assertEqual(
+            loaded.common_contexts(["the", "a"]),
+            self.index.common_contexts(["the", "a"]),
+        )
+
+
+class TestText(unittest.TestCase):
+    def similar(self, text, word):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            text.similar(word)
+        return out.getvalue()
+
+    def test_similar(self):
+        text = Text(TOKENS)
+        self.assertEqual(self.similar(text, "cat"), "dog\n")
+        self.assertEqual(self.similar(text, "unknown"), "No matches\n")
+        # a known word without similar words prints an empty line
+        self.assertEqual(self.similar(Text("a b c".split()), "b"), "\n")
+
+    def test_concordance_over_index(self):
+        tokens = ["The"] + TOKENS[1:]
+        for index in (PositionalIndex(tokens), PositionalIndex(tokens, str.lower)):
+            self.assertEqual(
+                Text(index).concordance_list("the"),
+                Text(tokens).concordance_list("the"),
+            )
+        self.assertTrue(PositionalIndex(TOKENS).agrees_with(str.lower))
+        self.assertFalse(PositionalIndex(tokens).agrees_with(str.lower))
+
+
+class TestPositionalIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PositionalIndex(TOKENS[:7], key=lambda s: s.lower())
+        self.index.add(TOKENS[7:])
+
+    def test_offsets(self):
+        self.assertEqual(self.index.offsets("The"), [0, 4, 7, 11, 21, 25])
+        self.assertEqual(self.index.phrase_offsets(["on", "the"]), [3, 10, 24])
+        self.assertEqual(self.index.offsets("unknown"), [])
+        self.assertEqual(self.index[1:3], ["cat", "sat"])
+
+    def test_count_index(self):
+        self.assertEqual(self.index.count("the"), TOKENS.count("the"))
+        self.assertEqual(self.index.count("The"), 0)
+        self.assertEqual(self.index.index("dog"), TOKENS.index("dog"))
+        self.assertRaises(ValueError, self.index.index, "unknown")
+        text = Text(self.index)
+        self.assertEqual(text.count("mat"), 3)
+        self.assertEqual(text.index("rug"), 12)
+
+    def test_findall(self):
+        searcher = TokenSearcher(TOKENS)
+        for pattern in ["<the>(<.*>)<sat>", "<a|the><mat>", "<.*t>{2,}", "<x>"]:
+            self.assertEqual(self.index.findall(pattern), searcher.findall(pattern))
+        self.assertEqual(
+            searcher.findall("<on><the>(<.*>)"), [["mat"], ["rug"], ["mat"]]
+        )
+
+    def test_save_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.index.save(directory)
+            loaded = PositionalIndex.load(directory, key=lambda s: s.lower())
+            self.assertEqual(loaded.offsets("the"), self.index.offsets("the"))
+            self.assertEqual(list(loaded), TOKENS)
+            concordance = ConcordanceIndex(loaded)
+            self.assertEqual(
+                concordance.find_concordance("rug"),
+                ConcordanceIndex(TOKENS).find_concordance("rug"),
+            )
+            self.assertRaises(ValueError, loaded.add, ["more"])
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+pytest.importorskip("numpy")
+
+from simple_nltk.grammar import PCFG, toy_pcfg2
+from simple_nltk.parse import viterbi
+from simple_nltk.parse.viterbi import ViterbiParser
+
+
+GRAMMAR = PCFG.fromstring(
+    """
+    S -> NP VP [0.8] | VP [0.2]
+    NP -> Det Adj N [0.3] | Det N [0.4] | 'john' [0.2] | NP PP [0.1]
+    VP -> V NP PP [0.3] | V NP [0.4] | 'runs' 'fast' [0.1] | VP PP [0.2]
+    PP -> P NP [1.0]
+    Det -> 'the' [0.6] | 'a' [0.4]
+    Adj -> 'old' [1.0]
+    N -> 'dog' [0.7] | 'park' [0.3]
+    V -> 'saw' [0.6] | 'walks' [0.4]
+    P -> 'in' [0.7] | 'with' [0.3]
+    """
+)
+
+SENTS = [
+    (GRAMMAR, "john saw the old dog in a park"),
+    (GRAMMAR, "the dog runs fast with john"),
+    (GRAMMAR, "saw john"),
+    (GRAMMAR, "john john"),
+    (GRAMMAR, ""),
+    (toy_pcfg2, "Jack saw Bob with my cookie"),
+]
+
+
+@pytest.mark.parametrize("grammar, sent", SENTS)
+def test_compiled_matches_incremental(monkeypatch, grammar, sent):
+    tokens = sent.split()
+    parses = list(ViterbiParser(grammar).parse(tokens))
+    monkeypatch.setattr(viterbi, "numpy", None)
+    expected = list(ViterbiParser(grammar).parse(tokens))
+    assert parses == expected
+    for tree, expected_tree in zip(parses, expected):
+        assert tree.prob() == pytest.approx(expected_tree.prob(), rel=1e-12)
+
+
+def test_compiled_states():
+    # Only terminals of productions longer than one symbol get states.
+    compiled = viterbi._CompiledPCFG(GRAMMAR)
+    assert set(compiled._terminals) == {"runs", "fast"}
+    assert compiled._kinds.count("nonterminal") == 9